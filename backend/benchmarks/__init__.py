@@ -0,0 +1 @@
+# Burn Rate Benchmarks
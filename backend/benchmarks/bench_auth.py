@@ -0,0 +1,56 @@
+"""Benchmark: per-request token verification and session renewal.
+
+    python -m benchmarks.bench_auth
+
+Compares verifying an access token with and without the verified-token
+cache, and renewing a session with a refresh token vs. a password login
+(bcrypt, cost 12).
+"""
+
+import os
+
+import bcrypt
+
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("PASSWORD", "bench-password")
+os.environ.setdefault(
+    "PASSWORD_HASH", bcrypt.hashpw(os.environ["PASSWORD"].encode(), bcrypt.gensalt(12)).decode()
+)
+
+from src import auth, database  # noqa: E402
+from src.handler import check_auth  # noqa: E402
+
+from .common import report, temp_database, timeit  # noqa: E402
+
+REQUESTS = 1000
+
+
+def verify_many(event: dict, cached: bool) -> None:
+    for _ in range(REQUESTS):
+        if not cached:
+            auth._verified.clear()
+        check_auth(event)
+
+
+def main() -> None:
+    event = {"headers": {"Authorization": f"Bearer {auth.generate_token()}"}}
+    print(f"check_auth x {REQUESTS:,}")
+    report("uncached", *timeit(lambda: verify_many(event, cached=False)))
+    report("cached", *timeit(lambda: verify_many(event, cached=True)))
+
+    with temp_database():
+        session = auth.start_session()
+        database.commit_bookkeeping()
+
+        def renew() -> None:
+            nonlocal session
+            session = auth.refresh_session(session["refresh_token"])
+            database.commit_bookkeeping()
+
+        print("session renewal")
+        report("password login (bcrypt)", *timeit(lambda: auth.verify_password(os.environ["PASSWORD"])))
+        report("refresh token rotation", *timeit(renew, repeat=50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Benchmark: per-day snapshot recompute vs. the sliding-window backfill.
+
+    python -m benchmarks.bench_backfill [days...]
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from src import database, snapshots
+
+from .common import report, seed_transactions, temp_database, timeit
+
+
+def per_day(start, end) -> None:
+    """Record each day's snapshot independently, as the live hook does."""
+    day = start
+    while day <= end:
+        snapshots.record(day)
+        day += timedelta(days=1)
+
+
+def main(spans: list[int]) -> None:
+    end = datetime.now().date()
+    for days in spans:
+        start = end - timedelta(days=days - 1)
+        with temp_database():
+            seed_transactions(100 * days, days=days + 30, today=end)
+            print(f"{days:,} days ({100 * days:,} transactions)")
+
+            report("per-day record()", *timeit(lambda: per_day(start, end), repeat=1))
+            report("backfill()", *timeit(lambda: snapshots.backfill(start, end), repeat=3))
+            database.commit()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [365, 3 * 365])
@@ -0,0 +1,80 @@
+"""Benchmark: per-window range queries vs. the daily-total prefix-sum engine.
+
+    python -m benchmarks.bench_burn_rate [sizes...]
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+
+from src import burn_rate, database
+
+from .common import report, seed_transactions, temp_database, timeit
+
+
+def legacy_burn_rate(today: date) -> dict:
+    """The original handler: one SUM query per window per group."""
+    result = {}
+    for group in ["food", "discretionary", "explosion"]:
+        if group == "explosion":
+            target = 0
+        else:
+            target_row = database.fetchone(
+                "SELECT daily_target FROM targets WHERE burn_rate_group = ?", (group,)
+            )
+            target = float(target_row["daily_target"]) if target_row else 0
+
+        cat_ids = [
+            c["id"]
+            for c in database.fetchall("SELECT id FROM categories WHERE burn_rate_group = ?", (group,))
+        ]
+        placeholders = ",".join("?" * len(cat_ids))
+        flags = "" if group == "explosion" else "AND is_recurring = 0 AND is_explosion = 0"
+
+        curve = []
+        for window in range(5, 31):
+            row = database.fetchone(
+                f"""
+                SELECT COALESCE(SUM(ABS(amount)), 0) as total
+                FROM transactions
+                WHERE category_id IN ({placeholders})
+                AND date >= ? AND date <= ?
+                {flags}
+                AND amount < 0
+                """,
+                (*cat_ids, (today - timedelta(days=window)).isoformat(), today.isoformat()),
+            )
+            daily_rate = float(row["total"]) / window
+            curve.append({
+                "window": window,
+                "daily_rate": round(daily_rate, 2),
+                "deviation": round(daily_rate - target, 2),
+            })
+        result[group] = {"curve": curve, "target": target}
+    return result
+
+
+def main(sizes: list[int]) -> None:
+    today = datetime.now().date()
+    for size in sizes:
+        with temp_database():
+            seed_transactions(size, today=today)
+            print(f"{size:,} transactions")
+
+            legacy = legacy_burn_rate(today)
+            engine = burn_rate.compute_burn_rate(today)
+            diffs = [
+                abs(old["daily_rate"] - new["daily_rate"])
+                for g in legacy
+                for old, new in zip(legacy[g]["curve"], engine[g]["curve"], strict=True)
+                if old != new
+            ]
+            # Legacy sums floats in SQL; the engine sums exact cents, so very
+            # large totals can differ by one cent at a half-cent boundary
+            print(f"  points differing: {len(diffs)}/78, max diff {max(diffs, default=0):.2f}")
+
+            report("legacy (78 range queries)", *timeit(lambda: legacy_burn_rate(today)))
+            report("engine (daily_spend rows)", *timeit(lambda: burn_rate.compute_burn_rate(today)))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000])
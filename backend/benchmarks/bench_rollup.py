@@ -0,0 +1,56 @@
+"""Benchmark: GROUP BY over transactions vs. the monthly_rollup aggregate.
+
+    python -m benchmarks.bench_rollup [sizes...]
+"""
+
+import sys
+from datetime import datetime
+
+from src import database, rollup
+
+from .common import report, seed_transactions, temp_database, timeit
+
+DIMENSIONS = ["month", "group", "account"]
+
+
+def scan_rollup(start: str, end: str) -> list:
+    """The same rollup computed from raw transactions."""
+    return database.fetchall(
+        """
+        SELECT substr(t.date, 1, 7) AS month,
+               COALESCE(root.burn_rate_group, 'uncategorized') AS burn_rate_group,
+               t.account_id,
+               SUM(CASE WHEN t.amount < 0 THEN -t.amount ELSE 0 END) AS spent,
+               SUM(CASE WHEN t.amount > 0 THEN t.amount ELSE 0 END) AS income,
+               COUNT(*) AS count
+        FROM transactions t
+        LEFT JOIN (
+            category_closure cc
+            JOIN categories root ON root.id = cc.ancestor_id AND root.parent_id IS NULL
+        ) ON cc.descendant_id = t.category_id
+        WHERE substr(t.date, 1, 7) BETWEEN ? AND ?
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        """,
+        (start, end),
+    )
+
+
+def main(sizes: list[int]) -> None:
+    today = datetime.now().date()
+    end = today.strftime("%Y-%m")
+    start = f"{today.year - 1}-{today.month:02d}"
+    for size in sizes:
+        with temp_database():
+            seed_transactions(size, today=today)
+            print(f"{size:,} transactions")
+
+            rows = rollup.rollup(DIMENSIONS, start, end)
+            print(f"  {len(rows)} rollup rows")
+
+            report("scan transactions", *timeit(lambda: scan_rollup(start, end)))
+            report("monthly_rollup", *timeit(lambda: rollup.rollup(DIMENSIONS, start, end)))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000])
@@ -0,0 +1,56 @@
+"""Benchmark: encoding GET /transactions pages as records vs. columnar JSON.
+
+    python -m benchmarks.bench_serialize [sizes...]
+
+"Row dicts" is the previous path (sqlite3.Row -> dict -> json.dumps); the
+others fetch tuples into a Rows set. Encoder rows use orjson when installed.
+"""
+
+import json
+import sys
+
+from src import database, serialize
+
+from .common import report, seed_transactions, temp_database, timeit
+
+QUERY = """
+    SELECT t.*, c.name as category_name, a.name as account_name FROM transactions t
+    LEFT JOIN categories c ON t.category_id = c.id
+    LEFT JOIN accounts a ON t.account_id = a.id
+    ORDER BY t.date DESC, t.id DESC
+    LIMIT ?
+"""
+
+
+def row_dicts(size: int) -> str:
+    rows = database.dicts_from_rows(database.fetchall(QUERY, (size,)))
+    return json.dumps({"transactions": rows})
+
+
+def rows_set(size: int, columnar: bool) -> str:
+    rows = database.fetchrows(QUERY, (size,))
+    rows.columnar = columnar
+    return serialize.dumps({"transactions": rows})
+
+
+def main(sizes: list[int]) -> None:
+    encoders = ["stdlib"] + (["orjson"] if serialize.orjson is not None else [])
+    for size in sizes:
+        with temp_database():
+            seed_transactions(size)
+            print(f"{size:,} rows")
+            report("row dicts, json", *timeit(lambda s=size: row_dicts(s)))
+
+            installed = serialize.orjson
+            for encoder in encoders:
+                serialize.orjson = installed if encoder == "orjson" else None
+                for columnar in (False, True):
+                    shape = "columnar" if columnar else "records"
+                    report(f"{shape}, {encoder}", *timeit(lambda s=size, c=columnar: rows_set(s, c)))
+                    if encoder == encoders[0]:
+                        print(f"  {'':<32} {len(rows_set(size, columnar)):,} bytes")
+            serialize.orjson = installed
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
@@ -0,0 +1,77 @@
+"""Shared helpers for benchmark scripts.
+
+Benchmarks run from the backend directory, e.g.
+    python -m benchmarks.bench_burn_rate
+"""
+
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+from src import categories, database
+
+
+@contextmanager
+def temp_database() -> Iterator[None]:
+    """Point the database module at a fresh schema-initialized file."""
+    database.close()
+    original_path = database._db_path
+    categories._group_map = None
+    with tempfile.TemporaryDirectory() as tmp:
+        database._db_path = str(Path(tmp) / "bench.db")
+        database.get_connection()
+        try:
+            yield
+        finally:
+            database.close()
+            database._db_path = original_path
+            categories._group_map = None
+
+
+def seed_transactions(count: int, days: int = 365, today: date | None = None, seed: int = 1) -> None:
+    """Insert count random categorized transactions spread over the last days."""
+    rng = random.Random(seed)
+    today = today or date.today()
+    rows = []
+    for i in range(count):
+        day = today - timedelta(days=rng.randrange(days))
+        rows.append((
+            rng.randint(1, 4),
+            day.isoformat(),
+            f"MERCHANT {rng.randrange(500)}",
+            -rng.randint(100, 20000) / 100 if rng.random() < 0.9 else rng.randint(100, 5000) / 100,
+            rng.randint(1, 5),
+            0,
+            1 if rng.random() < 0.05 else 0,
+            1 if rng.random() < 0.02 else 0,
+            f"bench-{i}",
+        ))
+    database.executemany(
+        """
+        INSERT INTO transactions
+        (account_id, date, description, amount, category_id, needs_review,
+         is_recurring, is_explosion, dedup_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    database.commit()
+
+
+def timeit(func: Callable[[], object], repeat: int = 5) -> tuple[float, float]:
+    """Run func repeat times; return (median, min) wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def report(label: str, median_ms: float, min_ms: float) -> None:
+    print(f"  {label:<32} median {median_ms:9.2f} ms   min {min_ms:9.2f} ms")
@@ -0,0 +1 @@
+"""Local development and load-testing tools; not deployed with the Lambda."""
@@ -0,0 +1,385 @@
+"""Load generator running scripted user flows against the API.
+
+    python -m devtools.loadtest --clients 8 --duration 30
+    python -m devtools.loadtest --mix dashboard=1 --json after.json --baseline before.json
+
+Each client logs in once, renewing its access token with the refresh token
+when a request gets a 401, then repeatedly picks a flow by weight (--mix):
+
+    dashboard  poll burn rate (with If-None-Match), status and recent transactions
+    triage     categorize one of the largest review groups, then one queued transaction
+    upload     upload a credit card CSV of new transactions
+
+Latency is measured per request, from the client, and reported per route as
+p50/p90/p99/max; flows are reported the same way. When the server sends
+Server-Timing (devtools.server does), per-phase percentiles are reported
+too. --json saves the results and --baseline compares p50/p99 with a saved
+run. Works against devtools.server or a deployed API (--url, --prefix).
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import date, timedelta
+
+UPLOAD_ROWS = 25
+PERCENTILES = [50, 90, 99]
+
+
+class Recorder:
+    """Latency samples (milliseconds) by name, shared by all clients."""
+
+    def __init__(self):
+        self.requests: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.flows: dict[str, list[float]] = defaultdict(list)
+        self.phases: dict[str, list[float]] = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def request(self, name: str, ms: float, ok: bool, phases: dict[str, float]) -> None:
+        with self.lock:
+            self.requests[name].append(ms)
+            if not ok:
+                self.errors[name] += 1
+            for phase, phase_ms in phases.items():
+                self.phases[phase].append(phase_ms)
+
+    def flow(self, name: str, ms: float) -> None:
+        with self.lock:
+            self.flows[name].append(ms)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def parse_server_timing(header: str | None) -> dict[str, float]:
+    """Milliseconds per metric from a Server-Timing header."""
+    phases = {}
+    for metric in (header or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                phases[name] = float(value)
+    return phases
+
+
+class Client:
+    """One simulated user: a session, cached ETags and a recorder."""
+
+    def __init__(self, base_url: str, recorder: Recorder, rng: random.Random):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.rng = rng
+        self.token: str | None = None
+        self.refresh_token: str | None = None
+        self.etags: dict[str, str] = {}
+        self.category_ids: list[int] = []
+
+    def call(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        body: dict | None = None,
+        etag: bool = False,
+        retry: bool = True,
+    ) -> dict | None:
+        """
+        Send a request, record its latency under name and return the decoded JSON body.
+
+        A 401 is answered like the web client does: the session is refreshed
+        once and the request sent again, so runs can outlast an access token.
+        """
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if etag and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers, method=method
+        )
+
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                status, response_headers, payload = (
+                    response.status,
+                    response.headers,
+                    response.read(),
+                )
+        except urllib.error.HTTPError as e:
+            status, response_headers, payload = e.code, e.headers, e.read()
+        except OSError:
+            self.recorder.request(name, (time.perf_counter() - start) * 1000, False, {})
+            return None
+        ms = (time.perf_counter() - start) * 1000
+
+        if status == 401 and retry and self.refresh_token and self.refresh():
+            return self.call(name, method, path, body, etag, retry=False)
+        self.recorder.request(
+            name, ms, status < 400, parse_server_timing(response_headers.get("Server-Timing"))
+        )
+        if etag and response_headers.get("ETag"):
+            self.etags[path] = response_headers["ETag"]
+        if status >= 400 or not payload:
+            return None
+        return json.loads(payload)
+
+    def login(self, password: str) -> bool:
+        session = self.call(
+            "POST /auth/login", "POST", "/auth/login", {"password": password}, retry=False
+        )
+        if not session:
+            return False
+        self.token, self.refresh_token = session["token"], session.get("refresh_token")
+        categories = self.call("GET /categories", "GET", "/categories") or {"categories": []}
+        self.category_ids = [c["id"] for c in categories["categories"]]
+        return True
+
+    def refresh(self) -> bool:
+        """Swap the refresh token for a new session; False if it was rejected."""
+        session = self.call(
+            "POST /auth/refresh",
+            "POST",
+            "/auth/refresh",
+            {"refresh_token": self.refresh_token},
+            retry=False,
+        )
+        if not session:
+            return False
+        self.token, self.refresh_token = session["token"], session["refresh_token"]
+        return True
+
+    def dashboard(self) -> None:
+        self.call("GET /burn-rate", "GET", "/burn-rate", etag=True)
+        self.call("GET /status", "GET", "/status")
+        self.call(
+            "GET /transactions", "GET", "/transactions?limit=50&fields=id,date,description,amount"
+        )
+
+    def triage(self) -> None:
+        if not self.category_ids:
+            return
+        groups = self.call(
+            "GET /transactions/review-queue/groups", "GET", "/transactions/review-queue/groups"
+        )
+        if groups and groups["groups"]:
+            self.call(
+                "POST /transactions/review-queue/groups/categorize",
+                "POST",
+                "/transactions/review-queue/groups/categorize",
+                {
+                    "key": self.rng.choice(groups["groups"][:5])["key"],
+                    "category_id": self.rng.choice(self.category_ids),
+                },
+            )
+        queue = self.call(
+            "GET /transactions/review-queue",
+            "GET",
+            "/transactions/review-queue?fields=id,description,amount",
+        )
+        if queue and queue["transactions"]:
+            txn = self.rng.choice(queue["transactions"])
+            self.call(
+                "PUT /transactions/{id}/categorize",
+                "PUT",
+                f"/transactions/{txn['id']}/categorize",
+                {"category_id": self.rng.choice(self.category_ids)},
+            )
+
+    def upload(self) -> None:
+        self.call(
+            "POST /transactions/upload",
+            "POST",
+            "/transactions/upload",
+            {"csv_content": self.statement()},
+        )
+
+    def statement(self) -> str:
+        """A credit card CSV of UPLOAD_ROWS new transactions from the last four weeks."""
+        today = date.today()
+        lines = ["Posted Date,Reference Number,Payee,Address,Amount"]
+        for _ in range(UPLOAD_ROWS):
+            day = today - timedelta(days=self.rng.randrange(28))
+            merchant = self.rng.choice(
+                ["GROCERY OUTLET", "CAFE LADRO", "CHEVRON", "AMAZON MKTPLACE", "PCC MARKETS"]
+            )
+            lines.append(
+                f"{day:%m/%d/%Y},{self.rng.getrandbits(48)},{merchant} #{self.rng.randrange(100)},"
+                f"SEATTLE WA,-{self.rng.randrange(100, 20000) / 100:.2f}"
+            )
+        return "\n".join(lines) + "\n"
+
+
+FLOWS: dict[str, Callable[[Client], None]] = {
+    "dashboard": Client.dashboard,
+    "triage": Client.triage,
+    "upload": Client.upload,
+}
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    """Flow weights from 'dashboard=6,triage=3,upload=1'."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in FLOWS:
+            raise ValueError(f"Unknown flow {name!r}; expected one of: {', '.join(FLOWS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def run(
+    base_url: str,
+    password: str,
+    clients: int,
+    mix: dict[str, int],
+    duration: float = 0,
+    iterations: int = 0,
+    seed: int = 1,
+) -> tuple[Recorder, float]:
+    """Run clients concurrently until duration seconds pass or each has run iterations flows."""
+    recorder = Recorder()
+    names, weights = list(mix), list(mix.values())
+    deadline = time.monotonic() + duration if duration else None
+
+    def user(index: int) -> None:
+        client = Client(base_url, recorder, random.Random(seed + index))
+        if not client.login(password):
+            return
+        done = 0
+        while (deadline is None or time.monotonic() < deadline) and (
+            not iterations or done < iterations
+        ):
+            name = client.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            FLOWS[name](client)
+            recorder.flow(name, (time.perf_counter() - start) * 1000)
+            done += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, time.perf_counter() - start
+
+
+def stats(samples: dict[str, list[float]], errors: dict[str, int] | None = None) -> dict[str, dict]:
+    """Count, errors and latency percentiles (ms) per name."""
+    return {
+        name: {
+            "count": len(values),
+            "errors": (errors or {}).get(name, 0),
+            **{f"p{q}": round(percentile(values, q), 2) for q in PERCENTILES},
+            "max": round(max(values), 2),
+        }
+        for name, values in sorted(samples.items())
+    }
+
+
+def results(recorder: Recorder, elapsed: float) -> dict:
+    total = sum(len(v) for v in recorder.requests.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "requests": stats(recorder.requests, recorder.errors),
+        "flows": stats(recorder.flows),
+        "phases": stats(recorder.phases),
+    }
+
+
+def print_table(title: str, rows: dict[str, dict], baseline: dict[str, dict] | None = None) -> None:
+    if not rows:
+        return
+    width = max(len(title), *(len(name) for name in rows))
+    columns = ["count", "errors", *(f"p{q}" for q in PERCENTILES), "max"]
+    header = f"{title:<{width}}" + "".join(f"{c:>10}" for c in columns)
+    if baseline is not None:
+        header += f"{'p50 vs base':>14}{'p99 vs base':>14}"
+    print(header)
+    for name, row in rows.items():
+        line = f"{name:<{width}}" + "".join(f"{row[c]:>10}" for c in columns)
+        if baseline is not None:
+            base = baseline.get(name)
+            for q in ("p50", "p99"):
+                change = f"{(row[q] / base[q] - 1) * 100:+.0f}%" if base and base[q] else "-"
+                line += f"{change:>14}"
+        print(line)
+    print()
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m devtools.loadtest", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--prefix", default="/api", help="path prefix of the API on --url")
+    parser.add_argument("--password", default="dev")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument(
+        "--duration", type=float, default=30, help="seconds to run (0: run --iterations)"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=0, help="flows per client (0: run for --duration)"
+    )
+    parser.add_argument("--mix", default="dashboard=6,triage=3,upload=1", help="flow weights")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with results saved by --json")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.duration and not args.iterations:
+        parser.error("one of --duration or --iterations is required")
+
+    recorder, elapsed = run(
+        args.url.rstrip("/") + args.prefix,
+        args.password,
+        args.clients,
+        mix,
+        args.duration,
+        args.iterations,
+        args.seed,
+    )
+    if not recorder.requests or not recorder.flows:
+        print("No flows completed; check --url and --password", file=sys.stderr)
+        return 1
+
+    report = results(recorder, elapsed)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{args.clients} clients, {elapsed:.1f} s, {report['requests_per_s']} requests/s\n")
+    print_table("request (ms)", report["requests"], baseline and baseline["requests"])
+    print_table("flow (ms)", report["flows"], baseline and baseline["flows"])
+    print_table("server phase (ms)", report["phases"], baseline and baseline["phases"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
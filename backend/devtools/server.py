@@ -0,0 +1,251 @@
+"""Local HTTP server that runs API requests through lambda_handler.
+
+    python -m devtools.server --port 8000 --password dev
+    python -m devtools.server --cold-every 20 --idle-timeout 300
+
+Requests under /api are adapted into the API Gateway proxy event that
+lambda_handler receives in production, and its response is written back;
+other paths serve the frontend. Like one Lambda container, the server runs
+one request at a time, so concurrent clients queue. Without DATA_BUCKET the
+local burn-rate.db is used and kept between requests.
+
+A cold start is simulated by discarding every src module and importing the
+handler again, which drops the database connection and all in-process
+caches and re-runs import-time setup. --cold-every N does this before every
+Nth request and --idle-timeout after that many idle seconds. Responses carry
+the phase timings in a Server-Timing header, plus X-Cold-Start with the
+import time when the request started a fresh container.
+"""
+
+import argparse
+import base64
+import importlib
+import logging
+import mimetypes
+import os
+import sys
+import time
+import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api"
+FRONTEND_DIR = Path(__file__).resolve().parents[2] / "frontend"
+
+
+def to_event(method: str, path: str, query: str, headers: Message, body: bytes) -> dict:
+    """The API Gateway (REST, proxy integration) event for an HTTP request."""
+    params = urllib.parse.parse_qs(query, keep_blank_values=True)
+    try:
+        text, encoded = body.decode("utf-8"), False
+    except UnicodeDecodeError:
+        text, encoded = base64.b64encode(body).decode("ascii"), True
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": method,
+        "headers": dict(headers.items()) or None,
+        "multiValueHeaders": {name: headers.get_all(name) for name in headers.keys()} or None,
+        # API Gateway keeps the last value of a repeated parameter
+        "queryStringParameters": {name: values[-1] for name, values in params.items()} or None,
+        "multiValueQueryStringParameters": params or None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "requestContext": {
+            "requestId": str(uuid.uuid4()),
+            "httpMethod": method,
+            "path": path,
+            "stage": "local",
+            "requestTimeEpoch": int(time.time() * 1000),
+        },
+        "body": text or None,
+        "isBase64Encoded": encoded,
+    }
+
+
+def from_response(response: dict) -> tuple[int, dict, bytes]:
+    """Status, headers and body bytes of a lambda_handler response."""
+    body = response.get("body") or ""
+    payload = base64.b64decode(body) if response.get("isBase64Encoded") else body.encode("utf-8")
+    return response["statusCode"], response.get("headers") or {}, payload
+
+
+def server_timing(phases: dict[str, float]) -> str:
+    """Server-Timing header value for per-phase milliseconds."""
+    return ", ".join(f"{phase};dur={ms}" for phase, ms in phases.items())
+
+
+class Container:
+    """One simulated Lambda container: the imported handler and its in-process state."""
+
+    def __init__(self, db_path: str | None = None, cold_every: int = 0, idle_timeout: float = 0):
+        self.db_path = db_path
+        self.cold_every = cold_every
+        self.idle_timeout = idle_timeout
+        self.handler: ModuleType | None = None
+        self.requests = 0
+        self.last_used = 0.0
+        # SQLite connections belong to the thread that opened them, so the
+        # warm connection needs every request on the same thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="container")
+
+    def start(self, fresh: bool) -> float:
+        """Import the handler, first discarding all src modules if fresh; returns seconds taken."""
+        if fresh:
+            if self.handler is not None:
+                self.handler.database.close()
+            for name in [n for n in sys.modules if n == "src" or n.startswith("src.")]:
+                del sys.modules[name]
+        start = time.perf_counter()
+        self.handler = importlib.import_module("src.handler")
+        if self.db_path:
+            self.handler.database._db_path = self.db_path
+        return time.perf_counter() - start
+
+    def invoke(self, event: dict) -> tuple[dict, dict[str, float], float | None]:
+        """
+        Run one event through lambda_handler.
+
+        Returns the response, its phase timings in milliseconds and, if the
+        request started a fresh container, the seconds spent importing.
+        Requests run one at a time on the container's thread.
+        """
+        return self.executor.submit(self._invoke, event).result()
+
+    def _invoke(self, event: dict) -> tuple[dict, dict[str, float], float | None]:
+        cold = None
+        idle = time.monotonic() - self.last_used
+        if self.handler is None:
+            cold = self.start(fresh=False)
+        elif (self.cold_every and self.requests % self.cold_every == 0) or (
+            self.idle_timeout and idle > self.idle_timeout
+        ):
+            cold = self.start(fresh=True)
+        self.requests += 1
+
+        context = SimpleNamespace(
+            aws_request_id=event["requestContext"]["requestId"],
+            function_name="pfa-local",
+        )
+        response = self.handler.lambda_handler(event, context)
+        phases = self.handler.metrics.durations()
+        self.last_used = time.monotonic()
+        return response, phases, cold
+
+
+class DevServer(ThreadingHTTPServer):
+    """HTTP server passing /api requests to a Container and serving static files otherwise."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], container: Container, static_dir: Path | None):
+        super().__init__(address, RequestHandler)
+        self.container = container
+        self.static_dir = static_dir.resolve() if static_dir else None
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server: DevServer
+
+    def handle_any(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        is_api = url.path == API_PREFIX or url.path.startswith(API_PREFIX + "/")
+        if is_api or self.server.static_dir is None:
+            self.handle_api(url)
+        else:
+            self.handle_static(url.path)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = handle_any
+
+    def handle_api(self, url: urllib.parse.SplitResult) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        event = to_event(self.command, url.path, url.query, self.headers, self.rfile.read(length))
+        response, phases, cold = self.server.container.invoke(event)
+        status, headers, payload = from_response(response)
+
+        extra = {"Server-Timing": server_timing(phases)}
+        if cold is not None:
+            extra["X-Cold-Start"] = f"{cold * 1000:.1f}ms"
+            logger.info(f"Cold start: {cold * 1000:.1f} ms")
+        self.send(status, {**headers, **extra}, payload)
+
+    def handle_static(self, path: str) -> None:
+        root = self.server.static_dir
+        target = (root / urllib.parse.unquote(path).lstrip("/")).resolve()
+        if target.is_dir():
+            target = target / "index.html"
+        if not target.is_relative_to(root) or not target.is_file():
+            self.send(404, {"Content-Type": "text/plain"}, b"Not found")
+            return
+        content_type = mimetypes.guess_type(target.name)[0] or "application/octet-stream"
+        self.send(200, {"Content-Type": content_type}, target.read_bytes())
+
+    def send(self, status: int, headers: dict, payload: bytes) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            if name.lower() not in ("content-length", "connection"):
+                self.send_header(name, str(value))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info(f"{self.address_string()} {format % args}")
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m devtools.server", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", help="SQLite file to use instead of backend/burn-rate.db")
+    parser.add_argument(
+        "--password", default="dev", help="login password when PASSWORD_HASH is not set"
+    )
+    parser.add_argument(
+        "--static", type=Path, default=FRONTEND_DIR, help="directory served outside /api"
+    )
+    parser.add_argument("--no-static", action="store_true", help="send every path to the handler")
+    parser.add_argument(
+        "--cold-every", type=int, default=0, metavar="N", help="cold start before every Nth request"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="cold start after this long idle",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    if not os.environ.get("PASSWORD_HASH"):
+        import bcrypt
+
+        os.environ["PASSWORD_HASH"] = bcrypt.hashpw(
+            args.password.encode(), bcrypt.gensalt(12)
+        ).decode()
+        logger.info(f"Login password: {args.password}")
+
+    container = Container(args.db, args.cold_every, args.idle_timeout)
+    server = DevServer((args.host, args.port), container, None if args.no_static else args.static)
+    logger.info(f"Serving on http://{args.host}:{server.server_port} (API under {API_PREFIX})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
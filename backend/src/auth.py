@@ -1,4 +1,9 @@
-"""Password-only authentication with JWT tokens."""
+"""Password-only authentication with JWT tokens.
+
+A password login opens a session: a short-lived access token plus a
+rotating refresh token, so clients renew access with an HMAC check and a
+one-row update instead of repeating the bcrypt password check.
+"""
 
 import hashlib
 import hmac
@@ -7,16 +12,29 @@ import logging
 import os
 import time
 from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from secrets import token_urlsafe
 
 import boto3
 from botocore.exceptions import ClientError
 
+from . import database
+
 logger = logging.getLogger(__name__)
 
 # JWT configuration
-JWT_EXPIRY_HOURS = 24
+ACCESS_TOKEN_MINUTES = int(os.environ.get("ACCESS_TOKEN_MINUTES", "60"))
+REFRESH_TOKEN_DAYS = 30
 JWT_ALGORITHM = "HS256"
 
+# How long the previous refresh generation is still honoured after a
+# rotation, so tabs sharing a session can race a refresh
+REFRESH_GRACE_SECONDS = 60
+
+# Verified access tokens kept in process, most recently used last
+VERIFIED_CACHE_SIZE = 256
+_verified: OrderedDict[str, dict] = OrderedDict()
+
 # Cached secrets
 _secrets_cache: dict | None = None
 
@@ -69,21 +87,15 @@ def verify_password(password: str) -> bool:
         return False
 
 
-def generate_token() -> str:
-    """Generate a JWT token."""
+def _sign(payload: dict) -> str:
+    """Encode and sign a JWT with the configured secret."""
     secrets = _get_secrets()
     jwt_secret = secrets.get("JWT_SECRET", "")
 
     if not jwt_secret:
         raise ValueError("No JWT_SECRET configured")
 
-    # Create header and payload
     header = {"alg": JWT_ALGORITHM, "typ": "JWT"}
-    payload = {
-        "sub": "user",
-        "iat": int(time.time()),
-        "exp": int(time.time()) + (JWT_EXPIRY_HOURS * 3600),
-    }
 
     # Encode header and payload
     header_b64 = urlsafe_b64encode(json.dumps(header).encode()).rstrip(b"=").decode()
@@ -99,18 +111,18 @@ def generate_token() -> str:
     return f"{header_b64}.{payload_b64}.{signature_b64}"
 
 
-def verify_token(token: str) -> tuple[bool, dict | None]:
-    """Verify a JWT token. Returns (is_valid, payload)."""
+def _decode(token: str) -> dict | None:
+    """Payload of a correctly signed, unexpired JWT, or None."""
     secrets = _get_secrets()
     jwt_secret = secrets.get("JWT_SECRET", "")
 
     if not jwt_secret:
-        return False, None
+        return None
 
     try:
         parts = token.split(".")
         if len(parts) != 3:
-            return False, None
+            return None
 
         header_b64, payload_b64, signature_b64 = parts
 
@@ -122,7 +134,7 @@ def verify_token(token: str) -> tuple[bool, dict | None]:
         expected_sig_b64 = urlsafe_b64encode(expected_sig).rstrip(b"=").decode()
 
         if not hmac.compare_digest(signature_b64, expected_sig_b64):
-            return False, None
+            return None
 
         # Decode payload
         # Add padding if needed
@@ -134,14 +146,144 @@ def verify_token(token: str) -> tuple[bool, dict | None]:
 
         # Check expiration
         if payload.get("exp", 0) < time.time():
-            return False, None
+            return None
 
-        return True, payload
+        return payload
 
     except Exception as e:
         logger.error(f"Token verification error: {e}")
+        return None
+
+
+def generate_token() -> str:
+    """Generate a short-lived access token."""
+    now = int(time.time())
+    return _sign({
+        "sub": "user",
+        "typ": "access",
+        "iat": now,
+        "exp": now + ACCESS_TOKEN_MINUTES * 60,
+    })
+
+
+def debug_signature(method: str, path: str, expires: int) -> str:
+    """HMAC of a request line and expiry time, which unlocks debug options such as profiling."""
+    jwt_secret = _get_secrets().get("JWT_SECRET", "")
+    if not jwt_secret:
+        raise ValueError("No JWT_SECRET configured")
+    message = f"debug:{method} {path}:{expires}".encode()
+    return hmac.new(jwt_secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_token(token: str) -> tuple[bool, dict | None]:
+    """
+    Verify an access token. Returns (is_valid, payload).
+
+    Verified tokens are kept in an LRU until they expire, so repeat requests
+    skip the HMAC and decoding. Tokens issued before the typ claim existed
+    are accepted as access tokens.
+    """
+    payload = _verified.get(token)
+    if payload is not None:
+        if payload["exp"] >= time.time():
+            _verified.move_to_end(token)
+            return True, payload
+        del _verified[token]
+        return False, None
+
+    payload = _decode(token)
+    if payload is None or payload.get("typ", "access") != "access":
         return False, None
 
+    _verified[token] = payload
+    if len(_verified) > VERIFIED_CACHE_SIZE:
+        _verified.popitem(last=False)
+    return True, payload
+
+
+def _refresh_token(family: str, generation: int, expires_at: int) -> str:
+    return _sign({"sub": "user", "typ": "refresh", "fam": family, "gen": generation, "exp": expires_at})
+
+
+def _session(family: str, generation: int, expires_at: int) -> dict:
+    return {
+        "token": generate_token(),
+        "refresh_token": _refresh_token(family, generation, expires_at),
+        "expires_in": ACCESS_TOKEN_MINUTES * 60,
+    }
+
+
+def start_session() -> dict:
+    """
+    Open a refresh token family after a password login.
+
+    Returns the access token, the first refresh token and the access token
+    lifetime in seconds. Expired families are removed. The caller commits.
+    """
+    now = int(time.time())
+    database.execute("DELETE FROM refresh_tokens WHERE expires_at < ?", (now,))
+    family = token_urlsafe(16)
+    expires_at = now + REFRESH_TOKEN_DAYS * 86400
+    database.execute(
+        "INSERT INTO refresh_tokens (family, generation, expires_at) VALUES (?, 0, ?)",
+        (family, expires_at),
+    )
+    return _session(family, 0, expires_at)
+
+
+def refresh_session(refresh_token: str) -> dict | None:
+    """
+    Exchange a refresh token for a new access token and the next refresh token.
+
+    Each refresh token is single-use: presenting an already rotated one
+    revokes its whole family, since one of the two holders is not the user.
+    The exception is the generation rotated within REFRESH_GRACE_SECONDS,
+    which gets the current token again (another tab refreshed first). The
+    family keeps its original expiry, so sessions still end after
+    REFRESH_TOKEN_DAYS. Returns None if the token is rejected; the caller
+    commits either way.
+    """
+    payload = _decode(refresh_token)
+    if payload is None or payload.get("typ") != "refresh":
+        return None
+
+    family = database.fetchone(
+        "SELECT generation, rotated_at, expires_at, revoked FROM refresh_tokens WHERE family = ?",
+        (payload["fam"],),
+    )
+    if family is None or family["revoked"]:
+        return None
+    now = int(time.time())
+    if payload["gen"] != family["generation"]:
+        if (
+            payload["gen"] == family["generation"] - 1
+            and now - family["rotated_at"] <= REFRESH_GRACE_SECONDS
+        ):
+            return _session(payload["fam"], family["generation"], family["expires_at"])
+        logger.warning(f"Refresh token reuse detected; revoking family {payload['fam']}")
+        database.execute("UPDATE refresh_tokens SET revoked = 1 WHERE family = ?", (payload["fam"],))
+        return None
+
+    generation = family["generation"] + 1
+    database.execute(
+        "UPDATE refresh_tokens SET generation = ?, rotated_at = ? WHERE family = ?",
+        (generation, now, payload["fam"]),
+    )
+    return _session(payload["fam"], generation, family["expires_at"])
+
+
+def end_session(refresh_token: str) -> bool:
+    """
+    Revoke the family of a refresh token (logout). Returns whether the token
+    was valid; an expired access token does not prevent logging out. The
+    caller commits.
+    """
+    payload = _decode(refresh_token)
+    if payload is None or payload.get("typ") != "refresh":
+        return False
+    database.execute("UPDATE refresh_tokens SET revoked = 1 WHERE family = ?", (payload["fam"],))
+    return True
+
 
 def extract_token_from_header(auth_header: str) -> str | None:
     """Extract token from Authorization header."""
@@ -0,0 +1,206 @@
+"""Burn rate engine: resolution curves from daily totals and prefix sums.
+
+Spending is read once as per-day totals for each group from the
+materialized daily_spend table, then every window is read off a running
+(prefix) sum instead of issuing one range query per window. Totals are accumulated in integer cents and rates are
+rounded half-up from the exact value, so results do not depend on
+floating-point summation order.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from . import categories, database, ewma
+
+# Groups with a resolution curve; explosion has no target
+GROUPS = ["food", "discretionary", "explosion"]
+
+# Window sizes (days) on the default resolution curve
+WINDOWS = list(range(5, 31))
+
+# Largest window a caller may request
+MAX_WINDOW = 365
+
+# Computed payloads keyed by (data version, date, groups, windows)
+CACHE_SIZE = 8
+_result_cache: dict[tuple, dict] = {}
+
+
+def daily_totals(
+    today: date, days_back: int, groups: list[str] | None = None
+) -> dict[str, list[int]]:
+    """
+    Expense totals in cents per group for each day from today back days_back.
+
+    Returns {group: totals} for the given groups (default GROUPS) where
+    totals[d] is the spend d days before today.
+    Food and discretionary exclude recurring and explosion-flagged charges;
+    the explosion group counts everything in its categories. Reads the
+    materialized daily_spend table, so cost is independent of transaction
+    volume.
+    """
+    if groups is None:
+        groups = GROUPS
+    totals = {group: [0] * (days_back + 1) for group in groups}
+    placeholders = ",".join("?" * len(groups))
+
+    rows = database.fetchall(
+        f"""
+        SELECT date, burn_rate_group, SUM(total_cents) AS total_cents
+        FROM daily_spend
+        WHERE date >= ? AND date <= ?
+        AND burn_rate_group IN ({placeholders})
+        AND (burn_rate_group = 'explosion' OR (is_recurring = 0 AND is_explosion = 0))
+        GROUP BY date, burn_rate_group
+        """,
+        ((today - timedelta(days=days_back)).isoformat(), today.isoformat(), *groups),
+    )
+
+    today_ordinal = today.toordinal()
+    for row in rows:
+        days_ago = today_ordinal - date.fromisoformat(row["date"]).toordinal()
+        totals[row["burn_rate_group"]][days_ago] = row["total_cents"]
+
+    return totals
+
+
+def _round_cents(value: Decimal) -> float:
+    return float(value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def curve_point(window: int, window_cents: int, target: float) -> dict:
+    """One resolution curve point from a window's total spend in cents."""
+    daily_rate = Decimal(window_cents) / 100 / window
+    return {
+        "window": window,
+        "daily_rate": _round_cents(daily_rate),
+        "deviation": _round_cents(daily_rate - Decimal(str(target))),
+    }
+
+
+def _arrow(curve: list[dict]) -> str:
+    """Trend arrow from the slope of the last five curve points."""
+    if len(curve) < 5:
+        return "neutral"
+    recent = [p["daily_rate"] for p in curve[-5:]]
+    slope = (recent[-1] - recent[0]) / 4
+    if slope < -1:
+        return "improving"  # Spending trending down
+    if slope > 1:
+        return "worsening"  # Spending trending up
+    return "stable"
+
+
+def load_targets() -> dict[str, float]:
+    """Daily target per group; groups without a target row are absent."""
+    return {
+        row["burn_rate_group"]: float(row["daily_target"])
+        for row in database.fetchall("SELECT burn_rate_group, daily_target FROM targets")
+    }
+
+
+def validate_windows(windows: list[int]) -> list[int]:
+    """Sorted, de-duplicated windows; raises ValueError outside 1..MAX_WINDOW."""
+    if not windows or any(w < 1 or w > MAX_WINDOW for w in windows):
+        raise ValueError(f"windows must be between 1 and {MAX_WINDOW} days")
+    return sorted(set(windows))
+
+
+def compute_burn_rate(
+    today: date | None = None,
+    groups: list[str] | None = None,
+    windows: list[int] | None = None,
+) -> dict:
+    """
+    Resolution curves, targets and arrows as of a date.
+
+    groups and windows default to GROUPS and WINDOWS; only the requested
+    groups are read and only the requested windows are computed.
+    current_14day and total_30day are present when those windows are.
+    Each group also carries its EWMA rates and the arrow they imply.
+    """
+    if today is None:
+        today = datetime.now().date()
+    if groups is None:
+        groups = GROUPS
+    windows = WINDOWS if windows is None else validate_windows(windows)
+
+    targets = load_targets()
+    totals = daily_totals(today, max(windows), groups)
+    smoothed = ewma.rates(today)
+
+    result = {}
+    for group in groups:
+        # Get target (explosion has no target)
+        target = 0 if group == "explosion" else targets.get(group, 0)
+
+        if not categories.ids_for_group(group):
+            result[group] = {"curve": [], "target": target, "arrow": "neutral"}
+            continue
+
+        # Window N covers today and the N days before it
+        running = 0
+        prefix = []
+        for cents in totals[group]:
+            running += cents
+            prefix.append(running)
+
+        curve = [curve_point(window, prefix[window], target) for window in windows]
+        points = {p["window"]: p["daily_rate"] for p in curve}
+
+        result[group] = {
+            "curve": curve,
+            "target": target,
+            "arrow": _arrow(curve),
+            "ewma": [
+                {"half_life": half_life, "daily_rate": rate}
+                for half_life, rate in sorted(smoothed[group].items())
+            ],
+            "ewma_arrow": ewma.arrow(smoothed[group]),
+        }
+        if 14 in points:
+            result[group]["current_14day"] = points[14]
+        if group != "explosion":
+            result[group]["total_30day"] = 0
+        elif 30 in points:
+            # Calculate 30-day total for explosion
+            result[group]["total_30day"] = round(points[30] * 30, 2)
+
+    return result
+
+
+def window_rate(group: str, window: int, today: date | None = None) -> float:
+    """One group's daily rate over a single window, without building a curve."""
+    if today is None:
+        today = datetime.now().date()
+
+    totals = daily_totals(today, window, [group])
+    return curve_point(window, sum(totals[group]), 0)["daily_rate"]
+
+
+def cached_burn_rate(
+    version: int,
+    today: date | None = None,
+    groups: list[str] | None = None,
+    windows: list[int] | None = None,
+) -> dict:
+    """
+    compute_burn_rate() memoized by data version, date and selection.
+
+    Any committed write bumps the data version, so a cached payload is
+    reused only while the underlying data and the date are unchanged.
+    """
+    if today is None:
+        today = datetime.now().date()
+
+    key = (
+        version,
+        today.isoformat(),
+        tuple(groups or GROUPS),
+        tuple(WINDOWS if windows is None else validate_windows(windows)),
+    )
+    if key not in _result_cache:
+        if len(_result_cache) >= CACHE_SIZE:
+            _result_cache.pop(next(iter(_result_cache)))
+        _result_cache[key] = compute_burn_rate(today, groups, windows)
+    return _result_cache[key]
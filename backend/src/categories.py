@@ -0,0 +1,156 @@
+"""Category hierarchy: closure table maintenance and group resolution cache.
+
+A subcategory counts toward the burn_rate_group of its top-level ancestor,
+so "Groceries" under "Food" is food spending regardless of its own group.
+The category_closure table stores every (ancestor, descendant, depth) pair
+so that resolution is a single indexed join instead of a recursive walk.
+"""
+
+import logging
+import secrets
+
+from . import database
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_VERSION_KEY = "category_version"
+
+# In-process cache of category_id -> effective burn_rate_group
+_group_map: dict[int, str] | None = None
+_group_map_version: int | None = None
+
+
+class CategoryCycleError(ValueError):
+    """Raised when a parent assignment would make a category its own ancestor."""
+
+    pass
+
+
+def _category_version() -> int:
+    row = database.fetchone(
+        "SELECT value FROM app_meta WHERE key = ?", (CATEGORY_VERSION_KEY,)
+    )
+    return row["value"] if row else 0
+
+
+def invalidate() -> None:
+    """
+    Mark category groupings as changed, here and for other containers.
+
+    The version is a random token rather than a counter so that a rolled
+    back change can never be mistaken for a later committed one.
+    """
+    global _group_map, _group_map_version
+
+    database.execute(
+        """
+        INSERT INTO app_meta (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """,
+        (CATEGORY_VERSION_KEY, secrets.randbits(62)),
+    )
+    _group_map = None
+    _group_map_version = None
+
+
+def group_map() -> dict[int, str]:
+    """Map every category id to its effective burn_rate_group (cached)."""
+    global _group_map, _group_map_version
+
+    version = _category_version()
+    if _group_map is not None and _group_map_version == version:
+        return _group_map
+
+    rows = database.fetchall(
+        """
+        SELECT cc.descendant_id AS category_id, root.burn_rate_group
+        FROM category_closure cc
+        JOIN categories root ON root.id = cc.ancestor_id
+        WHERE root.parent_id IS NULL
+        """
+    )
+    _group_map = {row["category_id"]: row["burn_rate_group"] for row in rows}
+    _group_map_version = version
+    return _group_map
+
+
+def ids_for_group(group: str) -> list[int]:
+    """Category ids (including nested subcategories) that resolve to a group."""
+    return sorted(cat_id for cat_id, g in group_map().items() if g == group)
+
+
+def descendants(category_id: int) -> list[int]:
+    """A category and every category nested beneath it."""
+    rows = database.fetchall(
+        "SELECT descendant_id FROM category_closure WHERE ancestor_id = ? ORDER BY depth",
+        (category_id,),
+    )
+    return [row["descendant_id"] for row in rows]
+
+
+def add_category(category_id: int, parent_id: int | None) -> None:
+    """Insert closure rows for a newly created category."""
+    database.execute(
+        """
+        INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, ?, depth + 1 FROM category_closure WHERE descendant_id = ?
+        UNION ALL
+        SELECT ?, ?, 0
+        """,
+        (category_id, parent_id, category_id, category_id),
+    )
+    invalidate()
+
+
+def move_category(category_id: int, parent_id: int | None) -> None:
+    """
+    Re-parent a category and its whole subtree.
+
+    Raises CategoryCycleError if parent_id is the category itself or one of
+    its descendants.
+    """
+    if parent_id is not None and parent_id in descendants(category_id):
+        raise CategoryCycleError("Category cannot be nested under itself")
+
+    # Detach the subtree from its current ancestors
+    database.execute(
+        """
+        DELETE FROM category_closure
+        WHERE descendant_id IN (
+            SELECT descendant_id FROM category_closure WHERE ancestor_id = ?
+        )
+        AND ancestor_id NOT IN (
+            SELECT descendant_id FROM category_closure WHERE ancestor_id = ?
+        )
+        """,
+        (category_id, category_id),
+    )
+
+    # Attach it under the new parent's ancestors
+    if parent_id is not None:
+        database.execute(
+            """
+            INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+            SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+            FROM category_closure above
+            CROSS JOIN category_closure below
+            WHERE above.descendant_id = ? AND below.ancestor_id = ?
+            """,
+            (parent_id, category_id),
+        )
+    invalidate()
+
+
+def remove_category(category_id: int) -> None:
+    """Detach a category's children to the top level and drop its closure rows."""
+    children = database.fetchall(
+        "SELECT id FROM categories WHERE parent_id = ?", (category_id,)
+    )
+    for child in children:
+        move_category(child["id"], None)
+
+    database.execute(
+        "DELETE FROM category_closure WHERE ancestor_id = ? OR descendant_id = ?",
+        (category_id, category_id),
+    )
+    invalidate()
@@ -0,0 +1,112 @@
+"""Delta sync: rows of the synced tables changed since a client's version.
+
+Triggers on transactions, rules and categories keep one change_log entry per
+row, replaced on every insert, update and delete, so the entry's version is
+the row's latest change and deleted rows remain as tombstones. A client
+stores the version from each response and passes it back as since; replaying
+from 0 rebuilds the full replica.
+
+Tombstones are dropped TOMBSTONE_DAYS after the delete (every upload purge
+writes a batch of them). A client whose since predates the newest dropped
+tombstone could miss deletes, so it is told to resync from 0 instead.
+"""
+
+import json
+import time
+
+from . import database
+
+SYNC_TABLES = ["transactions", "rules", "categories"]
+
+# Change entries per response unless the client asks for fewer or more
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 5000
+
+# Days a delete stays visible to delta sync
+TOMBSTONE_DAYS = 90
+
+# app_meta key holding the newest version of any dropped tombstone
+COMPACTED_KEY = "changes_compacted_through"
+
+
+class ResyncRequired(ValueError):
+    """Raised when since predates dropped tombstones; the client must resync from 0."""
+
+    pass
+
+
+def current_version() -> int:
+    """Version of the latest change, 0 before any; compacting tombstones does not lower it."""
+    row = database.fetchone("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+    return row["seq"] if row else 0
+
+
+def compact() -> int:
+    """Drop tombstones older than TOMBSTONE_DAYS; returns how many. The caller commits."""
+    horizon = int(time.time()) - TOMBSTONE_DAYS * 86400
+    row = database.fetchone(
+        "SELECT MAX(version) AS version FROM change_log WHERE deleted = 1 AND changed_at < ?",
+        (horizon,),
+    )
+    if row["version"] is None:
+        return 0
+    database.execute(
+        """
+        INSERT INTO app_meta (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+        """,
+        (COMPACTED_KEY, row["version"]),
+    )
+    result = database.execute(
+        "DELETE FROM change_log WHERE deleted = 1 AND changed_at < ?", (horizon,)
+    )
+    return result.rowcount
+
+
+def changes_since(since: int, limit: int = DEFAULT_LIMIT) -> dict:
+    """
+    The oldest limit changes after since, grouped by table.
+
+    "changes" holds the current rows and "deleted" the ids of deleted rows;
+    "version" is the since for the next call and "has_more" says whether
+    further changes remain. Raises ValueError if since is ahead of this
+    database and ResyncRequired if deletes after since were compacted away
+    (either way the client must resync from 0).
+    """
+    if since > current_version():
+        raise ValueError("since is ahead of the server; resync from 0")
+    compacted = database.fetchone("SELECT value FROM app_meta WHERE key = ?", (COMPACTED_KEY,))
+    if since and compacted and since < compacted["value"]:
+        raise ResyncRequired("since predates the retained change history; resync from 0")
+
+    entries = database.fetchall(
+        """
+        SELECT version, table_name, row_id, deleted FROM change_log
+        WHERE version > ?
+        ORDER BY version
+        LIMIT ?
+        """,
+        (since, limit + 1),
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    changed: dict[str, list] = {table: [] for table in SYNC_TABLES}
+    deleted: dict[str, list] = {table: [] for table in SYNC_TABLES}
+    for entry in entries:
+        (deleted if entry["deleted"] else changed)[entry["table_name"]].append(entry["row_id"])
+
+    return {
+        "version": entries[-1]["version"] if entries else since,
+        "has_more": has_more,
+        "changes": {
+            table: database.fetchrows(
+                f"SELECT * FROM {table} WHERE id IN (SELECT value FROM json_each(?)) ORDER BY id",
+                (json.dumps(ids),),
+            )
+            if ids
+            else []
+            for table, ids in changed.items()
+        },
+        "deleted": deleted,
+    }
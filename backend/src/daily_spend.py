@@ -0,0 +1,98 @@
+"""Materialized daily expense totals.
+
+daily_spend holds one row per (date, burn_rate_group, is_recurring,
+is_explosion) with the total expense in cents. Triggers on transactions
+keep it current through ingest, categorization, flag toggles and purge.
+Category regrouping changes which group existing rows belong to, so the
+category handlers call rebuild() after such changes.
+
+Run from the backend directory to check or repair the table:
+    python -m src.daily_spend verify
+    python -m src.daily_spend rebuild
+"""
+
+import logging
+import sys
+
+from . import database
+
+logger = logging.getLogger(__name__)
+
+_AGGREGATE_SQL = """
+    SELECT t.date, root.burn_rate_group, t.is_recurring, t.is_explosion,
+           SUM(CAST(ROUND(-t.amount * 100) AS INTEGER)) AS total_cents,
+           COUNT(*) AS txn_count
+    FROM transactions t
+    JOIN category_closure cc ON cc.descendant_id = t.category_id
+    JOIN categories root ON root.id = cc.ancestor_id AND root.parent_id IS NULL
+    WHERE t.amount < 0
+    GROUP BY t.date, root.burn_rate_group, t.is_recurring, t.is_explosion
+"""
+
+
+def rebuild() -> None:
+    """Recompute daily_spend from transactions."""
+    database.execute("DELETE FROM daily_spend")
+    database.execute(
+        f"""
+        INSERT INTO daily_spend
+        (date, burn_rate_group, is_recurring, is_explosion, total_cents, txn_count)
+        {_AGGREGATE_SQL}
+        """
+    )
+
+
+def verify() -> list[dict]:
+    """Compare daily_spend with a fresh aggregate. Returns mismatched keys."""
+    expected = {
+        (r["date"], r["burn_rate_group"], r["is_recurring"], r["is_explosion"]): (
+            r["total_cents"],
+            r["txn_count"],
+        )
+        for r in database.fetchall(_AGGREGATE_SQL)
+    }
+    actual = {
+        (r["date"], r["burn_rate_group"], r["is_recurring"], r["is_explosion"]): (
+            r["total_cents"],
+            r["txn_count"],
+        )
+        for r in database.fetchall("SELECT * FROM daily_spend")
+    }
+
+    mismatches = []
+    for key in sorted(expected.keys() | actual.keys()):
+        if expected.get(key) != actual.get(key):
+            mismatches.append({
+                "date": key[0],
+                "burn_rate_group": key[1],
+                "is_recurring": key[2],
+                "is_explosion": key[3],
+                "expected": expected.get(key),
+                "actual": actual.get(key),
+            })
+    return mismatches
+
+
+def main(argv: list[str]) -> int:
+    """Command-line entry point: verify or rebuild the table."""
+    command = argv[0] if argv else "verify"
+    if command == "rebuild":
+        rebuild()
+        database.commit()
+        database.upload_database()
+        print("daily_spend rebuilt")
+        return 0
+    if command == "verify":
+        mismatches = verify()
+        for mismatch in mismatches:
+            print(mismatch)
+        print(f"{len(mismatches)} mismatched rows")
+        return 1 if mismatches else 0
+
+    print("usage: python -m src.daily_spend [verify|rebuild]")
+    return 2
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
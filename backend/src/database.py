@@ -2,22 +2,51 @@
 
 import logging
 import os
+import secrets
 import sqlite3
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import date
 from pathlib import Path
+from typing import Any
 
 import boto3
 from botocore.exceptions import ClientError
 
+from . import metrics, sqltrace
+from .migrations import MIGRATIONS, SCHEMA_VERSION
+from .serialize import Rows
+
 logger = logging.getLogger(__name__)
 
 # Global connection
 _connection: sqlite3.Connection | None = None
 _db_path: str | None = None
 
+# Callables run inside the transaction just before a commit that wrote data
+_commit_hooks: list[Callable[[], None]] = []
+
+# Callables run after each successful upload to S3
+_upload_hooks: list[Callable[[], None]] = []
+
+# Batch state: while a batch is open, commit() and upload_database() are deferred
+_batch_depth = 0
+_upload_pending = False
+
 # S3 configuration
 DATA_BUCKET = os.environ.get("DATA_BUCKET", "")
 DB_KEY = "burn-rate.db"
 
+# app_meta key of the token replaced by every committed write
+DATA_VERSION_KEY = "data_version"
+
+# app_meta key holding the latest upload purge cutoff as YYYYMMDD
+PURGED_BEFORE_KEY = "purged_before"
+
+# app_meta key set to the cutoff only while the purge deletes; aggregate triggers skip those deletes
+PURGING_BEFORE_KEY = "purging_before"
+
 
 def get_db_path() -> str:
     """Get the path to the SQLite database file."""
@@ -40,7 +69,8 @@ def download_database() -> bool:
     try:
         s3 = boto3.client("s3")
         db_path = get_db_path()
-        s3.download_file(DATA_BUCKET, DB_KEY, db_path)
+        with metrics.span("s3_download"):
+            s3.download_file(DATA_BUCKET, DB_KEY, db_path)
         logger.info(f"Downloaded database from s3://{DATA_BUCKET}/{DB_KEY}")
         return True
     except ClientError as e:
@@ -51,26 +81,46 @@ def download_database() -> bool:
 
 
 def upload_database() -> bool:
-    """Upload database to S3."""
+    """Upload database to S3. Deferred to the end of an open batch."""
+    global _upload_pending
+
+    if _batch_depth:
+        _upload_pending = True
+        return False
+
     if not DATA_BUCKET:
         logger.info("No DATA_BUCKET configured, skipping upload")
         return False
 
-    try:
-        s3 = boto3.client("s3")
-        db_path = get_db_path()
-        s3.upload_file(db_path, DATA_BUCKET, DB_KEY)
-        logger.info(f"Uploaded database to s3://{DATA_BUCKET}/{DB_KEY}")
-        return True
-    except ClientError as e:
-        logger.error(f"Failed to upload database: {e}")
-        raise
+    with metrics.span("upload"):
+        try:
+            s3 = boto3.client("s3")
+            db_path = get_db_path()
+            s3.upload_file(db_path, DATA_BUCKET, DB_KEY)
+            logger.info(f"Uploaded database to s3://{DATA_BUCKET}/{DB_KEY}")
+        except ClientError as e:
+            logger.error(f"Failed to upload database: {e}")
+            raise
+
+        for hook in _upload_hooks:
+            hook()
+    return True
+
+
+def add_upload_hook(hook: Callable[[], None]) -> None:
+    """Run hook after every successful database upload (i.e. once data is durable)."""
+    if hook not in _upload_hooks:
+        _upload_hooks.append(hook)
 
 
 def sync_from_s3() -> None:
     """Ensure local database is synced from S3. Call at start of each request."""
     global _connection
 
+    # Without a bucket the local file is the database (local development)
+    if not DATA_BUCKET:
+        return
+
     # Close existing connection if any
     if _connection is not None:
         _connection.close()
@@ -104,59 +154,213 @@ def get_connection() -> sqlite3.Connection:
     _connection.execute("PRAGMA foreign_keys = ON")
 
     # Initialize schema if needed
-    _init_schema(_connection)
+    with metrics.span("schema"):
+        _init_schema(_connection)
 
     return _connection
 
 
 def _init_schema(conn: sqlite3.Connection) -> None:
-    """Initialize database schema if tables don't exist."""
+    """Initialize database schema if tables don't exist, then apply migrations."""
     # Check if accounts table exists
     cursor = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='accounts'"
     )
     if cursor.fetchone() is not None:
-        return  # Schema already exists
+        _migrate(conn)
+        return
 
     logger.info("Initializing database schema")
     schema_path = Path(__file__).parent / "schema.sql"
     if schema_path.exists():
         with open(schema_path) as f:
             conn.executescript(f.read())
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
         logger.info("Schema initialized successfully")
     else:
         logger.warning("schema.sql not found, database will be empty")
 
 
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Bring an existing database up to SCHEMA_VERSION."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        logger.info(f"Migrating database schema to version {target}")
+        # Each step and its version bump commit together
+        conn.executescript(
+            f"BEGIN; {MIGRATIONS[target - 1]}; PRAGMA user_version = {target}; COMMIT;"
+        )
+
+
+def _traced(sql: str, run: Callable[[], Any], rows: Callable[[Any], int]) -> Any:
+    """Run a statement, recording it with sqltrace when tracing is enabled."""
+    if not sqltrace.ENABLED:
+        return run()
+    start = time.perf_counter()
+    result = run()
+    sqltrace.record(sql, time.perf_counter() - start, rows(result))
+    return result
+
+
 def execute(sql: str, params: tuple = ()) -> sqlite3.Cursor:
     """Execute a SQL statement."""
     conn = get_connection()
-    return conn.execute(sql, params)
+    return _traced(sql, lambda: conn.execute(sql, params), lambda c: max(c.rowcount, 0))
 
 
 def executemany(sql: str, params_list: list[tuple]) -> sqlite3.Cursor:
     """Execute a SQL statement with multiple parameter sets."""
     conn = get_connection()
-    return conn.executemany(sql, params_list)
+    return _traced(
+        sql, lambda: conn.executemany(sql, params_list), lambda c: max(c.rowcount, 0)
+    )
 
 
 def fetchone(sql: str, params: tuple = ()) -> sqlite3.Row | None:
     """Execute and fetch one result."""
-    cursor = execute(sql, params)
-    return cursor.fetchone()
+    conn = get_connection()
+    return _traced(
+        sql, lambda: conn.execute(sql, params).fetchone(), lambda row: int(row is not None)
+    )
 
 
 def fetchall(sql: str, params: tuple = ()) -> list[sqlite3.Row]:
     """Execute and fetch all results."""
-    cursor = execute(sql, params)
-    return cursor.fetchall()
+    conn = get_connection()
+    return _traced(sql, lambda: conn.execute(sql, params).fetchall(), len)
+
+
+def fetchrows(sql: str, params: tuple = ()) -> Rows:
+    """Execute and fetch all results as plain tuples, for serialization."""
+
+    def run() -> Rows:
+        cursor = get_connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        return Rows([column[0] for column in cursor.description], cursor.fetchall())
+
+    return _traced(sql, run, len)
+
+
+def add_commit_hook(hook: Callable[[], None]) -> None:
+    """
+    Run hook before every commit that wrote data, inside the same transaction.
+
+    Hooks may write; their changes are committed together with the caller's.
+    """
+    if hook not in _commit_hooks:
+        _commit_hooks.append(hook)
+
+
+def _commit(conn: sqlite3.Connection) -> None:
+    """Commit, running commit hooks and replacing the data version if anything was written."""
+    if conn.in_transaction:
+        for hook in _commit_hooks:
+            hook()
+        conn.execute(
+            """
+            INSERT INTO app_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+            (DATA_VERSION_KEY, secrets.randbits(62)),
+        )
+    conn.commit()
 
 
 def commit() -> None:
-    """Commit the current transaction."""
-    if _connection is not None:
+    """Commit the current transaction. Deferred to the end of an open batch."""
+    if _connection is not None and not _batch_depth:
+        with metrics.span("commit"):
+            _commit(_connection)
+
+
+def commit_bookkeeping() -> bool:
+    """
+    Commit writes that no read endpoint depends on (e.g. auth state).
+
+    Skips the commit hooks and leaves the data version alone, so cached
+    responses and ETags stay valid. Returns whether anything was written.
+    """
+    if _connection is None or not _connection.in_transaction:
+        return False
+    with metrics.span("commit"):
         _connection.commit()
+    return True
+
+
+def data_version() -> int:
+    """
+    Token replaced by every committed write; identifies a data state.
+
+    It is random rather than a counter: two containers committing on top of
+    the same downloaded database would both count N -> N+1, and whichever
+    upload lost would leave ETags and caches keyed by a version that names
+    different data elsewhere.
+    """
+    row = fetchone("SELECT value FROM app_meta WHERE key = ?", (DATA_VERSION_KEY,))
+    return row["value"] if row else 0
+
+
+def purged_before() -> date | None:
+    """Latest upload purge cutoff: transactions dated before it are gone. None before any purge."""
+    row = fetchone("SELECT value FROM app_meta WHERE key = ?", (PURGED_BEFORE_KEY,))
+    if row is None:
+        return None
+    value = str(row["value"])
+    return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+
+
+class BatchAborted(Exception):
+    """Raised inside batch() to roll back every write made in the batch."""
+
+    pass
+
+
+@contextmanager
+def batch() -> Iterator[None]:
+    """
+    Run several writes as one SQLite transaction with a single S3 upload.
+
+    commit() and upload_database() calls made inside the block are deferred.
+    On normal exit the transaction is committed once and, if any write asked
+    for it, the database is uploaded once. Any exception rolls everything
+    back; BatchAborted is swallowed after the rollback, others propagate.
+    """
+    global _batch_depth, _upload_pending
+
+    conn = get_connection()
+    if _batch_depth:
+        # Nested batches join the outer one
+        _batch_depth += 1
+        try:
+            yield
+        finally:
+            _batch_depth -= 1
+        return
+
+    _batch_depth = 1
+    _upload_pending = False
+    try:
+        yield
+    except BatchAborted:
+        conn.rollback()
+        return
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _batch_depth = 0
+        upload = _upload_pending
+        _upload_pending = False
+
+    with metrics.span("commit"):
+        _commit(conn)
+    if upload:
+        upload_database()
 
 
 def close() -> None:
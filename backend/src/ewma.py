@@ -0,0 +1,181 @@
+"""Exponentially weighted spending rates with persisted incremental state.
+
+For a half-life h the daily decay is lam = 0.5 ** (1 / h) and the rate as of
+day T is (1 - lam) * sum(lam ** (T - d) * spend[d] for d <= T), a smoothed
+daily rate that does not jump when one large charge leaves a fixed window.
+
+The rate is linear in daily spend, so it is maintained without rescanning:
+moving as_of forward k days multiplies it by lam ** k, and a change of x
+cents on day d adds (1 - lam) * lam ** (as_of - d) * x. Triggers on
+daily_spend journal every change; fold() applies the journal to ewma_state
+at commit, and rates() also applies any unfolded entries, so reads are
+exact either way.
+
+Days removed by the upload purge are not journaled (the triggers skip
+deletes while app_meta purging_before is set): they keep contributing, with
+ever smaller weight, instead of dropping out of the rates at once.
+"""
+
+from datetime import date, datetime
+
+from . import database
+
+# Half-lives (days) of the published rates; the shortest and longest drive the trend arrow
+HALF_LIVES = [7, 14, 28]
+
+# Groups tracked, with the same flag rules as the burn rate curves
+EWMA_GROUPS = ["food", "discretionary", "explosion"]
+
+
+def decay(half_life: int) -> float:
+    """Per-day decay factor for a half-life in days."""
+    return 0.5 ** (1 / half_life)
+
+
+def _state() -> dict[tuple[str, int], tuple[int, float]]:
+    """Persisted (as_of ordinal, rate in cents) per (group, half-life)."""
+    return {
+        (row["burn_rate_group"], row["half_life_days"]): (
+            date.fromisoformat(row["as_of"]).toordinal(),
+            row["rate_cents"],
+        )
+        for row in database.fetchall("SELECT * FROM ewma_state")
+    }
+
+
+def _pending() -> list:
+    return database.fetchall(
+        """
+        SELECT date, burn_rate_group, SUM(delta_cents) AS delta_cents
+        FROM ewma_journal
+        GROUP BY date, burn_rate_group
+        HAVING SUM(delta_cents) != 0
+        """
+    )
+
+
+def _apply(
+    state: dict[tuple[str, int], tuple[int, float]], pending: list
+) -> dict[tuple[str, int], tuple[int, float]]:
+    """State with journal entries applied, advancing as_of to the latest change."""
+    latest: dict[str, int] = {}
+    for row in pending:
+        day = date.fromisoformat(row["date"]).toordinal()
+        latest[row["burn_rate_group"]] = max(day, latest.get(row["burn_rate_group"], day))
+
+    result = {}
+    for group in EWMA_GROUPS:
+        for half_life in HALF_LIVES:
+            lam = decay(half_life)
+            as_of, rate = state.get((group, half_life), (latest.get(group, 0), 0.0))
+            target = max(as_of, latest.get(group, as_of))
+            rate *= lam ** (target - as_of)
+            for row in pending:
+                if row["burn_rate_group"] == group:
+                    days_ago = target - date.fromisoformat(row["date"]).toordinal()
+                    rate += (1 - lam) * lam ** days_ago * row["delta_cents"]
+            result[(group, half_life)] = (target, rate)
+    return result
+
+
+def fold() -> None:
+    """Apply journaled daily_spend changes to ewma_state and clear the journal."""
+    if database.fetchone("SELECT 1 FROM ewma_journal LIMIT 1") is None:
+        return
+
+    state = _apply(_state(), _pending())
+    database.executemany(
+        """
+        INSERT INTO ewma_state (burn_rate_group, half_life_days, as_of, rate_cents)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (burn_rate_group, half_life_days) DO UPDATE SET
+            as_of = excluded.as_of,
+            rate_cents = excluded.rate_cents
+        """,
+        [
+            (group, half_life, date.fromordinal(as_of).isoformat(), rate)
+            for (group, half_life), (as_of, rate) in state.items()
+            if as_of > 0
+        ],
+    )
+    database.execute("DELETE FROM ewma_journal")
+
+
+def _rewind(group: str, half_life: int, as_of: int, rate: float, today: int) -> float:
+    """Undo the decay and contributions of the days after today."""
+    lam = decay(half_life)
+    rows = database.fetchall(
+        """
+        SELECT date, SUM(total_cents) AS total_cents FROM daily_spend
+        WHERE burn_rate_group = ? AND date > ? AND date <= ?
+        AND (burn_rate_group = 'explosion' OR (is_recurring = 0 AND is_explosion = 0))
+        GROUP BY date
+        """,
+        (group, date.fromordinal(today).isoformat(), date.fromordinal(as_of).isoformat()),
+    )
+    for row in rows:
+        days_ago = as_of - date.fromisoformat(row["date"]).toordinal()
+        rate -= (1 - lam) * lam ** days_ago * row["total_cents"]
+    return rate * lam ** (today - as_of)
+
+
+def rates(today: date | None = None) -> dict[str, dict[int, float]]:
+    """Daily EWMA rates in dollars as of today: {group: {half_life: rate}}."""
+    if today is None:
+        today = datetime.now().date()
+    today_ordinal = today.toordinal()
+
+    state = _apply(_state(), _pending())
+    result: dict[str, dict[int, float]] = {group: {} for group in EWMA_GROUPS}
+    for (group, half_life), (as_of, rate) in state.items():
+        if as_of == 0:
+            rate = 0.0
+        elif today_ordinal >= as_of:
+            rate *= decay(half_life) ** (today_ordinal - as_of)
+        else:
+            rate = _rewind(group, half_life, as_of, rate, today_ordinal)
+        result[group][half_life] = round(max(rate, 0.0) / 100, 2)
+    return result
+
+
+def recompute(today: date) -> dict[str, dict[int, float]]:
+    """
+    Reference EWMA from a full scan of daily_spend; used to verify the state.
+
+    Purged days are no longer in daily_spend, so after a purge the state is
+    expected to exceed this by their decayed contribution.
+    """
+    rows = database.fetchall(
+        """
+        SELECT date, burn_rate_group, SUM(total_cents) AS total_cents FROM daily_spend
+        WHERE date <= ?
+        AND (burn_rate_group = 'explosion'
+             OR (burn_rate_group IN ('food', 'discretionary') AND is_recurring = 0 AND is_explosion = 0))
+        GROUP BY date, burn_rate_group
+        """,
+        (today.isoformat(),),
+    )
+    result: dict[str, dict[int, float]] = {group: {} for group in EWMA_GROUPS}
+    for group in EWMA_GROUPS:
+        for half_life in HALF_LIVES:
+            lam = decay(half_life)
+            rate = sum(
+                (1 - lam) * lam ** (today.toordinal() - date.fromisoformat(r["date"]).toordinal())
+                * r["total_cents"]
+                for r in rows
+                if r["burn_rate_group"] == group
+            )
+            result[group][half_life] = round(rate / 100, 2)
+    return result
+
+
+def arrow(group_rates: dict[int, float]) -> str:
+    """Trend arrow comparing the shortest half-life rate with the longest."""
+    if not group_rates:
+        return "neutral"
+    slope = group_rates[min(HALF_LIVES)] - group_rates[max(HALF_LIVES)]
+    if slope < -1:
+        return "improving"  # Recent spending below the longer trend
+    if slope > 1:
+        return "worsening"  # Recent spending above the longer trend
+    return "stable"
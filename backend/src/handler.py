@@ -1,36 +1,162 @@
 """Lambda handler for Burn Rate API."""
 
 import base64
+import gzip
 import json
 import logging
+import time
 import traceback
+from collections.abc import Callable
+from datetime import datetime
 from typing import Any
 
-from . import auth, csv_parser, database
+from . import (
+    auth,
+    burn_rate,
+    categories,
+    changes,
+    csv_parser,
+    daily_spend,
+    database,
+    ewma,
+    matching,
+    merchants,
+    metrics,
+    profiler,
+    recurring,
+    rollup,
+    router,
+    serialize,
+    snapshots,
+    sqltrace,
+    targets,
+    widget,
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Fold spending changes into the EWMA state and keep today's burn rate
+# snapshot current with every committed write
+database.add_commit_hook(ewma.fold)
+database.add_commit_hook(snapshots.record)
 
-def json_response(status_code: int, body: Any, headers: dict | None = None) -> dict:
-    """Create a JSON API response."""
+# Republish the widget document whenever new data reaches S3
+database.add_upload_hook(widget.publish)
+
+# Bodies shorter than this are sent uncompressed; the saving would not cover the overhead
+COMPRESS_MIN_BYTES = 1024
+
+# The API's only binary media type (template.yaml). API Gateway decodes a base64
+# body only for requests whose Accept matches it, so nothing else is compressed
+BINARY_MEDIA_TYPE = "application/json"
+
+
+def json_response(
+    status_code: int, body: Any, headers: dict | None = None, etag: str | None = None
+) -> dict:
+    """Create a JSON API response, tagged with an ETag if given."""
     response_headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,If-None-Match",
         "Access-Control-Allow-Methods": "GET,POST,PUT,DELETE,OPTIONS",
     }
+    if etag:
+        response_headers["ETag"] = etag
+        response_headers["Cache-Control"] = "private, no-cache"
+        response_headers["Access-Control-Expose-Headers"] = "ETag"
     if headers:
         response_headers.update(headers)
 
     return {
         "statusCode": status_code,
         "headers": response_headers,
-        "body": json.dumps(body) if body is not None else "",
+        "body": encode_body(body),
     }
 
 
+def encode_body(body: Any) -> str:
+    """Response body text, timed as the serialize phase."""
+    with metrics.span("serialize"):
+        return serialize.dumps(body) if body is not None else ""
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Content codings an Accept-Encoding header allows (q=0 excluded)."""
+    accepted = set()
+    for item in header.lower().split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = next((p[2:] for p in params if p.startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                accepted.add(coding)
+        except ValueError:
+            continue
+    return accepted
+
+
+def compress_response(event: dict, response: dict) -> dict:
+    """
+    Encode a response body with brotli or gzip if the client accepts it.
+
+    The body is base64 encoded and flagged for API Gateway, which decodes it
+    only when the request's first Accept media type is BINARY_MEDIA_TYPE;
+    other requests get the body as it is. Bodies under COMPRESS_MIN_BYTES
+    are left as they are; brotli is used only when the module is installed.
+    """
+    body = response.get("body")
+    if not body or response.get("isBase64Encoded") or len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    headers = event.get("headers") or {}
+    accept = headers.get("Accept") or headers.get("accept") or ""
+    if accept.split(",")[0].split(";")[0].strip().lower() != BINARY_MEDIA_TYPE:
+        return response
+    accepted = _accepted_encodings(
+        headers.get("Accept-Encoding") or headers.get("accept-encoding") or ""
+    )
+    with metrics.span("serialize"):
+        if brotli is not None and "br" in accepted:
+            encoding, data = "br", brotli.compress(body.encode(), quality=5)
+        elif "gzip" in accepted or "*" in accepted:
+            encoding, data = "gzip", gzip.compress(body.encode(), compresslevel=6)
+        else:
+            return response
+
+    return {
+        **response,
+        "headers": {**response["headers"], "Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        "body": base64.b64encode(data).decode(),
+        "isBase64Encoded": True,
+    }
+
+
+def conditional_response(event: dict, etag: str, build: Callable[[], Any]) -> dict:
+    """
+    Respond 304 with no body if the client already has this ETag.
+
+    build() is only called when the client's copy is stale, so unchanged
+    polls skip the computation entirely.
+    """
+    headers = event.get("headers") or {}
+    if_none_match = headers.get("If-None-Match") or headers.get("if-none-match") or ""
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return json_response(304, None, etag=etag)
+    return json_response(200, build(), etag=etag)
+
+
+def data_etag(name: str, *parts: Any) -> str:
+    """ETag for a read endpoint derived from the current data version."""
+    return '"' + "-".join(str(p) for p in (name, database.data_version(), *parts)) + '"'
+
+
 def error_response(status_code: int, message: str, code: str | None = None) -> dict:
     """Create an error response."""
     body = {"error": message}
@@ -71,8 +197,38 @@ def check_auth(event: dict) -> bool:
     return is_valid
 
 
+def normalize_path(path: str) -> str:
+    """Strip the trailing slash and optional /api prefix from a request path."""
+    normalized_path = path.rstrip("/")
+    if normalized_path.startswith("/api"):
+        normalized_path = normalized_path[4:]
+    return normalized_path
+
+
 def lambda_handler(event: dict, context: Any) -> dict:
-    """Main Lambda entry point."""
+    """Main Lambda entry point; profiles the request when asked to (see profiler)."""
+    if profiler.ENABLED or (profiler.signed(event) and check_auth(event)):
+        return profiler.run(event, lambda: timed_request(event, context))
+    return timed_request(event, context)
+
+
+def timed_request(event: dict, context: Any) -> dict:
+    """Handle a request, emitting its phase timings and SQL summary."""
+    metrics.reset()
+    sqltrace.reset()
+    start = time.perf_counter()
+    response = handle_request(event)
+    metrics.emit(
+        response["statusCode"],
+        time.perf_counter() - start,
+        getattr(context, "aws_request_id", None),
+    )
+    sqltrace.log_summary(metrics.route())
+    return response
+
+
+def handle_request(event: dict) -> dict:
+    """Sync the database, authenticate and route one API Gateway event."""
     try:
         # Sync database from S3 at start of each request
         database.sync_from_s3()
@@ -84,100 +240,46 @@ def lambda_handler(event: dict, context: Any) -> dict:
 
         # Handle CORS preflight
         if http_method == "OPTIONS":
+            metrics.set_route("OPTIONS")
             return json_response(200, None)
 
-        # Normalize path
-        normalized_path = path.rstrip("/")
-        if normalized_path.startswith("/api"):
-            normalized_path = normalized_path[4:]
+        normalized_path = normalize_path(path)
 
         # Route to handlers
         if normalized_path in ["/health", ""]:
+            metrics.set_route("GET /health")
             return handle_health(event)
 
         if normalized_path == "/auth/login" and http_method == "POST":
+            metrics.set_route("POST /auth/login")
             return handle_login(event)
 
+        if normalized_path == "/auth/refresh" and http_method == "POST":
+            metrics.set_route("POST /auth/refresh")
+            return handle_refresh(event)
+
+        if normalized_path == "/auth/logout" and http_method == "POST":
+            metrics.set_route("POST /auth/logout")
+            return handle_logout(event)
+
         # All other routes require authentication
-        if not check_auth(event):
+        with metrics.span("auth"):
+            authenticated = check_auth(event)
+        if not authenticated:
             return error_response(401, "Authentication required", "UNAUTHORIZED")
 
-        # Transaction routes
-        if normalized_path == "/transactions/upload" and http_method == "POST":
-            return handle_upload(event)
-
-        if normalized_path == "/transactions" and http_method == "GET":
-            return handle_get_transactions(event)
-
-        if normalized_path == "/transactions/review-queue" and http_method == "GET":
-            return handle_review_queue(event)
-
-        if normalized_path.startswith("/transactions/") and http_method == "PUT":
-            # Extract transaction ID
-            parts = normalized_path.split("/")
-            if len(parts) >= 3 and parts[2].isdigit():
-                if len(parts) == 4 and parts[3] == "categorize":
-                    return handle_categorize(event, int(parts[2]))
-
-        # Category routes
-        if normalized_path == "/categories":
-            if http_method == "GET":
-                return handle_get_categories(event)
-            if http_method == "POST":
-                return handle_create_category(event)
-
-        if normalized_path.startswith("/categories/"):
-            parts = normalized_path.split("/")
-            if len(parts) == 3 and parts[2].isdigit():
-                cat_id = int(parts[2])
-                if http_method == "PUT":
-                    return handle_update_category(event, cat_id)
-                if http_method == "DELETE":
-                    return handle_delete_category(event, cat_id)
-
-        # Account routes
-        if normalized_path == "/accounts" and http_method == "GET":
-            return handle_get_accounts(event)
-
-        # Status route (for iOS)
-        if normalized_path == "/status" and http_method == "GET":
-            return handle_status(event)
-
-        # Rules routes
-        if normalized_path == "/rules":
-            if http_method == "GET":
-                return handle_get_rules(event)
-            if http_method == "POST":
-                return handle_create_rule(event)
-
-        if normalized_path.startswith("/rules/"):
-            parts = normalized_path.split("/")
-            if len(parts) == 3 and parts[2].isdigit():
-                rule_id = int(parts[2])
-                if http_method == "PUT":
-                    return handle_update_rule(event, rule_id)
-                if http_method == "DELETE":
-                    return handle_delete_rule(event, rule_id)
-
-        # Transaction recurring/explosion toggle
-        if normalized_path.startswith("/transactions/") and http_method == "PATCH":
-            parts = normalized_path.split("/")
-            if len(parts) == 4 and parts[2].isdigit():
-                txn_id = int(parts[2])
-                if parts[3] == "recurring":
-                    return handle_toggle_recurring(event, txn_id)
-                if parts[3] == "explosion":
-                    return handle_toggle_explosion(event, txn_id)
-
-        # Burn rate routes (Phase 3)
-        if normalized_path == "/burn-rate" and http_method == "GET":
-            return handle_get_burn_rate(event)
-
-        if normalized_path == "/feedback" and http_method == "POST":
-            return handle_submit_feedback(event)
-
-        if normalized_path == "/targets" and http_method == "GET":
-            return handle_get_targets(event)
+        if normalized_path == "/batch" and http_method == "POST":
+            metrics.set_route("POST /batch")
+            with metrics.span("handler"):
+                response = handle_batch(event)
+            return compress_response(event, response)
+
+        route = ROUTER.match(http_method, normalized_path)
+        if route is not None:
+            metrics.set_route(route.name)
+            with metrics.span("handler"):
+                response = route(event)
+            return compress_response(event, response)
 
         return error_response(404, f"Not found: {http_method} {path}", "NOT_FOUND")
 
@@ -187,6 +289,86 @@ def lambda_handler(event: dict, context: Any) -> dict:
         return error_response(500, "Internal server error", "INTERNAL_ERROR")
 
 
+def dispatch(event: dict, http_method: str, normalized_path: str) -> dict | None:
+    """Route an authenticated request to its handler. Returns None if no route matches."""
+    route = ROUTER.match(http_method, normalized_path)
+    return route(event) if route is not None else None
+
+
+MAX_BATCH_OPERATIONS = 500
+BATCH_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+BATCH_EXCLUDED_PATHS = {
+    "/batch",
+    "/auth/login",
+    "/auth/refresh",
+    "/auth/logout",
+    "/transactions/upload",
+}
+
+
+def handle_batch(event: dict) -> dict:
+    """
+    Apply an ordered list of write operations atomically.
+
+    Each operation is {"method", "path", "body"?} and is dispatched through
+    the regular route handlers inside one SQLite transaction. If any
+    operation fails, every earlier one is rolled back. The database is
+    committed and uploaded at most once for the whole batch.
+    """
+    body = parse_body(event)
+    if not body:
+        return error_response(400, "Request body required")
+
+    operations = body.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return error_response(400, "operations must be a non-empty list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return error_response(400, f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    # Validate every operation before touching the database
+    op_events = []
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict):
+            return error_response(400, f"Operation {index} must be an object")
+        method = str(op.get("method", "")).upper()
+        path = normalize_path(str(op.get("path", "")))
+        if method not in BATCH_METHODS or path in BATCH_EXCLUDED_PATHS:
+            return error_response(400, f"Operation {index} not allowed in batch: {method} {path}")
+        op_body = op.get("body")
+        op_events.append((method, path, {
+            "httpMethod": method,
+            "path": path,
+            "body": json.dumps(op_body) if op_body is not None else None,
+            "headers": event.get("headers"),
+        }))
+
+    results = []
+    failed_index = None
+    with database.batch():
+        for index, (method, path, op_event) in enumerate(op_events):
+            response = dispatch(op_event, method, path)
+            if response is None:
+                response = error_response(404, f"Not found: {method} {path}", "NOT_FOUND")
+
+            results.append({
+                "status": response["statusCode"],
+                "body": json.loads(response["body"]) if response["body"] else None,
+            })
+            if response["statusCode"] >= 400:
+                failed_index = index
+                raise database.BatchAborted()
+
+    if failed_index is not None:
+        return json_response(400, {
+            "error": f"Operation {failed_index} failed, batch rolled back",
+            "code": "BATCH_FAILED",
+            "failed_index": failed_index,
+            "results": results,
+        })
+
+    return json_response(200, {"success": True, "results": results})
+
+
 # --- Route Handlers ---
 
 
@@ -215,8 +397,42 @@ def handle_login(event: dict) -> dict:
     if not auth.verify_password(password):
         return error_response(401, "Invalid password", "INVALID_PASSWORD")
 
-    token = auth.generate_token()
-    return json_response(200, {"token": token})
+    session = auth.start_session()
+    if database.commit_bookkeeping():
+        database.upload_database()
+    return json_response(200, session)
+
+
+def handle_refresh(event: dict) -> dict:
+    """Exchange a refresh token for a new access token and refresh token."""
+    body = parse_body(event)
+    if not body or not body.get("refresh_token"):
+        return error_response(400, "refresh_token required")
+
+    session = auth.refresh_session(body["refresh_token"])
+    # A rotation or a revocation may have been written either way
+    if database.commit_bookkeeping():
+        database.upload_database()
+    if session is None:
+        return error_response(401, "Invalid refresh token", "INVALID_REFRESH_TOKEN")
+    return json_response(200, session)
+
+
+def handle_logout(event: dict) -> dict:
+    """Revoke the session of a refresh token, so neither it nor its successors renew."""
+    body = parse_body(event)
+    if not body or not body.get("refresh_token"):
+        return error_response(400, "refresh_token required")
+
+    if not auth.end_session(body["refresh_token"]):
+        return error_response(401, "Invalid refresh token", "INVALID_REFRESH_TOKEN")
+    if database.commit_bookkeeping():
+        database.upload_database()
+    return json_response(200, {"success": True})
+
+
+# Days of transactions kept by each upload's purge
+RETENTION_DAYS = 30
 
 
 def handle_upload(event: dict) -> dict:
@@ -247,21 +463,47 @@ def handle_upload(event: dict) -> dict:
     except csv_parser.CSVParseError as e:
         return error_response(400, f"CSV parse error: {e}")
 
-    # Purge transactions older than 30 days
-    cutoff_date = (datetime.now().date() - timedelta(days=30)).isoformat()
+    # Purge transactions older than 30 days. Setting purging_before around the
+    # delete keeps it out of monthly_rollup and the EWMA state (see schema.sql);
+    # their hashes are kept so a later upload does not ingest them again
+    cutoff = datetime.now().date() - timedelta(days=RETENTION_DAYS)
+    cutoff_date = cutoff.isoformat()
+    for key, update in (
+        (database.PURGED_BEFORE_KEY, "MAX(value, excluded.value)"),
+        (database.PURGING_BEFORE_KEY, "excluded.value"),
+    ):
+        database.execute(
+            f"""
+            INSERT INTO app_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = {update}
+            """,
+            (key, int(cutoff.strftime("%Y%m%d"))),
+        )
+    database.execute(
+        "INSERT OR IGNORE INTO purged_hashes (dedup_hash) "
+        "SELECT dedup_hash FROM transactions WHERE date < ?",
+        (cutoff_date,),
+    )
     purge_result = database.execute(
         "DELETE FROM transactions WHERE date < ?", (cutoff_date,)
     )
     purged_count = purge_result.rowcount if purge_result else 0
+    database.execute("DELETE FROM app_meta WHERE key = ?", (database.PURGING_BEFORE_KEY,))
+    # Tombstones of earlier purges age out of delta sync
+    changes.compact()
 
     # Insert transactions, skipping duplicates
     new_count = 0
     duplicate_count = 0
 
     for txn in transactions:
-        # Check for duplicate
+        # Check for duplicate, including rows ingested before and since purged
         existing = database.fetchone(
-            "SELECT id FROM transactions WHERE dedup_hash = ?", (txn.dedup_hash,)
+            """
+            SELECT 1 FROM transactions WHERE dedup_hash = ?
+            UNION ALL SELECT 1 FROM purged_hashes WHERE dedup_hash = ?
+            """,
+            (txn.dedup_hash, txn.dedup_hash),
         )
         if existing:
             duplicate_count += 1
@@ -285,9 +527,15 @@ def handle_upload(event: dict) -> dict:
         )
         new_count += 1
 
+    # Link transfers and card payments across accounts before rules run
+    transfers_matched = matching.match_transfers()
+
     # Apply auto-categorization rules to new transactions
     categorized_count = _apply_rules_to_uncategorized()
 
+    # Detect recurring charges once here so read paths never pay for it
+    recurring_marked = recurring.detect_recurring()
+
     database.commit()
     database.upload_database()
 
@@ -302,6 +550,8 @@ def handle_upload(event: dict) -> dict:
             "new_count": new_count,
             "duplicate_count": duplicate_count,
             "categorized_count": categorized_count,
+            "transfers_matched": transfers_matched,
+            "recurring_marked": recurring_marked,
             "needs_review_count": needs_review["count"] if needs_review else 0,
             "purged_count": purged_count,
         },
@@ -336,12 +586,84 @@ def _apply_rules_to_uncategorized() -> int:
     return categorized_count
 
 
+# Fields the transaction list endpoints can project with ?fields=, as SQL expressions
+TRANSACTION_FIELDS = {
+    **{
+        column: f"t.{column}"
+        for column in [
+            "id", "account_id", "date", "description", "amount", "category_id", "needs_review",
+            "is_recurring", "is_explosion", "reference_number", "dedup_hash", "created_at",
+        ]
+    },
+    "category_name": "c.name",
+    "account_name": "a.name",
+}
+
+
+def select_fields(params: dict, default: str, available: list[str], required: list[str]) -> str:
+    """
+    SQL select list for the fields query parameter, or default if it is absent.
+
+    fields is a comma-separated subset of available; the required fields
+    are always included. Raises ValueError for an unknown field.
+    """
+    if not params.get("fields"):
+        return default
+    fields = [f.strip() for f in params["fields"].split(",") if f.strip()]
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    selected = required + [f for f in dict.fromkeys(fields) if f not in required]
+    return ", ".join(f"{TRANSACTION_FIELDS[f]} AS {f}" for f in selected)
+
+
+def encode_cursor(date: str, row_id: int) -> str:
+    """Opaque continuation token for the position after (date, id)."""
+    raw = json.dumps([date, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[str, int]:
+    """Inverse of encode_cursor; raises ValueError for a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        date, row_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(date, str) or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return date, row_id
+
+
 def handle_get_transactions(event: dict) -> dict:
-    """Get transactions with optional filters."""
+    """
+    Get transactions with optional filters, newest first.
+
+    Pages by keyset on (date, id): pass the previous response's next_cursor
+    as cursor to continue. next_cursor is null on the last page.
+    format=columnar returns transactions as {"columns": [...], "rows": [[...]]};
+    fields limits each row to the listed TRANSACTION_FIELDS (id and date are
+    always included).
+    """
     params = event.get("queryStringParameters") or {}
+    try:
+        columnar = serialize.wants_columnar(params)
+        columns = select_fields(
+            params,
+            "t.*, c.name as category_name, a.name as account_name",
+            list(TRANSACTION_FIELDS),
+            ["id", "date"],
+        )
+    except ValueError as e:
+        return error_response(400, str(e))
+
+    try:
+        limit = max(1, min(int(params.get("limit", 100)), 1000))
+    except ValueError:
+        return error_response(400, "limit must be an integer")
 
     # Build query
-    query = "SELECT t.*, c.name as category_name, a.name as account_name FROM transactions t"
+    query = f"SELECT {columns} FROM transactions t"
     query += " LEFT JOIN categories c ON t.category_id = c.id"
     query += " LEFT JOIN accounts a ON t.account_id = a.id"
     query += " WHERE 1=1"
@@ -369,21 +691,85 @@ def handle_get_transactions(event: dict) -> dict:
         query += " AND t.date <= ?"
         query_params.append(params["end_date"])
 
+    if params.get("cursor"):
+        try:
+            cursor_date, cursor_id = decode_cursor(params["cursor"])
+        except ValueError:
+            return error_response(400, "Invalid cursor")
+        query += " AND (t.date, t.id) < (?, ?)"
+        query_params.extend([cursor_date, cursor_id])
+
     query += " ORDER BY t.date DESC, t.id DESC"
 
-    # Apply limit
-    limit = min(int(params.get("limit", 100)), 1000)
-    offset = int(params.get("offset", 0))
-    query += f" LIMIT {limit} OFFSET {offset}"
+    # Fetch one extra row to learn whether another page follows
+    query += " LIMIT ?"
+    query_params.append(limit + 1)
 
-    transactions = database.fetchall(query, tuple(query_params))
+    transactions = database.fetchrows(query, tuple(query_params))
+    transactions.columnar = columnar
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last["date"], last["id"])
 
-    return json_response(200, {"transactions": database.dicts_from_rows(transactions)})
+    return json_response(200, {"transactions": transactions, "next_cursor": next_cursor})
+
+
+def handle_get_rollup(event: dict) -> dict:
+    """
+    Get spent/income totals by month, group, category and/or account.
+
+    Query parameters: by (comma-separated dimensions, default month,group),
+    start and end (YYYY-MM, default the last 12 months) and optional
+    group, category_id and account_id filters.
+    """
+    import re
+
+    params = event.get("queryStringParameters") or {}
+    dimensions = params["by"].split(",") if params.get("by") else rollup.DEFAULT_DIMENSIONS
+    if any(d not in rollup.DIMENSIONS for d in dimensions):
+        return error_response(400, f"by must be from: {', '.join(rollup.DIMENSIONS)}")
+
+    today = datetime.now().date()
+    first_month = today.year * 12 + today.month - 12  # 11 months before this one
+    end = params.get("end") or today.strftime("%Y-%m")
+    start = params.get("start") or f"{first_month // 12}-{first_month % 12 + 1:02d}"
+    if not all(re.fullmatch(r"\d{4}-\d{2}", m) for m in (start, end)):
+        return error_response(400, "start and end must be YYYY-MM")
+
+    try:
+        category_id = int(params["category_id"]) if params.get("category_id") else None
+        account_id = int(params["account_id"]) if params.get("account_id") else None
+    except ValueError:
+        return error_response(400, "category_id and account_id must be integers")
+
+    def build() -> dict:
+        rows = rollup.rollup(
+            dimensions, start, end, params.get("group"), category_id, account_id
+        )
+        return {"by": dimensions, "start": start, "end": end, "rows": rows}
+
+    etag = data_etag(
+        "rollup", ".".join(dimensions), start, end,
+        params.get("group") or "", category_id or "", account_id or "",
+    )
+    return conditional_response(event, etag, build)
 
 
 def handle_review_queue(event: dict) -> dict:
-    """Get transactions needing review."""
+    """Get transactions needing review; format and fields as for /transactions."""
     params = event.get("queryStringParameters") or {}
+    try:
+        columnar = serialize.wants_columnar(params)
+        columns = select_fields(
+            params,
+            "t.*, a.name as account_name",
+            [f for f in TRANSACTION_FIELDS if f != "category_name"],
+            ["id"],
+        )
+    except ValueError as e:
+        return error_response(400, str(e))
     sort_by = params.get("sort", "description")  # Default to description
 
     # Map sort options to SQL
@@ -394,9 +780,9 @@ def handle_review_queue(event: dict) -> dict:
     }
     order_clause = sort_map.get(sort_by, sort_map["description"])
 
-    transactions = database.fetchall(
+    transactions = database.fetchrows(
         f"""
-        SELECT t.*, a.name as account_name
+        SELECT {columns}
         FROM transactions t
         LEFT JOIN accounts a ON t.account_id = a.id
         WHERE t.needs_review = 1
@@ -404,8 +790,122 @@ def handle_review_queue(event: dict) -> dict:
         LIMIT 100
         """
     )
+    transactions.columnar = columnar
+
+    return json_response(200, {"transactions": transactions})
+
+
+REVIEW_GROUPINGS = {
+    "merchant": merchants.merchant_key,
+    "description": merchants.normalize_description,
+}
+
 
-    return json_response(200, {"transactions": database.dicts_from_rows(transactions)})
+def _review_groups(group_by: str) -> dict[str, list]:
+    """Group all needs_review transactions by normalized key, oldest first."""
+    key_func = REVIEW_GROUPINGS[group_by]
+    rows = database.fetchall(
+        """
+        SELECT t.id, t.date, t.description, t.amount, t.account_id, a.name as account_name
+        FROM transactions t
+        LEFT JOIN accounts a ON t.account_id = a.id
+        WHERE t.needs_review = 1
+        ORDER BY t.date ASC, t.id ASC
+        """
+    )
+
+    groups: dict[str, list] = {}
+    for row in rows:
+        groups.setdefault(key_func(row["description"]), []).append(row)
+    return groups
+
+
+def handle_review_queue_groups(event: dict) -> dict:
+    """Get the review queue aggregated by normalized merchant or description."""
+    params = event.get("queryStringParameters") or {}
+    group_by = params.get("group_by", "merchant")
+    sort_by = params.get("sort", "count")
+
+    if group_by not in REVIEW_GROUPINGS:
+        return error_response(400, "group_by must be one of: merchant, description")
+
+    result = []
+    for key, rows in _review_groups(group_by).items():
+        result.append({
+            "key": key,
+            "sample_description": rows[-1]["description"],
+            "count": len(rows),
+            "total": round(sum(float(r["amount"]) for r in rows), 2),
+            "first_date": rows[0]["date"],
+            "last_date": rows[-1]["date"],
+            "account_names": sorted({r["account_name"] for r in rows if r["account_name"]}),
+            "transaction_ids": [r["id"] for r in rows],
+        })
+
+    sort_map = {
+        "count": lambda g: (-g["count"], g["key"]),
+        "total": lambda g: (-abs(g["total"]), g["key"]),
+        "description": lambda g: g["key"],
+    }
+    result.sort(key=sort_map.get(sort_by, sort_map["count"]))
+
+    return json_response(200, {"group_by": group_by, "groups": result})
+
+
+def handle_categorize_review_group(event: dict) -> dict:
+    """Categorize every needs_review transaction in a group with one commit."""
+    body = parse_body(event)
+    if not body:
+        return error_response(400, "Request body required")
+
+    key = body.get("key")
+    group_by = body.get("group_by", "merchant")
+    category_id = body.get("category_id")
+    create_rule = body.get("create_rule", False)
+
+    if not key or not category_id:
+        return error_response(400, "key and category_id required")
+    if group_by not in REVIEW_GROUPINGS:
+        return error_response(400, "group_by must be one of: merchant, description")
+
+    category = database.fetchone("SELECT * FROM categories WHERE id = ?", (category_id,))
+    if not category:
+        return error_response(404, "Category not found")
+
+    rows = _review_groups(group_by).get(key)
+    if not rows:
+        return error_response(404, "Review group not found")
+
+    database.executemany(
+        "UPDATE transactions SET category_id = ?, needs_review = 0 WHERE id = ?",
+        [(category_id, r["id"]) for r in rows],
+    )
+
+    # Optionally create a rule from the group's shared description prefix
+    rule_pattern = None
+    auto_categorized = 0
+    if create_rule:
+        rule_pattern = merchants.common_pattern([r["description"] for r in rows]) or None
+        if rule_pattern:
+            existing_rule = database.fetchone(
+                "SELECT id FROM rules WHERE pattern = ?", (rule_pattern,)
+            )
+            if not existing_rule:
+                database.execute(
+                    "INSERT INTO rules (pattern, category_id, priority) VALUES (?, ?, 100)",
+                    (rule_pattern, category_id),
+                )
+                auto_categorized = _apply_rules_to_uncategorized()
+
+    database.commit()
+    database.upload_database()
+
+    return json_response(200, {
+        "success": True,
+        "categorized": len(rows),
+        "rule_pattern": rule_pattern,
+        "auto_categorized": auto_categorized,
+    })
 
 
 def handle_categorize(event: dict, transaction_id: int) -> dict:
@@ -492,10 +992,16 @@ def handle_create_category(event: dict) -> dict:
     if existing:
         return error_response(409, "Category with this name already exists")
 
+    if parent_id is not None:
+        parent = database.fetchone("SELECT id FROM categories WHERE id = ?", (parent_id,))
+        if not parent:
+            return error_response(404, "Parent category not found")
+
     cursor = database.execute(
         "INSERT INTO categories (name, burn_rate_group, parent_id) VALUES (?, ?, ?)",
         (name, burn_rate_group, parent_id),
     )
+    categories.add_category(cursor.lastrowid, parent_id)
 
     database.commit()
     database.upload_database()
@@ -528,10 +1034,25 @@ def handle_update_category(event: dict, category_id: int) -> dict:
     if existing:
         return error_response(409, "Category with this name already exists")
 
+    if parent_id != category["parent_id"]:
+        if parent_id is not None:
+            parent = database.fetchone("SELECT id FROM categories WHERE id = ?", (parent_id,))
+            if not parent:
+                return error_response(404, "Parent category not found")
+        try:
+            categories.move_category(category_id, parent_id)
+        except categories.CategoryCycleError as e:
+            return error_response(400, str(e))
+
     database.execute(
         "UPDATE categories SET name = ?, burn_rate_group = ?, parent_id = ? WHERE id = ?",
         (name, burn_rate_group, parent_id, category_id),
     )
+    categories.invalidate()
+
+    # Regrouping moves existing spend between groups
+    if burn_rate_group != category["burn_rate_group"] or parent_id != category["parent_id"]:
+        daily_spend.rebuild()
 
     database.commit()
     database.upload_database()
@@ -557,11 +1078,16 @@ def handle_delete_category(event: dict, category_id: int) -> dict:
     returned_to_review = txn_result.rowcount if txn_result else 0
 
     # Check for child categories - reassign to no parent
+    categories.remove_category(category_id)
     database.execute(
         "UPDATE categories SET parent_id = NULL WHERE parent_id = ?", (category_id,)
     )
 
     database.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+
+    # Detached children now resolve to their own groups
+    daily_spend.rebuild()
+
     database.commit()
     database.upload_database()
 
@@ -579,23 +1105,7 @@ def handle_get_accounts(event: dict) -> dict:
 
 def handle_status(event: dict) -> dict:
     """Get status for iOS app."""
-    # Get last transaction date
-    last_txn = database.fetchone(
-        "SELECT MAX(created_at) as last_update FROM transactions"
-    )
-
-    # Get pending review count
-    review_count = database.fetchone(
-        "SELECT COUNT(*) as count FROM transactions WHERE needs_review = 1"
-    )
-
-    return json_response(
-        200,
-        {
-            "last_update": last_txn["last_update"] if last_txn else None,
-            "pending_review_count": review_count["count"] if review_count else 0,
-        },
-    )
+    return conditional_response(event, data_etag("status"), widget.status_counts)
 
 
 # --- Phase 2: Rules Management ---
@@ -742,109 +1252,85 @@ def handle_toggle_explosion(event: dict, transaction_id: int) -> dict:
 
 
 def handle_get_burn_rate(event: dict) -> dict:
-    """Get current burn rate curves for all groups (food, discretionary, explosion)."""
-    from datetime import datetime, timedelta
+    """
+    Get burn rate curves (food, discretionary, explosion).
 
-    today = datetime.now().date()
-    result = {}
+    Optional query parameters: as_of (YYYY-MM-DD, default today), group
+    (one group) and windows (comma-separated days, default 5-30).
+    """
+    from datetime import date
 
-    for group in ["food", "discretionary", "explosion"]:
-        # Get target (explosion has no target)
-        if group == "explosion":
-            target = 0
-        else:
-            target_row = database.fetchone(
-                "SELECT daily_target FROM targets WHERE burn_rate_group = ?", (group,)
+    params = event.get("queryStringParameters") or {}
+    group = params.get("group")
+    if group is not None and group not in burn_rate.GROUPS:
+        return error_response(400, "group must be 'food', 'discretionary' or 'explosion'")
+
+    try:
+        today = date.fromisoformat(params["as_of"]) if params.get("as_of") else datetime.now().date()
+    except ValueError:
+        return error_response(400, "as_of must be YYYY-MM-DD")
+
+    windows = None
+    if params.get("windows"):
+        try:
+            windows = burn_rate.validate_windows([int(w) for w in params["windows"].split(",")])
+        except ValueError:
+            return error_response(
+                400, f"windows must be comma-separated days between 1 and {burn_rate.MAX_WINDOW}"
             )
-            target = float(target_row["daily_target"]) if target_row else 0
 
-        # Get category IDs for this group
-        categories = database.fetchall(
-            "SELECT id FROM categories WHERE burn_rate_group = ?", (group,)
-        )
-        cat_ids = [c["id"] for c in categories]
+    groups = [group] if group else None
+    version = database.data_version()
+    etag = data_etag(
+        "burn-rate",
+        today.isoformat(),
+        group or "all",
+        ".".join(map(str, windows)) if windows else "default",
+    )
+    return conditional_response(
+        event, etag, lambda: burn_rate.cached_burn_rate(version, today, groups, windows)
+    )
 
-        if not cat_ids:
-            result[group] = {"curve": [], "target": target, "arrow": "neutral"}
-            continue
 
-        # Compute burn rate for windows 5-30 days
-        curve = []
-        for window in range(5, 31):
-            start_date = (today - timedelta(days=window)).isoformat()
-            end_date = today.isoformat()
-
-            # Sum expenses in this window (negative amounts = expenses)
-            # For explosion, we don't filter out is_explosion flag
-            placeholders = ",".join("?" * len(cat_ids))
-            if group == "explosion":
-                row = database.fetchone(
-                    f"""
-                    SELECT COALESCE(SUM(ABS(amount)), 0) as total
-                    FROM transactions
-                    WHERE category_id IN ({placeholders})
-                    AND date >= ? AND date <= ?
-                    AND amount < 0
-                    """,
-                    (*cat_ids, start_date, end_date),
-                )
-            else:
-                row = database.fetchone(
-                    f"""
-                    SELECT COALESCE(SUM(ABS(amount)), 0) as total
-                    FROM transactions
-                    WHERE category_id IN ({placeholders})
-                    AND date >= ? AND date <= ?
-                    AND is_recurring = 0
-                    AND is_explosion = 0
-                    AND amount < 0
-                    """,
-                    (*cat_ids, start_date, end_date),
-                )
+def handle_burn_rate_history(event: dict) -> dict:
+    """Get burn rate snapshots over a date range, downsampled by resolution."""
+    from datetime import date, timedelta
 
-            total = float(row["total"]) if row else 0
-            daily_rate = total / window
-            deviation = daily_rate - target
+    params = event.get("queryStringParameters") or {}
+    resolution = params.get("resolution", "daily")
+    group = params.get("group")
 
-            curve.append({
-                "window": window,
-                "daily_rate": round(daily_rate, 2),
-                "deviation": round(deviation, 2),
-            })
+    if resolution not in snapshots.RESOLUTIONS:
+        return error_response(400, "resolution must be daily, weekly or monthly")
+    if group is not None and group not in snapshots.SNAPSHOT_GROUPS:
+        return error_response(400, "group must be 'food' or 'discretionary'")
 
-        # Compute arrow (slope of last 5 points)
-        if len(curve) >= 5:
-            recent = [p["daily_rate"] for p in curve[-5:]]
-            slope = (recent[-1] - recent[0]) / 4
-            if slope < -1:
-                arrow = "improving"  # Spending trending down
-            elif slope > 1:
-                arrow = "worsening"  # Spending trending up
-            else:
-                arrow = "stable"
-        else:
-            arrow = "neutral"
-
-        # Calculate 30-day total for explosion
-        total_30day = 0
-        if group == "explosion" and len(curve) > 0:
-            total_30day = round(curve[-1]["daily_rate"] * 30, 2)
-
-        result[group] = {
-            "curve": curve,
-            "target": target,
-            "arrow": arrow,
-            "current_14day": curve[9]["daily_rate"] if len(curve) > 9 else 0,  # 14-day is index 9
-            "total_30day": total_30day,
+    try:
+        end = date.fromisoformat(params["end"]) if params.get("end") else datetime.now().date()
+        start = date.fromisoformat(params["start"]) if params.get("start") else end - timedelta(days=90)
+        window = int(params["window"]) if params.get("window") else None
+    except ValueError:
+        return error_response(400, "start and end must be YYYY-MM-DD and window an integer")
+
+    groups = [group] if group else snapshots.SNAPSHOT_GROUPS
+
+    def build() -> dict:
+        return {
+            "resolution": resolution,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "history": {
+                g: snapshots.history(g, start.isoformat(), end.isoformat(), resolution, window)
+                for g in groups
+            },
         }
 
-    return json_response(200, result)
+    etag = data_etag("history", group or "all", start, end, resolution, window or "all")
+    return conditional_response(event, etag, build)
 
 
 def handle_submit_feedback(event: dict) -> dict:
     """Submit sentiment feedback and adjust target if 'good'."""
-    from datetime import datetime
-
     body = parse_body(event)
     if not body:
         return error_response(400, "Request body required")
@@ -858,35 +1344,10 @@ def handle_submit_feedback(event: dict) -> dict:
         return error_response(400, "sentiment must be 'good' or 'bad'")
 
     # Get current 14-day burn rate
-    burn_rate_data = handle_get_burn_rate(event)
-    burn_data = json.loads(burn_rate_data["body"])
-    current_14day = burn_data[group]["current_14day"]
+    current_14day = burn_rate.window_rate(group, 14)
 
-    # Store feedback
-    today = datetime.now().date().isoformat()
-    database.execute(
-        """
-        INSERT INTO feedback (burn_rate_group, feedback_date, period_end_date, sentiment, burn_rate_at_feedback)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (group, today, today, sentiment, current_14day),
-    )
-
-    # If "good", adjust target
-    new_target = None
-    if sentiment == "good":
-        target_row = database.fetchone(
-            "SELECT daily_target FROM targets WHERE burn_rate_group = ?", (group,)
-        )
-        old_target = float(target_row["daily_target"]) if target_row else 0
-
-        # new_target = (0.8 * old) + (0.2 * current)
-        new_target = round((0.8 * old_target) + (0.2 * current_14day), 2)
-
-        database.execute(
-            "UPDATE targets SET daily_target = ?, updated_at = CURRENT_TIMESTAMP WHERE burn_rate_group = ?",
-            (new_target, group),
-        )
+    # Store feedback; "good" moves the target toward the current rate
+    new_target = targets.submit_feedback(group, sentiment, current_14day)
 
     database.commit()
     database.upload_database()
@@ -898,7 +1359,112 @@ def handle_submit_feedback(event: dict) -> dict:
     })
 
 
+def handle_get_target_history(event: dict) -> dict:
+    """
+    Get target trajectories and feedback hit rates per group.
+
+    Query parameters: group (default both), start and end (YYYY-MM-DD,
+    default the last 180 days).
+    """
+    from datetime import date, timedelta
+
+    params = event.get("queryStringParameters") or {}
+    group = params.get("group")
+    if group is not None and group not in ["food", "discretionary"]:
+        return error_response(400, "group must be 'food' or 'discretionary'")
+
+    try:
+        end = date.fromisoformat(params["end"]) if params.get("end") else datetime.now().date()
+        start = date.fromisoformat(params["start"]) if params.get("start") else end - timedelta(days=180)
+    except ValueError:
+        return error_response(400, "start and end must be YYYY-MM-DD")
+
+    groups = [group] if group else ["food", "discretionary"]
+
+    def build() -> dict:
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "groups": {
+                g: {
+                    "trajectory": targets.trajectory(g, start.isoformat(), end.isoformat()),
+                    "feedback": targets.feedback_stats(g, start.isoformat(), end.isoformat()),
+                }
+                for g in groups
+            },
+        }
+
+    etag = data_etag("target-history", group or "all", start, end)
+    return conditional_response(event, etag, build)
+
+
+def handle_get_changes(event: dict) -> dict:
+    """
+    Get transactions, rules and categories changed since a version.
+
+    Query parameters: since (the version from the previous response,
+    default 0 for everything) and limit (changes per page, default 1000).
+    Follow up with the returned version while has_more is true. A 410 means
+    deletes since that version are no longer recorded: resync from 0.
+    """
+    params = event.get("queryStringParameters") or {}
+    try:
+        since = int(params.get("since", 0))
+        limit = min(int(params.get("limit", changes.DEFAULT_LIMIT)), changes.MAX_LIMIT)
+    except ValueError:
+        return error_response(400, "since and limit must be integers")
+    if since < 0 or limit < 1:
+        return error_response(400, "since must be >= 0 and limit >= 1")
+
+    etag = data_etag("changes", since, limit)
+    try:
+        return conditional_response(event, etag, lambda: changes.changes_since(since, limit))
+    except changes.ResyncRequired as e:
+        return error_response(410, str(e), "RESYNC_REQUIRED")
+    except ValueError as e:
+        return error_response(400, str(e))
+
+
 def handle_get_targets(event: dict) -> dict:
     """Get current targets for all groups."""
-    targets = database.fetchall("SELECT * FROM targets")
-    return json_response(200, {"targets": database.dicts_from_rows(targets)})
+    return conditional_response(
+        event,
+        data_etag("targets"),
+        lambda: {"targets": database.dicts_from_rows(database.fetchall("SELECT * FROM targets"))},
+    )
+
+
+# Authenticated routes; {id} segments are passed to the handler as ints
+ROUTER = router.Router([
+    # Transactions
+    ("POST", "/transactions/upload", handle_upload),
+    ("GET", "/transactions", handle_get_transactions),
+    ("GET", "/transactions/review-queue", handle_review_queue),
+    ("GET", "/transactions/review-queue/groups", handle_review_queue_groups),
+    ("POST", "/transactions/review-queue/groups/categorize", handle_categorize_review_group),
+    ("PUT", "/transactions/{id}/categorize", handle_categorize),
+    ("PATCH", "/transactions/{id}/recurring", handle_toggle_recurring),
+    ("PATCH", "/transactions/{id}/explosion", handle_toggle_explosion),
+    # Categories
+    ("GET", "/categories", handle_get_categories),
+    ("POST", "/categories", handle_create_category),
+    ("PUT", "/categories/{id}", handle_update_category),
+    ("DELETE", "/categories/{id}", handle_delete_category),
+    # Rules
+    ("GET", "/rules", handle_get_rules),
+    ("POST", "/rules", handle_create_rule),
+    ("PUT", "/rules/{id}", handle_update_rule),
+    ("DELETE", "/rules/{id}", handle_delete_rule),
+    # Accounts, status and rollups
+    ("GET", "/accounts", handle_get_accounts),
+    ("GET", "/status", handle_status),
+    ("GET", "/rollup", handle_get_rollup),
+    # Burn rate, feedback and targets
+    ("GET", "/burn-rate", handle_get_burn_rate),
+    ("GET", "/burn-rate/history", handle_burn_rate_history),
+    ("POST", "/feedback", handle_submit_feedback),
+    ("GET", "/targets", handle_get_targets),
+    ("GET", "/targets/history", handle_get_target_history),
+    # Delta sync
+    ("GET", "/changes", handle_get_changes),
+])
@@ -0,0 +1,123 @@
+"""Transfer and card-payment matching across accounts.
+
+A credit card payment appears as a debit in checking and a credit on the
+card; a transfer between savings accounts appears once in each. These pairs
+are not spending, so they are linked in transfer_matches and excluded.
+
+Candidates are bucketed by exact amount in cents (hash join), then each
+bucket's debits and credits are merged in date order. Sorting dominates,
+so matching n rows is O(n log n) rather than pairwise O(n^2).
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+
+from . import categories, database
+
+logger = logging.getLogger(__name__)
+
+# Maximum days between the two sides of a transfer
+MATCH_WINDOW_DAYS = 3
+
+
+@dataclass
+class Candidate:
+    """An unmatched transaction that could be one side of a transfer."""
+
+    id: int
+    account_id: int
+    day: int  # date as a proleptic ordinal
+    cents: int  # signed amount in cents
+
+
+def find_matches(
+    candidates: list[Candidate], window_days: int = MATCH_WINDOW_DAYS
+) -> list[tuple[int, int]]:
+    """
+    Pair offsetting debits and credits from different accounts.
+
+    Each debit is matched to the earliest unmatched credit of the same
+    absolute amount, on another account, within window_days. Returns a list
+    of (debit_id, credit_id) pairs; every id appears at most once.
+    """
+    buckets: dict[int, tuple[list[Candidate], list[Candidate]]] = {}
+    for c in candidates:
+        if c.cents == 0:
+            continue
+        debits, credits = buckets.setdefault(abs(c.cents), ([], []))
+        (debits if c.cents < 0 else credits).append(c)
+
+    pairs = []
+    for debits, credits in buckets.values():
+        if not debits or not credits:
+            continue
+        debits.sort(key=lambda c: (c.day, c.id))
+        credits.sort(key=lambda c: (c.day, c.id))
+
+        used = [False] * len(credits)
+        start = 0
+        for debit in debits:
+            # Credits before the window can never match a later debit
+            while start < len(credits) and credits[start].day < debit.day - window_days:
+                start += 1
+            j = start
+            while j < len(credits) and credits[j].day <= debit.day + window_days:
+                credit = credits[j]
+                if not used[j] and credit.account_id != debit.account_id:
+                    used[j] = True
+                    pairs.append((debit.id, credit.id))
+                    break
+                j += 1
+
+    return pairs
+
+
+def match_transfers(window_days: int = MATCH_WINDOW_DAYS) -> int:
+    """
+    Link and exclude transfer pairs among transactions awaiting review.
+
+    Both sides are recorded in transfer_matches and moved to the excluded
+    group so they leave the review queue. Returns the number of pairs.
+    """
+    rows = database.fetchall(
+        """
+        SELECT t.id, t.account_id, t.date, t.amount
+        FROM transactions t
+        WHERE t.needs_review = 1
+        AND NOT EXISTS (
+            SELECT 1 FROM transfer_matches m
+            WHERE m.debit_transaction_id = t.id OR m.credit_transaction_id = t.id
+        )
+        """
+    )
+    candidates = [
+        Candidate(
+            id=row["id"],
+            account_id=row["account_id"],
+            day=date.fromisoformat(row["date"]).toordinal(),
+            cents=round(float(row["amount"]) * 100),
+        )
+        for row in rows
+    ]
+
+    pairs = find_matches(candidates, window_days)
+    if not pairs:
+        return 0
+
+    database.executemany(
+        "INSERT INTO transfer_matches (debit_transaction_id, credit_transaction_id) VALUES (?, ?)",
+        pairs,
+    )
+
+    excluded_ids = categories.ids_for_group("excluded")
+    if excluded_ids:
+        database.executemany(
+            "UPDATE transactions SET category_id = ?, needs_review = 0 WHERE id = ?",
+            [(excluded_ids[0], txn_id) for pair in pairs for txn_id in pair],
+        )
+    else:
+        logger.warning("No excluded category; transfer pairs linked but left in review")
+
+    logger.info(f"Matched {len(pairs)} transfer pairs")
+    return len(pairs)
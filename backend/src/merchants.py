@@ -0,0 +1,63 @@
+"""Description normalization for grouping transactions by merchant."""
+
+import re
+
+# Card processor prefixes that precede the real merchant name
+PROCESSOR_PREFIXES = {"SQ", "TST", "PAYPAL", "POS", "PP", "SP", "CKO", "DD", "IC"}
+
+# Two-letter US state codes that trail credit card payee addresses
+_STATE_CODE = re.compile(r"^[A-Z]{2}$")
+_NON_ALNUM = re.compile(r"[^A-Z0-9 ]+")
+
+
+def normalize_description(description: str) -> str:
+    """
+    Normalize a raw bank description.
+
+    Uppercases, strips punctuation and drops any token containing digits
+    (store numbers, dates, confirmation codes), so repeated charges from
+    the same place collapse to the same string.
+    """
+    cleaned = _NON_ALNUM.sub(" ", description.upper())
+    tokens = [t for t in cleaned.split() if not any(ch.isdigit() for ch in t)]
+    return " ".join(tokens)
+
+
+def merchant_key(description: str) -> str:
+    """
+    Reduce a raw bank description to a short merchant key.
+
+    Builds on normalize_description, then removes processor prefixes and a
+    trailing state code and keeps the first three tokens. Falls back to the
+    normalized description when nothing is left.
+    """
+    normalized = normalize_description(description)
+    tokens = normalized.split()
+
+    while tokens and tokens[0] in PROCESSOR_PREFIXES:
+        tokens = tokens[1:]
+    if len(tokens) > 1 and _STATE_CODE.match(tokens[-1]):
+        tokens = tokens[:-1]
+
+    return " ".join(tokens[:3]) or normalized
+
+
+def common_pattern(descriptions: list[str], max_length: int = 30) -> str:
+    """
+    Longest case-insensitive common prefix of descriptions, for rule patterns.
+
+    Rules match by substring, so the prefix is guaranteed to match every
+    description it was built from. Returns "" when there is no usable prefix.
+    """
+    if not descriptions:
+        return ""
+
+    lowered = [d.lower() for d in descriptions]
+    prefix = min(lowered, key=len)
+    for desc in lowered:
+        while not desc.startswith(prefix):
+            prefix = prefix[:-1]
+
+    # Return the original casing from the first description
+    pattern = descriptions[0][: min(len(prefix), max_length)].strip()
+    return pattern if len(pattern) >= 3 else ""
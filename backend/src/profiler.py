@@ -0,0 +1,117 @@
+"""On-demand cProfile profiling of single requests.
+
+A request is profiled when PROFILE=1 is set (every request) or when an
+authenticated caller sends X-Debug-Profile with an unexpired debug signature
+of the request's method and path (see main()). The pstats file is written to
+PROFILE_DIR, and also to the data bucket under debug/profiles/ when
+PROFILE_UPLOAD=1. The response's X-Profile header names the file. Requests
+that are not profiled only pay for one flag check and one header lookup.
+
+    python -m src.profiler sign GET /api/transactions
+    python -m pstats /tmp/profiles/<file>.pstats
+"""
+
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import time
+from collections.abc import Callable
+
+import boto3
+from botocore.exceptions import ClientError
+
+from . import auth, database
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("PROFILE", "") not in ("", "0")
+UPLOAD = os.environ.get("PROFILE_UPLOAD", "") not in ("", "0")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp/profiles")
+PROFILE_PREFIX = "debug/profiles/"
+
+HEADER = "X-Debug-Profile"
+
+# Lifetime of a signature made by sign(), and the longest one accepted
+SIGNATURE_TTL_SECONDS = 900
+MAX_SIGNATURE_TTL_SECONDS = 3600
+
+# Functions listed in the profile summary logged with each run
+SUMMARY_LINES = 25
+
+
+def sign(method: str, path: str, ttl: int = SIGNATURE_TTL_SECONDS) -> str:
+    """X-Debug-Profile value for a request line, valid for ttl seconds."""
+    expires = int(time.time()) + ttl
+    return f"{expires}.{auth.debug_signature(method, path, expires)}"
+
+
+def signed(event: dict) -> bool:
+    """
+    Whether the event carries a valid, unexpired profiling signature for its method and path.
+
+    A signature that cannot be checked (e.g. secrets unavailable) counts as
+    absent, so the request is still handled, and fails, inside handle_request.
+    """
+    headers = event.get("headers") or {}
+    value = headers.get(HEADER) or headers.get(HEADER.lower())
+    if not value:
+        return False
+
+    expires, _, signature = value.partition(".")
+    now = time.time()
+    if not expires.isdigit() or not now <= int(expires) <= now + MAX_SIGNATURE_TTL_SECONDS:
+        return False
+    try:
+        expected = auth.debug_signature(
+            event.get("httpMethod", "GET"), event.get("path", "/"), int(expires)
+        )
+    except Exception as e:
+        logger.error(f"Could not check profiling signature: {e}")
+        return False
+    return hmac.compare_digest(signature, expected)
+
+
+def run(event: dict, func: Callable[[], dict]) -> dict:
+    """Call func under cProfile, save the stats and name the file in the response."""
+    profile = cProfile.Profile()
+    response = profile.runcall(func)
+
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", event.get("path", "/")).strip("-") or "root"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{event.get('httpMethod', 'GET')}-{slug}.pstats"
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, name)
+    profile.dump_stats(path)
+
+    summary = io.StringIO()
+    pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(SUMMARY_LINES)
+    logger.info(f"Profile {path}\n{summary.getvalue()}")
+
+    location = path
+    if UPLOAD and database.DATA_BUCKET:
+        key = PROFILE_PREFIX + name
+        try:
+            boto3.client("s3").upload_file(path, database.DATA_BUCKET, key)
+            location = f"s3://{database.DATA_BUCKET}/{key}"
+        except ClientError as e:
+            logger.error(f"Failed to upload profile: {e}")
+
+    return {**response, "headers": {**response.get("headers", {}), "X-Profile": location}}
+
+
+def main(argv: list[str]) -> int:
+    """Print the X-Debug-Profile value for a request: sign METHOD PATH [TTL_SECONDS]."""
+    if len(argv) not in (3, 4) or argv[0] != "sign" or (len(argv) == 4 and not argv[3].isdigit()):
+        print("usage: python -m src.profiler sign METHOD PATH [TTL_SECONDS]", file=sys.stderr)
+        return 2
+    ttl = min(int(argv[3]), MAX_SIGNATURE_TTL_SECONDS) if len(argv) == 4 else SIGNATURE_TTL_SECONDS
+    print(sign(argv[1].upper(), argv[2], ttl))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
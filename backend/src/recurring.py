@@ -0,0 +1,236 @@
+"""Recurring-charge detection, run as a batch step after ingest.
+
+Expenses are grouped by normalized merchant and account. A group whose
+amounts are stable and whose dates are evenly spaced becomes a candidate
+series in recurring_series; once a series has enough occurrences (or the
+user has flagged one of its charges as recurring) it is confirmed, and
+every matching charge is marked is_recurring automatically. Series state
+outlives the 30-day transaction purge, so monthly charges keep matching.
+"""
+
+import logging
+import statistics
+from dataclasses import dataclass
+from datetime import date
+
+from . import database, merchants
+
+logger = logging.getLogger(__name__)
+
+# Relative spread of amounts allowed within a series
+AMOUNT_TOLERANCE = 0.10
+
+# Allowed deviation of an interval from the series period
+PERIOD_TOLERANCE = 0.20
+MIN_PERIOD_SLACK_DAYS = 3
+
+# Occurrences needed before a detected series marks charges automatically
+MIN_OCCURRENCES = 3
+
+# Period assumed for series seeded from a single user-flagged charge
+DEFAULT_PERIOD_DAYS = 30
+
+
+@dataclass
+class SeriesStats:
+    """Interval and amount statistics for one merchant group."""
+
+    amount: float
+    period_days: int
+    occurrences: int
+    last_day: int
+
+
+def _period_slack(period_days: int) -> float:
+    return max(MIN_PERIOD_SLACK_DAYS, period_days * PERIOD_TOLERANCE)
+
+
+def amount_matches(amount: float, typical: float) -> bool:
+    """Whether an amount is within tolerance of a series' typical amount."""
+    return abs(amount - typical) <= abs(typical) * AMOUNT_TOLERANCE
+
+
+def interval_stats(days: list[int], amounts: list[float]) -> SeriesStats | None:
+    """
+    Summarize a group of charges if it looks periodic.
+
+    days are date ordinals in ascending order. Returns None unless there are
+    at least two charges, the amounts' coefficient of variation is within
+    AMOUNT_TOLERANCE and every interval is within tolerance of the median.
+    """
+    if len(days) < 2:
+        return None
+
+    mean_amount = statistics.fmean(amounts)
+    if mean_amount == 0 or statistics.pstdev(amounts) > abs(mean_amount) * AMOUNT_TOLERANCE:
+        return None
+
+    intervals = [b - a for a, b in zip(days, days[1:], strict=False)]
+    period = statistics.median(intervals)
+    if period < 5:
+        return None
+    slack = _period_slack(period)
+    if any(abs(i - period) > slack for i in intervals):
+        return None
+
+    return SeriesStats(
+        amount=round(mean_amount, 2),
+        period_days=round(period),
+        occurrences=len(days),
+        last_day=days[-1],
+    )
+
+
+def _fits_period(day: int, last_day: int, period_days: int) -> bool:
+    """Whether day falls on a whole number of periods after last_day."""
+    gap = day - last_day
+    periods = round(gap / period_days)
+    return periods >= 1 and abs(gap - periods * period_days) <= _period_slack(period_days)
+
+
+def detect_recurring() -> int:
+    """
+    Update recurring series from current expenses and mark new occurrences.
+
+    Once a series is confirmed, only charges dated after its last occurrence
+    are marked on later runs.
+
+    Returns the number of transactions newly marked is_recurring.
+    """
+    rows = database.fetchall(
+        """
+        SELECT id, account_id, date, description, amount, is_recurring
+        FROM transactions
+        WHERE amount < 0
+        ORDER BY date ASC, id ASC
+        """
+    )
+
+    groups: dict[tuple[str, int], list] = {}
+    for row in rows:
+        key = (merchants.merchant_key(row["description"]), row["account_id"])
+        groups.setdefault(key, []).append(row)
+
+    series_rows = database.fetchall("SELECT * FROM recurring_series")
+    series = {(s["merchant_key"], s["account_id"]): dict(s) for s in series_rows}
+
+    to_mark: list[int] = []
+    for (key, account_id), group in groups.items():
+        state = series.get((key, account_id))
+
+        if state is None:
+            state = _new_series(key, account_id, group)
+            if state is None:
+                continue
+            marked_through = None
+        else:
+            # Charges a confirmed series already covered keep their flag, so
+            # a user's opt-out is not undone by the next ingest
+            marked_through = state["last_date"] if state["confirmed"] else None
+            _extend_series(state, group)
+
+        if state["confirmed"]:
+            first_day = date.fromisoformat(state["first_date"]).toordinal()
+            to_mark.extend(
+                r["id"] for r in group
+                if not r["is_recurring"]
+                and date.fromisoformat(r["date"]).toordinal() >= first_day
+                and (marked_through is None or r["date"] > marked_through)
+                and amount_matches(float(r["amount"]), state["amount"])
+            )
+        _save_series(state)
+
+    if to_mark:
+        database.executemany(
+            "UPDATE transactions SET is_recurring = 1 WHERE id = ?",
+            [(txn_id,) for txn_id in to_mark],
+        )
+        logger.info(f"Marked {len(to_mark)} transactions as recurring")
+
+    return len(to_mark)
+
+
+def _new_series(key: str, account_id: int, group: list) -> dict | None:
+    """Build series state for a merchant group with no series yet."""
+    flagged = [r for r in group if r["is_recurring"]]
+    stable = _stable_subset(flagged[-1] if flagged else group[-1], group)
+    stats = interval_stats(
+        [date.fromisoformat(r["date"]).toordinal() for r in stable],
+        [float(r["amount"]) for r in stable],
+    )
+
+    if stats is None and not flagged:
+        return None
+    if stats is None:
+        # Seeded by the user flagging a charge; assume a monthly cadence
+        stats = SeriesStats(
+            amount=round(statistics.fmean(float(r["amount"]) for r in flagged), 2),
+            period_days=DEFAULT_PERIOD_DAYS,
+            occurrences=len(flagged),
+            last_day=date.fromisoformat(flagged[-1]["date"]).toordinal(),
+        )
+        stable = flagged
+
+    return {
+        "merchant_key": key,
+        "account_id": account_id,
+        "amount": stats.amount,
+        "period_days": stats.period_days,
+        "occurrences": stats.occurrences,
+        "first_date": stable[0]["date"],
+        "last_date": date.fromordinal(stats.last_day).isoformat(),
+        "confirmed": 1 if flagged or stats.occurrences >= MIN_OCCURRENCES else 0,
+    }
+
+
+def _stable_subset(anchor, group: list) -> list:
+    """Charges in a group whose amount matches the anchor charge."""
+    typical = float(anchor["amount"])
+    return [r for r in group if amount_matches(float(r["amount"]), typical)]
+
+
+def _extend_series(state: dict, group: list) -> None:
+    """Append charges newer than the series' last occurrence, in date order."""
+    last_day = date.fromisoformat(state["last_date"]).toordinal()
+    for row in group:
+        day = date.fromisoformat(row["date"]).toordinal()
+        amount = float(row["amount"])
+        if day <= last_day or not amount_matches(amount, state["amount"]):
+            continue
+        if not _fits_period(day, last_day, state["period_days"]) and not row["is_recurring"]:
+            continue
+
+        last_day = day
+        state["amount"] = round(amount, 2)  # follow price changes
+        state["occurrences"] += 1
+        state["last_date"] = row["date"]
+        if row["is_recurring"] or state["occurrences"] >= MIN_OCCURRENCES:
+            state["confirmed"] = 1
+
+
+def _save_series(state: dict) -> None:
+    """Insert or update a series row."""
+    database.execute(
+        """
+        INSERT INTO recurring_series
+        (merchant_key, account_id, amount, period_days, occurrences, first_date, last_date, confirmed)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(merchant_key, account_id) DO UPDATE SET
+            amount = excluded.amount,
+            period_days = excluded.period_days,
+            occurrences = excluded.occurrences,
+            last_date = excluded.last_date,
+            confirmed = excluded.confirmed,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (
+            state["merchant_key"],
+            state["account_id"],
+            state["amount"],
+            state["period_days"],
+            state["occurrences"],
+            state["first_date"],
+            state["last_date"],
+            state["confirmed"],
+        ),
+    )
@@ -0,0 +1,119 @@
+"""Monthly spending rollups over month, group, category and account.
+
+monthly_rollup holds spent and income cents per (month, category, account),
+maintained by triggers on transactions, so a rollup reads at most
+months x categories x accounts rows regardless of transaction volume.
+Groups are resolved through the category closure at read time, so
+regrouping a category needs no rebuild. The upload purge is not subtracted,
+so totals cover every transaction ever ingested, including months whose
+transactions are no longer retained; edits and deletes of retained
+transactions are applied as usual.
+"""
+
+from . import database
+
+# Rollup dimensions: name -> (output column, SQL expression over the joined rollup)
+DIMENSIONS = {
+    "month": ("month", "r.month"),
+    "group": ("burn_rate_group", "COALESCE(root.burn_rate_group, 'uncategorized')"),
+    "category": ("category_id", "r.category_id"),
+    "account": ("account_id", "r.account_id"),
+}
+
+DEFAULT_DIMENSIONS = ["month", "group"]
+
+_AGGREGATE_SQL = """
+    SELECT substr(date, 1, 7) AS month, COALESCE(category_id, 0) AS category_id, account_id,
+           SUM(CASE WHEN amount < 0 THEN CAST(ROUND(-amount * 100) AS INTEGER) ELSE 0 END) AS spent_cents,
+           SUM(CASE WHEN amount > 0 THEN CAST(ROUND(amount * 100) AS INTEGER) ELSE 0 END) AS income_cents,
+           COUNT(*) AS txn_count
+    FROM transactions
+    GROUP BY substr(date, 1, 7), COALESCE(category_id, 0), account_id
+"""
+
+
+def rollup(
+    dimensions: list[str],
+    start_month: str,
+    end_month: str,
+    group: str | None = None,
+    category_id: int | None = None,
+    account_id: int | None = None,
+) -> list[dict]:
+    """
+    Spent and income totals grouped by the given dimensions.
+
+    Months are YYYY-MM, inclusive. Rows carry the requested dimensions plus
+    spent, income and count; category and account rows include their names.
+    """
+    if not dimensions or any(d not in DIMENSIONS for d in dimensions):
+        raise ValueError(f"dimensions must be from: {', '.join(DIMENSIONS)}")
+
+    # Positional keys: output names like burn_rate_group also exist on joined tables
+    keys = ", ".join(str(i) for i in range(1, len(dimensions) + 1))
+    columns = [f"{DIMENSIONS[d][1]} AS {DIMENSIONS[d][0]}" for d in dimensions]
+    if "category" in dimensions:
+        columns.append("c.name AS category_name")
+    if "account" in dimensions:
+        columns.append("a.name AS account_name")
+
+    query = f"""
+        SELECT {", ".join(columns)},
+               SUM(r.spent_cents) AS spent_cents,
+               SUM(r.income_cents) AS income_cents,
+               SUM(r.txn_count) AS count
+        FROM monthly_rollup r
+        LEFT JOIN (
+            category_closure cc
+            JOIN categories root ON root.id = cc.ancestor_id AND root.parent_id IS NULL
+        ) ON cc.descendant_id = r.category_id
+        LEFT JOIN categories c ON c.id = r.category_id
+        LEFT JOIN accounts a ON a.id = r.account_id
+        WHERE r.month >= ? AND r.month <= ?
+    """
+    params: list = [start_month, end_month]
+    if group is not None:
+        query += f" AND {DIMENSIONS['group'][1]} = ?"
+        params.append(group)
+    if category_id is not None:
+        query += " AND r.category_id = ?"
+        params.append(category_id)
+    if account_id is not None:
+        query += " AND r.account_id = ?"
+        params.append(account_id)
+
+    query += f" GROUP BY {keys} ORDER BY {keys}"
+
+    result = []
+    for row in database.fetchall(query, tuple(params)):
+        item = dict(row)
+        item["spent"] = item.pop("spent_cents") / 100
+        item["income"] = item.pop("income_cents") / 100
+        result.append(item)
+    return result
+
+
+def verify() -> bool:
+    """
+    Whether monthly_rollup matches a fresh aggregate of transactions.
+
+    Months up to the purge cutoff also count purged transactions, so only
+    later months are compared.
+    """
+    cutoff = database.purged_before()
+    after = f"{cutoff:%Y-%m}" if cutoff else ""
+    expected = [
+        tuple(r)
+        for r in database.fetchall(
+            f"SELECT * FROM ({_AGGREGATE_SQL}) WHERE month > ? ORDER BY 1, 2, 3", (after,)
+        )
+    ]
+    actual = [
+        tuple(r)
+        for r in database.fetchall(
+            "SELECT month, category_id, account_id, spent_cents, income_cents, txn_count "
+            "FROM monthly_rollup WHERE month > ? ORDER BY 1, 2, 3",
+            (after,),
+        )
+    ]
+    return expected == actual
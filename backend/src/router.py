@@ -0,0 +1,54 @@
+"""Table-driven request routing.
+
+Routes are (method, template, handler) entries. A template is a static path
+or has {name} segments, which match digits and are passed to the handler as
+int arguments after the event. Static routes are found with one dict lookup;
+parameterized routes are matched with precompiled patterns, in table order.
+"""
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+_PARAM = re.compile(r"\{\w+\}")
+
+
+@dataclass
+class Match:
+    """A resolved route: its name (method and template), handler and path arguments."""
+
+    name: str
+    handler: Callable[..., dict]
+    args: tuple[int, ...] = ()
+
+    def __call__(self, event: dict) -> dict:
+        return self.handler(event, *self.args)
+
+
+class Router:
+    """Resolves (method, path) against a route table compiled once."""
+
+    def __init__(self, routes: list[tuple[str, str, Callable[..., dict]]]):
+        self._static: dict[tuple[str, str], Match] = {}
+        self._patterns: dict[str, list[tuple[re.Pattern, str, Callable[..., dict]]]] = {}
+        for method, template, handler in routes:
+            name = f"{method} {template}"
+            if _PARAM.search(template) is None:
+                self._static[(method, template)] = Match(name, handler)
+                continue
+            pattern = "/".join(
+                r"(\d+)" if _PARAM.fullmatch(segment) else re.escape(segment)
+                for segment in template.split("/")
+            )
+            self._patterns.setdefault(method, []).append((re.compile(pattern), name, handler))
+
+    def match(self, method: str, path: str) -> Match | None:
+        """The route for a normalized path, or None if nothing matches."""
+        static = self._static.get((method, path))
+        if static is not None:
+            return static
+        for pattern, name, handler in self._patterns.get(method, ()):
+            m = pattern.fullmatch(path)
+            if m is not None:
+                return Match(name, handler, tuple(int(arg) for arg in m.groups()))
+        return None
@@ -19,6 +19,22 @@ CREATE TABLE IF NOT EXISTS categories (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Category hierarchy closure: one row per (ancestor, descendant) pair, including self
+CREATE TABLE IF NOT EXISTS category_closure (
+    ancestor_id INTEGER NOT NULL REFERENCES categories(id),
+    descendant_id INTEGER NOT NULL REFERENCES categories(id),
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_category_closure_descendant ON category_closure(descendant_id, depth);
+
+-- Key/value counters (cache versions)
+CREATE TABLE IF NOT EXISTS app_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+
 -- Transactions table
 CREATE TABLE IF NOT EXISTS transactions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -35,11 +51,245 @@ CREATE TABLE IF NOT EXISTS transactions (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Materialized expense totals per day, group and flags, kept current by triggers.
+-- Read by the burn rate engine instead of re-aggregating transactions.
+CREATE TABLE IF NOT EXISTS daily_spend (
+    date DATE NOT NULL,
+    burn_rate_group TEXT NOT NULL,
+    is_recurring BOOLEAN NOT NULL,
+    is_explosion BOOLEAN NOT NULL,
+    total_cents INTEGER NOT NULL,
+    txn_count INTEGER NOT NULL,
+    PRIMARY KEY (date, burn_rate_group, is_recurring, is_explosion)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_spend_insert
+AFTER INSERT ON transactions
+WHEN NEW.amount < 0 AND NEW.category_id IS NOT NULL
+BEGIN
+    INSERT INTO daily_spend (date, burn_rate_group, is_recurring, is_explosion, total_cents, txn_count)
+    SELECT NEW.date, root.burn_rate_group, NEW.is_recurring, NEW.is_explosion,
+           CAST(ROUND(-NEW.amount * 100) AS INTEGER), 1
+    FROM category_closure cc JOIN categories root ON root.id = cc.ancestor_id
+    WHERE cc.descendant_id = NEW.category_id AND root.parent_id IS NULL
+    ON CONFLICT (date, burn_rate_group, is_recurring, is_explosion) DO UPDATE SET
+        total_cents = total_cents + excluded.total_cents,
+        txn_count = txn_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_spend_delete
+AFTER DELETE ON transactions
+WHEN OLD.amount < 0 AND OLD.category_id IS NOT NULL
+BEGIN
+    UPDATE daily_spend SET
+        total_cents = total_cents - CAST(ROUND(-OLD.amount * 100) AS INTEGER),
+        txn_count = txn_count - 1
+    WHERE date = OLD.date AND is_recurring = OLD.is_recurring AND is_explosion = OLD.is_explosion
+    AND burn_rate_group = (
+        SELECT root.burn_rate_group
+        FROM category_closure cc JOIN categories root ON root.id = cc.ancestor_id
+        WHERE cc.descendant_id = OLD.category_id AND root.parent_id IS NULL
+    );
+    DELETE FROM daily_spend WHERE date = OLD.date AND txn_count = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_spend_update
+AFTER UPDATE OF date, amount, category_id, is_recurring, is_explosion ON transactions
+BEGIN
+    UPDATE daily_spend SET
+        total_cents = total_cents - CAST(ROUND(-OLD.amount * 100) AS INTEGER),
+        txn_count = txn_count - 1
+    WHERE OLD.amount < 0 AND OLD.category_id IS NOT NULL
+    AND date = OLD.date AND is_recurring = OLD.is_recurring AND is_explosion = OLD.is_explosion
+    AND burn_rate_group = (
+        SELECT root.burn_rate_group
+        FROM category_closure cc JOIN categories root ON root.id = cc.ancestor_id
+        WHERE cc.descendant_id = OLD.category_id AND root.parent_id IS NULL
+    );
+    DELETE FROM daily_spend WHERE date = OLD.date AND txn_count = 0;
+    INSERT INTO daily_spend (date, burn_rate_group, is_recurring, is_explosion, total_cents, txn_count)
+    SELECT NEW.date, root.burn_rate_group, NEW.is_recurring, NEW.is_explosion,
+           CAST(ROUND(-NEW.amount * 100) AS INTEGER), 1
+    FROM category_closure cc JOIN categories root ON root.id = cc.ancestor_id
+    WHERE NEW.amount < 0 AND cc.descendant_id = NEW.category_id AND root.parent_id IS NULL
+    ON CONFLICT (date, burn_rate_group, is_recurring, is_explosion) DO UPDATE SET
+        total_cents = total_cents + excluded.total_cents,
+        txn_count = txn_count + 1;
+END;
+
+-- Exponentially weighted spending rates per group and half-life, as of a date.
+-- Changes to daily_spend land in ewma_journal and are folded in at commit,
+-- except while the upload purge runs (app_meta purging_before is set only
+-- then): purged days stay in the rates.
+CREATE TABLE IF NOT EXISTS ewma_state (
+    burn_rate_group TEXT NOT NULL,
+    half_life_days INTEGER NOT NULL,
+    as_of DATE NOT NULL,
+    rate_cents REAL NOT NULL,
+    PRIMARY KEY (burn_rate_group, half_life_days)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ewma_journal (
+    id INTEGER PRIMARY KEY,
+    date DATE NOT NULL,
+    burn_rate_group TEXT NOT NULL,
+    delta_cents INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_ewma_journal_insert
+AFTER INSERT ON daily_spend
+WHEN NEW.total_cents != 0
+AND (NEW.burn_rate_group = 'explosion'
+     OR (NEW.burn_rate_group IN ('food', 'discretionary') AND NEW.is_recurring = 0 AND NEW.is_explosion = 0))
+AND CAST(replace(NEW.date, '-', '') AS INTEGER)
+    >= COALESCE((SELECT value FROM app_meta WHERE key = 'purging_before'), 0)
+BEGIN
+    INSERT INTO ewma_journal (date, burn_rate_group, delta_cents)
+    VALUES (NEW.date, NEW.burn_rate_group, NEW.total_cents);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ewma_journal_update
+AFTER UPDATE OF total_cents ON daily_spend
+WHEN NEW.total_cents != OLD.total_cents
+AND (NEW.burn_rate_group = 'explosion'
+     OR (NEW.burn_rate_group IN ('food', 'discretionary') AND NEW.is_recurring = 0 AND NEW.is_explosion = 0))
+AND CAST(replace(NEW.date, '-', '') AS INTEGER)
+    >= COALESCE((SELECT value FROM app_meta WHERE key = 'purging_before'), 0)
+BEGIN
+    INSERT INTO ewma_journal (date, burn_rate_group, delta_cents)
+    VALUES (NEW.date, NEW.burn_rate_group, NEW.total_cents - OLD.total_cents);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ewma_journal_delete
+AFTER DELETE ON daily_spend
+WHEN OLD.total_cents != 0
+AND (OLD.burn_rate_group = 'explosion'
+     OR (OLD.burn_rate_group IN ('food', 'discretionary') AND OLD.is_recurring = 0 AND OLD.is_explosion = 0))
+AND CAST(replace(OLD.date, '-', '') AS INTEGER)
+    >= COALESCE((SELECT value FROM app_meta WHERE key = 'purging_before'), 0)
+BEGIN
+    INSERT INTO ewma_journal (date, burn_rate_group, delta_cents)
+    VALUES (OLD.date, OLD.burn_rate_group, -OLD.total_cents);
+END;
+
+-- Monthly totals per category and account (category_id 0 = uncategorized),
+-- kept current by triggers so rollups never scan transactions. The upload
+-- purge (deletes while purging_before is set) is not subtracted, so history is kept.
+CREATE TABLE IF NOT EXISTS monthly_rollup (
+    month TEXT NOT NULL,
+    category_id INTEGER NOT NULL,
+    account_id INTEGER NOT NULL,
+    spent_cents INTEGER NOT NULL,
+    income_cents INTEGER NOT NULL,
+    txn_count INTEGER NOT NULL,
+    PRIMARY KEY (month, category_id, account_id)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_insert
+AFTER INSERT ON transactions
+BEGIN
+    INSERT INTO monthly_rollup (month, category_id, account_id, spent_cents, income_cents, txn_count)
+    VALUES (
+        substr(NEW.date, 1, 7), COALESCE(NEW.category_id, 0), NEW.account_id,
+        CASE WHEN NEW.amount < 0 THEN CAST(ROUND(-NEW.amount * 100) AS INTEGER) ELSE 0 END,
+        CASE WHEN NEW.amount > 0 THEN CAST(ROUND(NEW.amount * 100) AS INTEGER) ELSE 0 END,
+        1
+    )
+    ON CONFLICT (month, category_id, account_id) DO UPDATE SET
+        spent_cents = spent_cents + excluded.spent_cents,
+        income_cents = income_cents + excluded.income_cents,
+        txn_count = txn_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_delete
+AFTER DELETE ON transactions
+WHEN CAST(replace(OLD.date, '-', '') AS INTEGER)
+    >= COALESCE((SELECT value FROM app_meta WHERE key = 'purging_before'), 0)
+BEGIN
+    UPDATE monthly_rollup SET
+        spent_cents = spent_cents
+            - CASE WHEN OLD.amount < 0 THEN CAST(ROUND(-OLD.amount * 100) AS INTEGER) ELSE 0 END,
+        income_cents = income_cents
+            - CASE WHEN OLD.amount > 0 THEN CAST(ROUND(OLD.amount * 100) AS INTEGER) ELSE 0 END,
+        txn_count = txn_count - 1
+    WHERE month = substr(OLD.date, 1, 7)
+    AND category_id = COALESCE(OLD.category_id, 0) AND account_id = OLD.account_id;
+    DELETE FROM monthly_rollup
+    WHERE month = substr(OLD.date, 1, 7)
+    AND category_id = COALESCE(OLD.category_id, 0) AND account_id = OLD.account_id
+    AND txn_count = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_update
+AFTER UPDATE OF date, amount, category_id, account_id ON transactions
+BEGIN
+    UPDATE monthly_rollup SET
+        spent_cents = spent_cents
+            - CASE WHEN OLD.amount < 0 THEN CAST(ROUND(-OLD.amount * 100) AS INTEGER) ELSE 0 END,
+        income_cents = income_cents
+            - CASE WHEN OLD.amount > 0 THEN CAST(ROUND(OLD.amount * 100) AS INTEGER) ELSE 0 END,
+        txn_count = txn_count - 1
+    WHERE month = substr(OLD.date, 1, 7)
+    AND category_id = COALESCE(OLD.category_id, 0) AND account_id = OLD.account_id;
+    DELETE FROM monthly_rollup
+    WHERE month = substr(OLD.date, 1, 7)
+    AND category_id = COALESCE(OLD.category_id, 0) AND account_id = OLD.account_id
+    AND txn_count = 0;
+    INSERT INTO monthly_rollup (month, category_id, account_id, spent_cents, income_cents, txn_count)
+    VALUES (
+        substr(NEW.date, 1, 7), COALESCE(NEW.category_id, 0), NEW.account_id,
+        CASE WHEN NEW.amount < 0 THEN CAST(ROUND(-NEW.amount * 100) AS INTEGER) ELSE 0 END,
+        CASE WHEN NEW.amount > 0 THEN CAST(ROUND(NEW.amount * 100) AS INTEGER) ELSE 0 END,
+        1
+    )
+    ON CONFLICT (month, category_id, account_id) DO UPDATE SET
+        spent_cents = spent_cents + excluded.spent_cents,
+        income_cents = income_cents + excluded.income_cents,
+        txn_count = txn_count + 1;
+END;
+
 -- Index for duplicate detection
 CREATE INDEX IF NOT EXISTS idx_transactions_dedup ON transactions(dedup_hash);
+
+-- Dedup hashes of purged transactions, so re-uploading an old statement
+-- does not ingest (and count in the aggregates) the same rows again.
+CREATE TABLE IF NOT EXISTS purged_hashes (
+    dedup_hash TEXT PRIMARY KEY
+) WITHOUT ROWID;
 CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
-CREATE INDEX IF NOT EXISTS idx_transactions_needs_review ON transactions(needs_review);
-CREATE INDEX IF NOT EXISTS idx_transactions_account ON transactions(account_id);
+-- Review queue: one index per sort order; the date one also covers the grouped queue
+CREATE INDEX IF NOT EXISTS idx_transactions_review_date
+    ON transactions(needs_review, date, id, description, amount, account_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_review_description
+    ON transactions(needs_review, description, date DESC);
+CREATE INDEX IF NOT EXISTS idx_transactions_review_amount
+    ON transactions(needs_review, abs(amount), date);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions(account_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON transactions(category_id, date);
+
+-- Transfer pairs (card payments, account-to-account moves) linked at ingest
+CREATE TABLE IF NOT EXISTS transfer_matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    debit_transaction_id INTEGER NOT NULL UNIQUE REFERENCES transactions(id) ON DELETE CASCADE,
+    credit_transaction_id INTEGER NOT NULL UNIQUE REFERENCES transactions(id) ON DELETE CASCADE,
+    matched_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Detected recurring charge series (state survives the transaction purge)
+CREATE TABLE IF NOT EXISTS recurring_series (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    merchant_key TEXT NOT NULL,
+    account_id INTEGER NOT NULL REFERENCES accounts(id),
+    amount DECIMAL(10, 2) NOT NULL,
+    period_days INTEGER NOT NULL,
+    occurrences INTEGER NOT NULL,
+    first_date DATE NOT NULL,
+    last_date DATE NOT NULL,
+    confirmed BOOLEAN NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (merchant_key, account_id)
+);
 
 -- Categorization rules table
 CREATE TABLE IF NOT EXISTS rules (
@@ -61,9 +311,12 @@ CREATE TABLE IF NOT EXISTS feedback (
     period_end_date DATE NOT NULL,
     sentiment TEXT NOT NULL CHECK (sentiment IN ('good', 'bad')),
     burn_rate_at_feedback DECIMAL(10, 2) NOT NULL,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    target_at_feedback DECIMAL(10, 2)
 );
 
+CREATE INDEX IF NOT EXISTS idx_feedback_group_date ON feedback(burn_rate_group, feedback_date);
+
 -- Burn rate snapshots table
 CREATE TABLE IF NOT EXISTS burn_rate_snapshots (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -76,7 +329,7 @@ CREATE TABLE IF NOT EXISTS burn_rate_snapshots (
 );
 
 CREATE INDEX IF NOT EXISTS idx_snapshots_computed ON burn_rate_snapshots(computed_at);
-CREATE INDEX IF NOT EXISTS idx_snapshots_group ON burn_rate_snapshots(burn_rate_group);
+CREATE INDEX IF NOT EXISTS idx_snapshots_group_computed ON burn_rate_snapshots(burn_rate_group, computed_at);
 
 -- Targets table (stores learned targets)
 CREATE TABLE IF NOT EXISTS targets (
@@ -86,6 +339,107 @@ CREATE TABLE IF NOT EXISTS targets (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Every target value a group has had; feedback_id is the adjusting feedback (NULL for the seed)
+CREATE TABLE IF NOT EXISTS target_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    burn_rate_group TEXT NOT NULL CHECK (burn_rate_group IN ('food', 'discretionary')),
+    effective_date DATE NOT NULL,
+    daily_target DECIMAL(10, 2) NOT NULL,
+    feedback_id INTEGER REFERENCES feedback(id) ON DELETE SET NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_target_history_group_date ON target_history(burn_rate_group, effective_date);
+
+-- Refresh token families: one per login, rotated on every refresh. Only the
+-- newest generation is accepted (the previous one briefly, for tabs racing a
+-- refresh); presenting an older one revokes the family, as does logout.
+CREATE TABLE IF NOT EXISTS refresh_tokens (
+    family TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    rotated_at INTEGER,
+    expires_at INTEGER NOT NULL,
+    revoked BOOLEAN NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Latest change version of each synced row; deleted rows stay behind as tombstones
+-- until changes.compact() drops them after TOMBSTONE_DAYS.
+-- A changed row's entry is replaced, so it takes the next version (AUTOINCREMENT never reuses one).
+CREATE TABLE IF NOT EXISTS change_log (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    deleted BOOLEAN NOT NULL DEFAULT 0,
+    changed_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    UNIQUE (table_name, row_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_tombstones ON change_log(changed_at) WHERE deleted = 1;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_transactions_insert
+AFTER INSERT ON transactions
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'transactions' AND row_id = NEW.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('transactions', NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_transactions_update
+AFTER UPDATE ON transactions
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'transactions' AND row_id = NEW.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('transactions', NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_transactions_delete
+AFTER DELETE ON transactions
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'transactions' AND row_id = OLD.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('transactions', OLD.id, 1);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_rules_insert
+AFTER INSERT ON rules
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'rules' AND row_id = NEW.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('rules', NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_rules_update
+AFTER UPDATE ON rules
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'rules' AND row_id = NEW.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('rules', NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_rules_delete
+AFTER DELETE ON rules
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'rules' AND row_id = OLD.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('rules', OLD.id, 1);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_categories_insert
+AFTER INSERT ON categories
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'categories' AND row_id = NEW.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('categories', NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_categories_update
+AFTER UPDATE ON categories
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'categories' AND row_id = NEW.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('categories', NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_log_categories_delete
+AFTER DELETE ON categories
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'categories' AND row_id = OLD.id;
+    INSERT INTO change_log (table_name, row_id, deleted) VALUES ('categories', OLD.id, 1);
+END;
+
 -- Seed accounts
 INSERT OR IGNORE INTO accounts (id, name, type, csv_format, include_in_burn_rate) VALUES
     (1, 'Checking', 'checking', 'checking_savings_boa', 1),
@@ -101,7 +455,14 @@ INSERT OR IGNORE INTO categories (id, name, burn_rate_group, parent_id) VALUES
     (4, 'Explosion', 'explosion', NULL),
     (5, 'Excluded', 'excluded', NULL);
 
+INSERT OR IGNORE INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT id, id, 0 FROM categories;
+
 -- Seed default targets
 INSERT OR IGNORE INTO targets (burn_rate_group, daily_target) VALUES
     ('food', 30.00),
     ('discretionary', 20.00);
+
+INSERT INTO target_history (burn_rate_group, effective_date, daily_target)
+    SELECT burn_rate_group, date(updated_at), daily_target FROM targets
+    WHERE NOT EXISTS (SELECT 1 FROM target_history);
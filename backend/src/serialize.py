@@ -0,0 +1,69 @@
+"""JSON encoding for API responses, with a row set that skips per-row dicts.
+
+List endpoints fetch plain tuples into a Rows set instead of sqlite3.Row
+objects. A Rows set encodes either as the usual list of objects or, when
+the client asks for format=columnar, as {"columns": [...], "rows": [[...]]}
+so each column name is sent once and no dict is built per row. orjson is
+used when it is installed; the standard library encoder otherwise.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Values of the format query parameter
+FORMATS = ("records", "columnar")
+
+
+class Rows:
+    """Query result as column names plus one tuple per row."""
+
+    __slots__ = ("columns", "rows", "columnar")
+
+    def __init__(self, columns: list[str], rows: list[tuple], columnar: bool = False):
+        self.columns = columns
+        self.rows = rows
+        self.columnar = columnar
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int | slice) -> "Rows | dict":
+        """A slice is another Rows set; an integer index is one row as a dict."""
+        if isinstance(index, slice):
+            return Rows(self.columns, self.rows[index], self.columnar)
+        return dict(zip(self.columns, self.rows[index], strict=True))
+
+    def records(self) -> list[dict]:
+        return [dict(zip(self.columns, row, strict=True)) for row in self.rows]
+
+    def to_json(self) -> dict | list[dict]:
+        """The JSON-ready shape chosen by the columnar flag."""
+        if self.columnar:
+            return {"columns": self.columns, "rows": self.rows}
+        return self.records()
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Rows):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(body: Any) -> str:
+    """Encode a response body, expanding any Rows sets it contains."""
+    if orjson is not None:
+        return orjson.dumps(body, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(body, default=_default)
+
+
+def wants_columnar(params: dict) -> bool:
+    """Whether the query parameters ask for the columnar shape; raises ValueError."""
+    shape = params.get("format") or "records"
+    if shape not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    return shape == "columnar"
@@ -0,0 +1,211 @@
+"""Burn rate history: daily curve snapshots and downsampled range queries.
+
+Every committed write refreshes today's snapshot for each targeted group,
+so burn_rate_snapshots holds at most one curve (one row per window) per
+group per day. History reads aggregate those rows in a single query over
+the (burn_rate_group, computed_at) index.
+
+Older snapshots go stale when past transactions are categorized or a
+category is regrouped. Run from the backend directory to recompute them:
+    python -m src.snapshots backfill [START [END]]
+
+Only days whose widest window lies after the upload purge cutoff can be
+recomputed; earlier snapshots are the only record of those days and are
+never overwritten.
+"""
+
+import logging
+import sys
+from datetime import date, datetime, timedelta
+
+from . import burn_rate, categories, database
+
+logger = logging.getLogger(__name__)
+
+# Groups that have targets and therefore snapshots
+SNAPSHOT_GROUPS = ["food", "discretionary"]
+
+# SQL expressions bucketing computed_at for each resolution
+RESOLUTIONS = {
+    "daily": "date(computed_at)",
+    "weekly": "date(computed_at, '-6 days', 'weekday 1')",  # Monday of the week
+    "monthly": "strftime('%Y-%m-01', computed_at)",
+}
+
+
+def record(today: date | None = None) -> None:
+    """Replace today's snapshot for every group with the current curve."""
+    if today is None:
+        today = datetime.now().date()
+
+    result = burn_rate.compute_burn_rate(today, SNAPSHOT_GROUPS)
+    computed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if computed_at[:10] != today.isoformat():
+        computed_at = f"{today.isoformat()} 00:00:00"
+
+    rows = []
+    for group in SNAPSHOT_GROUPS:
+        database.execute(
+            """
+            DELETE FROM burn_rate_snapshots
+            WHERE burn_rate_group = ? AND computed_at >= ? AND computed_at < date(?, '+1 day')
+            """,
+            (group, today.isoformat(), today.isoformat()),
+        )
+        target = result[group]["target"]
+        rows.extend(
+            (computed_at, group, p["window"], p["daily_rate"], target, p["deviation"])
+            for p in result[group]["curve"]
+        )
+
+    database.executemany(
+        """
+        INSERT INTO burn_rate_snapshots
+        (computed_at, burn_rate_group, window_days, daily_burn_rate, target_rate, deviation)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+
+
+def earliest_backfill(start: date) -> date:
+    """
+    start, or the first later day whose every window is still in the database.
+
+    Transactions before the purge cutoff are gone, so a curve for an earlier
+    day would be recomputed from missing data.
+    """
+    cutoff = database.purged_before()
+    if cutoff is None:
+        return start
+    return max(start, cutoff + timedelta(days=max(burn_rate.WINDOWS)))
+
+
+def backfill(start: date, end: date) -> int:
+    """
+    Recompute snapshots for every day from start to end (inclusive).
+
+    Daily totals are read once for the range plus the widest window, and
+    every window slides across a single prefix-sum array, so a multi-year
+    rebuild is one query and O(days x windows) arithmetic. Existing
+    snapshots in the range are replaced, except before earliest_backfill(),
+    which are kept. Returns the number of rows written.
+    """
+    retained = earliest_backfill(start)
+    if retained > start:
+        logger.warning(f"Keeping snapshots before {retained}; their transactions were purged")
+        start = retained
+    days = (end - start).days
+    if days < 0:
+        return 0
+
+    # totals[d] is the spend d days before end; prefix[k] sums totals[:k]
+    totals = burn_rate.daily_totals(end, days + max(burn_rate.WINDOWS), SNAPSHOT_GROUPS)
+    targets = burn_rate.load_targets()
+
+    rows = []
+    for group in SNAPSHOT_GROUPS:
+        if not categories.ids_for_group(group):
+            continue
+
+        prefix = [0]
+        for cents in totals[group]:
+            prefix.append(prefix[-1] + cents)
+
+        target = targets.get(group, 0)
+        for offset in range(days + 1):
+            computed_at = f"{(end - timedelta(days=offset)).isoformat()} 00:00:00"
+            for window in burn_rate.WINDOWS:
+                # Window N covers the as-of day and the N days before it
+                point = burn_rate.curve_point(
+                    window, prefix[offset + window + 1] - prefix[offset], target
+                )
+                rows.append(
+                    (computed_at, group, window, point["daily_rate"], target, point["deviation"])
+                )
+
+    database.execute(
+        """
+        DELETE FROM burn_rate_snapshots
+        WHERE computed_at >= ? AND computed_at < date(?, '+1 day')
+        """,
+        (start.isoformat(), end.isoformat()),
+    )
+    database.executemany(
+        """
+        INSERT INTO burn_rate_snapshots
+        (computed_at, burn_rate_group, window_days, daily_burn_rate, target_rate, deviation)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def history(
+    group: str,
+    start: str,
+    end: str,
+    resolution: str = "daily",
+    window: int | None = None,
+) -> list[dict]:
+    """
+    Snapshot curves for a group between start and end dates (inclusive).
+
+    Each period averages the snapshots that fall in it. Returns
+    [{"period", "target", "curve": [{"window", "daily_rate", "deviation"}]}].
+    """
+    bucket = RESOLUTIONS[resolution]
+    query = f"""
+        SELECT {bucket} AS period, window_days,
+               AVG(daily_burn_rate) AS daily_rate,
+               AVG(target_rate) AS target,
+               AVG(deviation) AS deviation
+        FROM burn_rate_snapshots
+        WHERE burn_rate_group = ?
+        AND computed_at >= ? AND computed_at < date(?, '+1 day')
+    """
+    params: list = [group, start, end]
+    if window is not None:
+        query += " AND window_days = ?"
+        params.append(window)
+    query += " GROUP BY period, window_days ORDER BY period, window_days"
+
+    periods: dict[str, dict] = {}
+    for row in database.fetchall(query, tuple(params)):
+        period = periods.setdefault(
+            row["period"],
+            {"period": row["period"], "target": round(row["target"], 2), "curve": []},
+        )
+        period["curve"].append({
+            "window": row["window_days"],
+            "daily_rate": round(row["daily_rate"], 2),
+            "deviation": round(row["deviation"], 2),
+        })
+    return list(periods.values())
+
+
+def main(argv: list[str]) -> int:
+    """Command-line entry point: backfill [START [END]] (YYYY-MM-DD)."""
+    if not argv or argv[0] != "backfill":
+        print("usage: python -m src.snapshots backfill [START [END]]")
+        return 2
+
+    end = date.fromisoformat(argv[2]) if len(argv) > 2 else datetime.now().date()
+    if len(argv) > 1:
+        start = date.fromisoformat(argv[1])
+    else:
+        earliest = database.fetchone("SELECT MIN(date) AS date FROM daily_spend")
+        start = date.fromisoformat(earliest["date"]) if earliest["date"] else end
+    start = earliest_backfill(start)
+
+    written = backfill(start, end)
+    database.commit()
+    database.upload_database()
+    print(f"{written} snapshot rows written for {start} to {end}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
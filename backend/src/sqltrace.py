@@ -0,0 +1,104 @@
+"""Opt-in SQL statement tracing.
+
+With SQL_TRACE=1 the database wrappers record every statement under its
+fingerprint (the SQL with literals replaced and whitespace collapsed): call
+count, total and max time, and rows returned or affected. Statements slower
+than SLOW_QUERY_MS are logged as they finish, and log_summary() writes one
+line per request with the busiest fingerprints, flagging any run
+REPEATED_QUERY_COUNT times or more so N+1 loops stand out.
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("SQL_TRACE", "") not in ("", "0")
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "50"))
+
+# Statements run this often in one request are reported as likely N+1 patterns
+REPEATED_QUERY_COUNT = 10
+
+# Fingerprints listed in the per-request summary, by total time
+SUMMARY_SIZE = 10
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+
+
+_stats: dict[str, QueryStats] = {}
+_fingerprints: dict[str, str] = {}
+
+
+def fingerprint(sql: str) -> str:
+    """Statement text with literals replaced, so calls with different values group together."""
+    cached = _fingerprints.get(sql)
+    if cached is not None:
+        return cached
+    text = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    text = re.sub(r"\b\d+(?:\.\d+)?\b", "?", text)
+    text = re.sub(r"\?(?:\s*,\s*\?)+", "?", text)  # collapse IN lists and VALUES tuples
+    text = " ".join(text.split())
+    if len(_fingerprints) < 10_000:
+        _fingerprints[sql] = text
+    return text
+
+
+def reset() -> None:
+    """Start recording a new request."""
+    _stats.clear()
+
+
+def record(sql: str, seconds: float, rows: int) -> None:
+    """Add one statement execution to the current request's stats."""
+    key = fingerprint(sql)
+    ms = seconds * 1000
+    stats = _stats.setdefault(key, QueryStats())
+    stats.count += 1
+    stats.total_ms += ms
+    stats.max_ms = max(stats.max_ms, ms)
+    stats.rows += rows
+    if ms >= SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({ms:.1f} ms, {rows} rows): {key}")
+
+
+def summary() -> dict:
+    """Totals for the current request plus the fingerprints that took longest."""
+    ranked = sorted(_stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+    return {
+        "statements": sum(s.count for s in _stats.values()),
+        "distinct": len(_stats),
+        "total_ms": round(sum(s.total_ms for s in _stats.values()), 3),
+        "top": [
+            {
+                "sql": sql,
+                "count": s.count,
+                "total_ms": round(s.total_ms, 3),
+                "max_ms": round(s.max_ms, 3),
+                "rows": s.rows,
+            }
+            for sql, s in ranked[:SUMMARY_SIZE]
+        ],
+        "repeated": [
+            {"sql": sql, "count": s.count}
+            for sql, s in _stats.items()
+            if s.count >= REPEATED_QUERY_COUNT
+        ],
+    }
+
+
+def log_summary(route: str) -> None:
+    """Log the request's statement summary, as a warning if any statement repeated."""
+    if not ENABLED or not _stats:
+        return
+    result = summary()
+    level = logging.WARNING if result["repeated"] else logging.INFO
+    logger.log(level, f"SQL summary {route}: {json.dumps(result)}")
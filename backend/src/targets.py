@@ -0,0 +1,157 @@
+"""Target learning: feedback-driven adjustments and their history.
+
+Each "good" feedback moves a group's daily target toward the current 14-day
+rate and appends the new value to target_history, so the trajectory and
+feedback hit rates are read back with window queries over the
+(burn_rate_group, date) indexes instead of replaying feedback in Python.
+"""
+
+from datetime import datetime
+
+from . import database
+
+# Weight of the current rate when a "good" feedback adjusts the target
+LEARNING_RATE = 0.2
+
+# Feedback entries in the rolling hit-rate window
+ROLLING_FEEDBACK = 10
+
+
+def current_target(group: str) -> float:
+    """A group's daily target, 0 if none is set."""
+    row = database.fetchone(
+        "SELECT daily_target FROM targets WHERE burn_rate_group = ?", (group,)
+    )
+    return float(row["daily_target"]) if row else 0
+
+
+def submit_feedback(group: str, sentiment: str, burn_rate: float) -> float | None:
+    """
+    Store feedback and, if it is "good", adjust the target.
+
+    Returns the new target, or None when the target is unchanged.
+    """
+    today = datetime.now().date().isoformat()
+    old_target = current_target(group)
+    cursor = database.execute(
+        """
+        INSERT INTO feedback
+        (burn_rate_group, feedback_date, period_end_date, sentiment, burn_rate_at_feedback, target_at_feedback)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (group, today, today, sentiment, burn_rate, old_target),
+    )
+
+    if sentiment != "good":
+        return None
+
+    # new_target = (0.8 * old) + (0.2 * current)
+    new_target = round((1 - LEARNING_RATE) * old_target + LEARNING_RATE * burn_rate, 2)
+    database.execute(
+        "UPDATE targets SET daily_target = ?, updated_at = CURRENT_TIMESTAMP WHERE burn_rate_group = ?",
+        (new_target, group),
+    )
+    database.execute(
+        """
+        INSERT INTO target_history (burn_rate_group, effective_date, daily_target, feedback_id)
+        VALUES (?, ?, ?, ?)
+        """,
+        (group, today, new_target, cursor.lastrowid),
+    )
+    return new_target
+
+
+def trajectory(group: str, start: str, end: str) -> list[dict]:
+    """
+    Target values in effect from start to end (inclusive), oldest first.
+
+    The first point is the target in effect on start, even if it was set
+    earlier; each point carries its change from the previous value.
+    """
+    rows = database.fetchall(
+        """
+        SELECT effective_date, daily_target, change, feedback_id
+        FROM (
+            SELECT id, effective_date, daily_target, feedback_id,
+                   daily_target - LAG(daily_target) OVER (ORDER BY effective_date, id) AS change,
+                   LEAD(effective_date) OVER (ORDER BY effective_date, id) AS next_date
+            FROM target_history
+            WHERE burn_rate_group = ? AND effective_date <= ?
+        )
+        WHERE effective_date >= ? OR next_date IS NULL OR next_date > ?
+        ORDER BY effective_date, id
+        """,
+        (group, end, start, start),
+    )
+    return [
+        {
+            "date": row["effective_date"],
+            "target": float(row["daily_target"]),
+            "change": round(row["change"], 2) if row["change"] is not None else None,
+            "feedback_id": row["feedback_id"],
+        }
+        for row in rows
+    ]
+
+
+def feedback_stats(group: str, start: str, end: str) -> dict:
+    """
+    Feedback counts and hit rates for a group over a date range.
+
+    "good_rate" is the share of good feedback; "on_target_rate" is the share
+    of feedback given while the 14-day rate was at or below the target then
+    in effect (feedback from before targets were recorded is not counted).
+    "rolling" repeats both over the last ROLLING_FEEDBACK entries at each
+    feedback.
+    """
+    rows = database.fetchall(
+        f"""
+        SELECT feedback_date, sentiment, burn_rate_at_feedback, target_at_feedback,
+               AVG(sentiment = 'good') OVER recent AS good_rate,
+               AVG(burn_rate_at_feedback <= target_at_feedback) OVER recent AS on_target_rate
+        FROM feedback
+        WHERE burn_rate_group = ? AND feedback_date >= ? AND feedback_date <= ?
+        WINDOW recent AS (
+            ORDER BY feedback_date, id ROWS BETWEEN {ROLLING_FEEDBACK - 1} PRECEDING AND CURRENT ROW
+        )
+        ORDER BY feedback_date, id
+        """,
+        (group, start, end),
+    )
+    totals = database.fetchone(
+        """
+        SELECT COUNT(*) AS count,
+               SUM(sentiment = 'good') AS good,
+               AVG(sentiment = 'good') AS good_rate,
+               AVG(burn_rate_at_feedback <= target_at_feedback) AS on_target_rate
+        FROM feedback
+        WHERE burn_rate_group = ? AND feedback_date >= ? AND feedback_date <= ?
+        """,
+        (group, start, end),
+    )
+
+    def rate(value: float | None) -> float | None:
+        return round(value, 3) if value is not None else None
+
+    return {
+        "count": totals["count"],
+        "good": totals["good"] or 0,
+        "bad": totals["count"] - (totals["good"] or 0),
+        "good_rate": rate(totals["good_rate"]),
+        "on_target_rate": rate(totals["on_target_rate"]),
+        "rolling": [
+            {
+                "date": row["feedback_date"],
+                "sentiment": row["sentiment"],
+                "burn_rate": float(row["burn_rate_at_feedback"]),
+                "target": (
+                    float(row["target_at_feedback"])
+                    if row["target_at_feedback"] is not None
+                    else None
+                ),
+                "good_rate": rate(row["good_rate"]),
+                "on_target_rate": rate(row["on_target_rate"]),
+            }
+            for row in rows
+        ],
+    }
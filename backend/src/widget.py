@@ -0,0 +1,163 @@
+"""Precomputed widget document published next to the database in S3.
+
+The iOS widget needs only the arrows, the 14-day rates, the targets and the
+/status counts. After every database upload those are rendered into a small
+JSON document and a fixed-size binary variant under widget/ in the data
+bucket, where CloudFront serves them (behind a token check) without invoking
+the Lambda. Staleness is bounded by the last write plus the cache max-age.
+
+Binary layout (little-endian, 41 bytes):
+    4s  magic b"BRW1"
+    I   data version (low 32 bits)
+    I   generated_at, Unix seconds
+    H   pending review count
+    then for food, discretionary, explosion:
+    B   arrow (index into ARROWS)
+    i   14-day daily rate in cents
+    i   target in cents (explosion: 30-day total in cents)
+"""
+
+import json
+import logging
+import struct
+from datetime import UTC, datetime
+
+import boto3
+
+from . import burn_rate, database
+
+logger = logging.getLogger(__name__)
+
+WIDGET_JSON_KEY = "widget/status.json"
+WIDGET_BINARY_KEY = "widget/status.bin"
+WIDGET_CACHE_CONTROL = "max-age=60"
+
+MAGIC = b"BRW1"
+ARROWS = ["neutral", "improving", "stable", "worsening"]
+_HEADER = struct.Struct("<4sIIH")
+_GROUP = struct.Struct("<Bii")
+
+# Data version of the documents this container last published
+_published_version: int | None = None
+
+
+def status_counts() -> dict:
+    """Last update time and pending review count."""
+    # Get last transaction date
+    last_txn = database.fetchone(
+        "SELECT MAX(created_at) as last_update FROM transactions"
+    )
+
+    # Get pending review count
+    review_count = database.fetchone(
+        "SELECT COUNT(*) as count FROM transactions WHERE needs_review = 1"
+    )
+
+    return {
+        "last_update": last_txn["last_update"] if last_txn else None,
+        "pending_review_count": review_count["count"] if review_count else 0,
+    }
+
+
+def build_payload() -> dict:
+    """The widget document for the current data version."""
+    version = database.data_version()
+    rates = burn_rate.cached_burn_rate(version)
+
+    groups = {}
+    for group in burn_rate.GROUPS:
+        data = rates[group]
+        entry = {"arrow": data["arrow"], "current_14day": data.get("current_14day", 0)}
+        if group == "explosion":
+            entry["total_30day"] = data.get("total_30day", 0)
+        else:
+            entry["target"] = data["target"]
+        groups[group] = entry
+
+    return {
+        "version": version,
+        "generated_at": int(datetime.now(UTC).timestamp()),
+        **status_counts(),
+        "groups": groups,
+    }
+
+
+def _cents(value: float) -> int:
+    return round(value * 100)
+
+
+def encode_binary(payload: dict) -> bytes:
+    """Pack a widget document into the fixed binary layout."""
+    parts = [
+        _HEADER.pack(
+            MAGIC,
+            payload["version"] & 0xFFFFFFFF,
+            payload["generated_at"],
+            min(payload["pending_review_count"], 0xFFFF),
+        )
+    ]
+    for group in burn_rate.GROUPS:
+        entry = payload["groups"][group]
+        parts.append(_GROUP.pack(
+            ARROWS.index(entry["arrow"]),
+            _cents(entry["current_14day"]),
+            _cents(entry["total_30day"] if group == "explosion" else entry["target"]),
+        ))
+    return b"".join(parts)
+
+
+def decode_binary(data: bytes) -> dict:
+    """Unpack the binary layout; the inverse of encode_binary for numeric fields."""
+    magic, version, generated_at, pending = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a widget document")
+
+    groups = {}
+    for i, group in enumerate(burn_rate.GROUPS):
+        arrow, rate, second = _GROUP.unpack_from(data, _HEADER.size + i * _GROUP.size)
+        key = "total_30day" if group == "explosion" else "target"
+        groups[group] = {"arrow": ARROWS[arrow], "current_14day": rate / 100, key: second / 100}
+
+    return {
+        "version": version,
+        "generated_at": generated_at,
+        "pending_review_count": pending,
+        "groups": groups,
+    }
+
+
+def publish() -> None:
+    """
+    Render and upload the widget documents. Failures are logged, not raised.
+
+    Uploads that leave the data version unchanged (session bookkeeping)
+    skip publishing, as does a version this container already published.
+    """
+    global _published_version
+
+    try:
+        version = database.data_version()
+        if version == _published_version:
+            return
+
+        payload = build_payload()
+        s3 = boto3.client("s3")
+        s3.put_object(
+            Bucket=database.DATA_BUCKET,
+            Key=WIDGET_JSON_KEY,
+            Body=json.dumps(payload, separators=(",", ":")).encode(),
+            ContentType="application/json",
+            CacheControl=WIDGET_CACHE_CONTROL,
+        )
+        s3.put_object(
+            Bucket=database.DATA_BUCKET,
+            Key=WIDGET_BINARY_KEY,
+            Body=encode_binary(payload),
+            ContentType="application/octet-stream",
+            CacheControl=WIDGET_CACHE_CONTROL,
+        )
+        _published_version = version
+        logger.info(f"Published widget documents for version {version}")
+    except Exception as e:
+        # The database upload already succeeded; the widget catches up next write
+        logger.error(f"Failed to publish widget documents: {e}")
@@ -0,0 +1,79 @@
+"""Shared test fixtures."""
+
+import os
+
+import pytest
+
+# Set up test environment before imports
+os.environ.setdefault("PASSWORD_HASH", "$2b$12$xDViKv.rRp4BcfMlpp2qW.lZirz6IH79fC8QDvnPAx4BYnEQi.WCi")
+os.environ.setdefault("JWT_SECRET", "test-jwt-secret")
+
+# Importing the handler registers the commit and upload hooks, as in production
+from src import burn_rate, categories, database, handler  # noqa: F401
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Point the database module at a fresh, schema-initialized SQLite file."""
+    database.close()
+    monkeypatch.setattr(database, "_db_path", str(tmp_path / "test.db"))
+    monkeypatch.setattr(categories, "_group_map", None)
+    monkeypatch.setattr(burn_rate, "_result_cache", {})
+    database.get_connection()
+    yield database
+    database.close()
+
+
+class FakeS3:
+    """Records upload_file and put_object calls in place of a boto3 S3 client."""
+
+    def __init__(self):
+        self.uploads = 0
+        self.objects = {}
+
+    def upload_file(self, *args):
+        self.uploads += 1
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """Enable S3 sync against an in-memory fake bucket."""
+    fake = FakeS3()
+    monkeypatch.setattr(database, "DATA_BUCKET", "test-bucket")
+    monkeypatch.setattr(database.boto3, "client", lambda service: fake)
+    return fake
+
+
+def add_transaction(
+    description: str,
+    amount: float,
+    date: str,
+    account_id: int = 4,
+    category_id: int | None = None,
+    needs_review: bool = True,
+    **flags: int,
+) -> int:
+    """Insert a transaction directly and return its id."""
+    cursor = database.execute(
+        """
+        INSERT INTO transactions
+        (account_id, date, description, amount, category_id, needs_review,
+         is_recurring, is_explosion, dedup_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            account_id,
+            date,
+            description,
+            amount,
+            category_id,
+            1 if needs_review else 0,
+            flags.get("is_recurring", 0),
+            flags.get("is_explosion", 0),
+            f"{date}:{description}:{amount}:{os.urandom(4).hex()}",
+        ),
+    )
+    return cursor.lastrowid
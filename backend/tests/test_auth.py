@@ -0,0 +1,123 @@
+"""Tests for access token caching and refresh token rotation."""
+
+import json
+import time
+
+import pytest
+
+from src import auth, database
+from src.handler import handle_logout, handle_refresh
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(auth, "_verified", auth.OrderedDict())
+
+
+def refresh(token: str) -> dict:
+    return handle_refresh({"body": json.dumps({"refresh_token": token})})
+
+
+class TestVerifiedTokenCache:
+    def test_cached_after_first_verification(self, monkeypatch):
+        token = auth.generate_token()
+        assert auth.verify_token(token)[0]
+
+        monkeypatch.setattr(auth, "_decode", lambda t: pytest.fail("decoded again"))
+        assert auth.verify_token(token)[0]
+
+    def test_cached_token_expires(self, monkeypatch):
+        token = auth.generate_token()
+        assert auth.verify_token(token)[0]
+
+        later = time.time() + auth.ACCESS_TOKEN_MINUTES * 60 + 1
+        monkeypatch.setattr(auth.time, "time", lambda: later)
+        assert auth.verify_token(token) == (False, None)
+        assert token not in auth._verified
+
+    def test_bounded_size(self, monkeypatch):
+        monkeypatch.setattr(auth, "VERIFIED_CACHE_SIZE", 2)
+        tokens = [auth._sign({"typ": "access", "exp": time.time() + 60, "n": i}) for i in range(3)]
+        for token in tokens:
+            auth.verify_token(token)
+        assert list(auth._verified) == tokens[1:]
+
+    def test_invalid_tokens_not_cached(self):
+        assert auth.verify_token("not.a.token") == (False, None)
+        assert auth._verified == {}
+
+
+class TestRefreshTokens:
+    def test_rotation(self, db):
+        session = auth.start_session()
+        database.commit_bookkeeping()
+
+        response = refresh(session["refresh_token"])
+        assert response["statusCode"] == 200
+        renewed = json.loads(response["body"])
+        assert auth.verify_token(renewed["token"])[0]
+        assert renewed["refresh_token"] != session["refresh_token"]
+        assert renewed["expires_in"] == auth.ACCESS_TOKEN_MINUTES * 60
+
+        # The rotated token works once more
+        assert refresh(renewed["refresh_token"])["statusCode"] == 200
+
+    def test_access_tokens_are_short_lived_by_default(self):
+        assert auth.ACCESS_TOKEN_MINUTES == 60
+
+    def test_reuse_revokes_family(self, db, monkeypatch):
+        session = auth.start_session()
+        rotated = auth.refresh_session(session["refresh_token"])
+
+        later = time.time() + auth.REFRESH_GRACE_SECONDS + 1
+        monkeypatch.setattr(auth.time, "time", lambda: later)
+        assert auth.refresh_session(session["refresh_token"]) is None
+        assert auth.refresh_session(rotated["refresh_token"]) is None
+        assert database.fetchone("SELECT revoked FROM refresh_tokens")["revoked"] == 1
+
+    def test_older_generations_rejected_within_grace(self, db):
+        session = auth.start_session()
+        rotated = auth.refresh_session(session["refresh_token"])
+        auth.refresh_session(rotated["refresh_token"])
+
+        assert auth.refresh_session(session["refresh_token"]) is None
+        assert database.fetchone("SELECT revoked FROM refresh_tokens")["revoked"] == 1
+
+    def test_previous_generation_accepted_briefly(self, db):
+        session = auth.start_session()
+        rotated = auth.refresh_session(session["refresh_token"])
+
+        # A second tab refreshing with the token the first one just rotated
+        again = auth.refresh_session(session["refresh_token"])
+        assert again["refresh_token"] == rotated["refresh_token"]
+        assert database.fetchone("SELECT generation, revoked FROM refresh_tokens")[:] == (1, 0)
+
+    def test_refresh_does_not_change_data_version(self, db):
+        session = auth.start_session()
+        database.commit_bookkeeping()
+        version = database.data_version()
+
+        assert refresh(session["refresh_token"])["statusCode"] == 200
+        assert database.data_version() == version
+
+    def test_tokens_are_not_interchangeable(self, db):
+        session = auth.start_session()
+        assert auth.verify_token(session["refresh_token"]) == (False, None)
+        assert auth.refresh_session(session["token"]) is None
+        assert refresh("garbage")["statusCode"] == 401
+
+    def test_logout_revokes_family(self, db):
+        session = auth.start_session()
+        rotated = auth.refresh_session(session["refresh_token"])
+
+        response = handle_logout({"body": json.dumps({"refresh_token": rotated["refresh_token"]})})
+        assert response["statusCode"] == 200
+        assert refresh(rotated["refresh_token"])["statusCode"] == 401
+        assert handle_logout({"body": json.dumps({"refresh_token": "garbage"})})["statusCode"] == 401
+
+    def test_expired_families_removed_at_login(self, db):
+        database.execute(
+            "INSERT INTO refresh_tokens (family, generation, expires_at) VALUES ('old', 0, 1)"
+        )
+        auth.start_session()
+        assert database.fetchone("SELECT COUNT(*) AS n FROM refresh_tokens")["n"] == 1
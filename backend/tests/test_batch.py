@@ -0,0 +1,58 @@
+"""Tests for the batched mutation endpoint."""
+
+import json
+
+from src.handler import handle_batch
+
+from .conftest import add_transaction
+
+
+def batch_event(operations: list) -> dict:
+    return {"body": json.dumps({"operations": operations})}
+
+
+class TestBatch:
+    """Tests for POST /batch."""
+
+    def test_batch_applies_all_with_one_upload(self, db, s3):
+        """All operations should apply and the database upload only once."""
+        txn_a = add_transaction("COFFEE", -4.0, "2026-01-02")
+        txn_b = add_transaction("BOOKS", -20.0, "2026-01-03")
+        db.commit()
+
+        response = handle_batch(batch_event([
+            {"method": "PUT", "path": f"/transactions/{txn_a}/categorize", "body": {"category_id": 1}},
+            {"method": "PUT", "path": f"/transactions/{txn_b}/categorize", "body": {"category_id": 2}},
+            {"method": "PATCH", "path": f"/api/transactions/{txn_b}/explosion"},
+        ]))
+        body = json.loads(response["body"])
+
+        assert response["statusCode"] == 200
+        assert [r["status"] for r in body["results"]] == [200, 200, 200]
+        assert body["results"][2]["body"] == {"is_explosion": True}
+        assert s3.uploads == 1
+        row = db.fetchone("SELECT category_id, is_explosion FROM transactions WHERE id = ?", (txn_b,))
+        assert row["category_id"] == 2 and row["is_explosion"] == 1
+
+    def test_batch_rolls_back_on_failure(self, db, s3):
+        """A failing operation should roll back earlier ones and skip upload."""
+        txn = add_transaction("COFFEE", -4.0, "2026-01-02")
+        db.commit()
+
+        response = handle_batch(batch_event([
+            {"method": "PUT", "path": f"/transactions/{txn}/categorize", "body": {"category_id": 1}},
+            {"method": "PUT", "path": "/transactions/99999/categorize", "body": {"category_id": 1}},
+        ]))
+        body = json.loads(response["body"])
+
+        assert response["statusCode"] == 400
+        assert body["failed_index"] == 1
+        assert s3.uploads == 0
+        row = db.fetchone("SELECT category_id, needs_review FROM transactions WHERE id = ?", (txn,))
+        assert row["category_id"] is None and row["needs_review"] == 1
+
+    def test_batch_rejects_reads_and_nesting(self, db):
+        """GET and nested batch operations should be rejected up front."""
+        for op in ({"method": "GET", "path": "/transactions"}, {"method": "POST", "path": "/batch"}):
+            response = handle_batch(batch_event([op]))
+            assert response["statusCode"] == 400
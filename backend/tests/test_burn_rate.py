@@ -0,0 +1,153 @@
+"""Tests for the burn rate engine."""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from src import burn_rate
+
+from .conftest import add_transaction
+
+TODAY = date(2026, 3, 15)
+
+
+def reference_curve(db, group: str, target: float) -> list[dict]:
+    """The original per-window computation, one SUM query per window."""
+    cat_ids = [c["id"] for c in db.fetchall(
+        "SELECT id FROM categories WHERE burn_rate_group = ?", (group,)
+    )]
+    placeholders = ",".join("?" * len(cat_ids))
+    flags = "" if group == "explosion" else "AND is_recurring = 0 AND is_explosion = 0"
+    curve = []
+    for window in range(5, 31):
+        row = db.fetchone(
+            f"""
+            SELECT COALESCE(SUM(ABS(amount)), 0) as total FROM transactions
+            WHERE category_id IN ({placeholders}) AND date >= ? AND date <= ?
+            {flags} AND amount < 0
+            """,
+            (*cat_ids, (TODAY - timedelta(days=window)).isoformat(), TODAY.isoformat()),
+        )
+        daily_rate = float(row["total"]) / window
+        curve.append({
+            "window": window,
+            "daily_rate": round(daily_rate, 2),
+            "deviation": round(daily_rate - target, 2),
+        })
+    return curve
+
+
+class TestComputeBurnRate:
+    """Tests for compute_burn_rate."""
+
+    def test_matches_per_window_queries(self, db):
+        """Prefix-sum curves equal the original per-window SQL results."""
+        rng = random.Random(3)
+        for _ in range(400):
+            add_transaction(
+                "SHOP",
+                -rng.randint(100, 9000) / 100 if rng.random() < 0.9 else 25.0,
+                (TODAY - timedelta(days=rng.randrange(-3, 40))).isoformat(),
+                category_id=rng.randint(1, 5),
+                needs_review=False,
+                is_recurring=int(rng.random() < 0.1),
+                is_explosion=int(rng.random() < 0.1),
+            )
+
+        result = burn_rate.compute_burn_rate(TODAY)
+
+        for group, target in [("food", 30.0), ("discretionary", 20.0), ("explosion", 0)]:
+            expected = reference_curve(db, group, target)
+            assert [p["window"] for p in result[group]["curve"]] == list(range(5, 31))
+            # The reference rounds a float SUM, so it can land either side of a
+            # half-cent boundary; the engine rounds the exact cents half-up
+            for actual, reference in zip(result[group]["curve"], expected, strict=True):
+                assert abs(actual["daily_rate"] - reference["daily_rate"]) < 0.0101
+                assert abs(actual["deviation"] - reference["deviation"]) < 0.0101
+        assert result["food"]["current_14day"] == result["food"]["curve"][9]["daily_rate"]
+
+    def test_window_includes_both_ends(self, db):
+        """A 5-day window covers today and the five days before it."""
+        add_transaction("A", -60.0, TODAY.isoformat(), category_id=1, needs_review=False)
+        add_transaction("B", -40.0, (TODAY - timedelta(days=5)).isoformat(), category_id=1, needs_review=False)
+        add_transaction("C", -999.0, (TODAY - timedelta(days=6)).isoformat(), category_id=1, needs_review=False)
+
+        curve = burn_rate.compute_burn_rate(TODAY)["food"]["curve"]
+
+        assert curve[0] == {"window": 5, "daily_rate": 20.0, "deviation": -10.0}
+
+    def test_subcategory_spend_counts_toward_root_group(self, db):
+        """Spending in a nested food subcategory shows up on the food curve."""
+        from src import categories
+
+        cursor = db.execute(
+            "INSERT INTO categories (name, burn_rate_group, parent_id) VALUES ('Coffee', 'discretionary', 1)"
+        )
+        categories.add_category(cursor.lastrowid, 1)
+        add_transaction("CAFE", -50.0, TODAY.isoformat(), category_id=cursor.lastrowid, needs_review=False)
+
+        result = burn_rate.compute_burn_rate(TODAY)
+
+        assert result["food"]["curve"][0]["daily_rate"] == 10.0
+        assert result["discretionary"]["curve"][0]["daily_rate"] == 0.0
+
+    def test_half_cent_rounds_up(self, db):
+        """Rates exactly on a half cent round up regardless of float error."""
+        add_transaction("X", -1240.62, TODAY.isoformat(), category_id=4, needs_review=False)
+
+        curve = burn_rate.compute_burn_rate(TODAY)["explosion"]["curve"]
+
+        assert curve[7] == {"window": 12, "daily_rate": 103.39, "deviation": 103.39}
+
+    def test_rounding_differs_from_float_round_on_half_cents(self, db):
+        """
+        Half cents round away from zero, where the original float round()
+        could go either way: 1.05 / 6 = 0.175 is -29.825 from the 30.00
+        food target, which it rounded to -29.82.
+        """
+        add_transaction("X", -1.05, TODAY.isoformat(), category_id=1, needs_review=False)
+
+        point = burn_rate.compute_burn_rate(TODAY)["food"]["curve"][1]
+
+        assert round(1.05 / 6 - 30.0, 2) == -29.82
+        assert point == {"window": 6, "daily_rate": 0.18, "deviation": -29.83}
+
+
+class TestSelection:
+    """Tests for as-of dates, group and window selection."""
+
+    def seed(self):
+        for days_ago in range(40):
+            day = (TODAY - timedelta(days=days_ago)).isoformat()
+            add_transaction("GROCERY", -(days_ago + 1.0), day, category_id=1, needs_review=False)
+            add_transaction("SHOP", -7.0, day, category_id=2, needs_review=False)
+
+    def test_selected_windows_match_full_curve(self, db):
+        self.seed()
+        full = burn_rate.compute_burn_rate(TODAY)["food"]["curve"]
+        result = burn_rate.compute_burn_rate(TODAY, ["food"], [30, 7, 14, 7])
+
+        assert list(result) == ["food"]
+        assert result["food"]["curve"] == [full[2], full[9], full[25]]
+        assert result["food"]["current_14day"] == full[9]["daily_rate"]
+
+    def test_as_of_shifts_window(self, db):
+        self.seed()
+        as_of = TODAY - timedelta(days=3)
+        point = burn_rate.compute_burn_rate(as_of, ["food"], [5])["food"]["curve"][0]
+
+        # Days 3..8 ago cost 4..9 dollars each
+        assert point["daily_rate"] == round(sum(range(4, 10)) / 5, 2)
+        assert "current_14day" not in burn_rate.compute_burn_rate(as_of, ["food"], [5])["food"]
+
+    def test_window_rate_matches_curve(self, db):
+        self.seed()
+        result = burn_rate.compute_burn_rate(TODAY)
+
+        for group in ["food", "discretionary"]:
+            assert burn_rate.window_rate(group, 14, TODAY) == result[group]["current_14day"]
+
+    def test_rejects_out_of_range_windows(self, db):
+        with pytest.raises(ValueError):
+            burn_rate.compute_burn_rate(TODAY, windows=[0, 5])
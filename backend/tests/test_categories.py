@@ -0,0 +1,66 @@
+"""Tests for the category hierarchy closure and group resolution."""
+
+import json
+
+from src import categories
+from src.handler import (
+    handle_create_category,
+    handle_delete_category,
+    handle_update_category,
+)
+
+
+def create(name: str, group: str, parent_id: int | None = None) -> int:
+    response = handle_create_category({
+        "body": json.dumps({"name": name, "burn_rate_group": group, "parent_id": parent_id})
+    })
+    return json.loads(response["body"])["id"]
+
+
+class TestCategoryClosure:
+    """Tests for closure maintenance on create, update and delete."""
+
+    def test_nested_subcategory_resolves_to_root_group(self, db):
+        """A grandchild of Food should count as food."""
+        groceries = create("Groceries", "discretionary", parent_id=1)
+        produce = create("Produce", "discretionary", parent_id=groceries)
+
+        assert categories.group_map()[produce] == "food"
+        assert produce in categories.ids_for_group("food")
+        assert categories.descendants(1) == [1, groceries, produce]
+
+    def test_move_subtree_regroups_descendants(self, db):
+        """Re-parenting moves the whole subtree to the new root's group."""
+        groceries = create("Groceries", "food", parent_id=1)
+        produce = create("Produce", "food", parent_id=groceries)
+        assert categories.group_map()[produce] == "food"
+
+        handle_update_category({"body": json.dumps({"parent_id": 2})}, groceries)
+
+        assert categories.group_map()[produce] == "discretionary"
+        assert categories.descendants(1) == [1]
+
+    def test_cycle_is_rejected(self, db):
+        """A category cannot be moved beneath its own descendant."""
+        child = create("Child", "food", parent_id=1)
+        response = handle_update_category({"body": json.dumps({"parent_id": child})}, 1)
+        assert response["statusCode"] == 400
+
+    def test_delete_detaches_children(self, db):
+        """Deleting a parent makes its children top-level categories."""
+        parent = create("Parent", "food")
+        child = create("Child", "discretionary", parent_id=parent)
+
+        handle_delete_category({}, parent)
+
+        assert categories.group_map()[child] == "discretionary"
+        assert parent not in categories.group_map()
+
+    def test_root_regroup_invalidates_cache(self, db):
+        """Changing a root's group should be visible through the cache."""
+        child = create("Child", "food", parent_id=1)
+        assert categories.group_map()[child] == "food"
+
+        handle_update_category({"body": json.dumps({"burn_rate_group": "excluded"})}, 1)
+
+        assert categories.group_map()[child] == "excluded"
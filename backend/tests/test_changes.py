@@ -0,0 +1,109 @@
+"""Tests for change versions and GET /changes."""
+
+import json
+
+from src import changes, database
+from src.handler import handle_get_changes
+
+from .conftest import add_transaction
+
+
+def sync(since: int = 0, limit: int | None = None) -> dict:
+    params = {"since": str(since), **({"limit": str(limit)} if limit else {})}
+    response = handle_get_changes({"queryStringParameters": params})
+    assert response["statusCode"] == 200, response
+    return json.loads(response["body"])
+
+
+def ids(body: dict, table: str) -> list[int]:
+    return [row["id"] for row in body["changes"][table]]
+
+
+class TestChanges:
+    def test_full_sync_from_zero(self, db):
+        body = sync()
+        assert ids(body, "categories") == [1, 2, 3, 4, 5]
+        assert body["version"] == changes.current_version() > 0
+        assert body["has_more"] is False
+
+    def test_only_changed_rows_after_version(self, db):
+        first = add_transaction("CAFE", -4.5, "2026-01-05")
+        second = add_transaction("BAKERY", -8.0, "2026-01-05")
+        database.commit()
+        version = sync()["version"]
+
+        database.execute("UPDATE transactions SET category_id = 1 WHERE id = ?", (first,))
+        database.execute("DELETE FROM transactions WHERE id = ?", (second,))
+        database.execute("INSERT INTO rules (pattern, category_id) VALUES ('CAFE', 1)")
+        database.commit()
+
+        body = sync(version)
+        assert [(t["id"], t["category_id"]) for t in body["changes"]["transactions"]] == [(first, 1)]
+        assert body["deleted"]["transactions"] == [second]
+        assert [r["pattern"] for r in body["changes"]["rules"]] == ["CAFE"]
+        assert body["changes"]["categories"] == []
+
+        assert sync(body["version"])["changes"]["transactions"] == []
+
+    def test_row_changed_twice_is_sent_once(self, db):
+        txn = add_transaction("CAFE", -4.5, "2026-01-05")
+        database.execute("UPDATE transactions SET amount = -5 WHERE id = ?", (txn,))
+        database.commit()
+
+        body = sync(5)
+        assert ids(body, "transactions") == [txn]
+        assert body["changes"]["transactions"][0]["amount"] == -5
+
+    def test_paging(self, db):
+        for i in range(7):
+            add_transaction(f"T{i}", -1.0, "2026-01-05")
+        database.commit()
+
+        seen, since, has_more = [], 5, True  # Categories seeded as versions 1-5
+        while has_more:
+            body = sync(since, limit=3)
+            seen.extend(ids(body, "transactions"))
+            since, has_more = body["version"], body["has_more"]
+
+        assert len(seen) == 7 == len(set(seen))
+
+    def test_invalid_since(self, db):
+        for since in ["abc", "-1", str(changes.current_version() + 1)]:
+            response = handle_get_changes({"queryStringParameters": {"since": since}})
+            assert response["statusCode"] == 400
+
+
+class TestCompaction:
+    def age(self, days: int) -> None:
+        database.execute(
+            "UPDATE change_log SET changed_at = changed_at - ? WHERE deleted = 1", (days * 86400,)
+        )
+
+    def test_old_tombstones_dropped(self, db):
+        txn = add_transaction("CAFE", -4.5, "2026-01-05")
+        database.commit()
+        before_delete = sync()["version"]
+        database.execute("DELETE FROM transactions WHERE id = ?", (txn,))
+
+        assert changes.compact() == 0
+        self.age(changes.TOMBSTONE_DAYS + 1)
+        assert changes.compact() == 1
+        assert database.fetchone("SELECT COUNT(*) AS n FROM change_log WHERE deleted = 1")["n"] == 0
+
+        assert ids(sync(), "transactions") == []
+        assert sync(changes.current_version())["deleted"]["transactions"] == []
+
+        # A client that might have missed the delete must start over
+        response = handle_get_changes({"queryStringParameters": {"since": str(before_delete)}})
+        assert response["statusCode"] == 410
+        assert json.loads(response["body"])["code"] == "RESYNC_REQUIRED"
+
+    def test_recent_tombstones_still_synced(self, db):
+        txn = add_transaction("CAFE", -4.5, "2026-01-05")
+        database.commit()
+        version = sync()["version"]
+        database.execute("DELETE FROM transactions WHERE id = ?", (txn,))
+        self.age(changes.TOMBSTONE_DAYS - 1)
+        changes.compact()
+
+        assert sync(version)["deleted"]["transactions"] == [txn]
@@ -0,0 +1,80 @@
+"""Tests for response compression."""
+
+import base64
+import gzip
+import json
+
+from src import auth, database, handler
+from src.handler import COMPRESS_MIN_BYTES, compress_response, json_response, lambda_handler
+
+from .conftest import add_transaction
+
+
+def accepting(encoding: str, accept: str = "application/json") -> dict:
+    return {"headers": {"Accept": accept, "Accept-Encoding": encoding}}
+
+
+def large_response() -> dict:
+    return json_response(200, {"items": ["x" * 50] * (COMPRESS_MIN_BYTES // 10)})
+
+
+class FakeBrotli:
+    @staticmethod
+    def compress(data: bytes, quality: int) -> bytes:
+        return b"br:" + data
+
+
+class TestCompression:
+    def test_gzip_when_accepted(self):
+        response = compress_response(accepting("gzip, deflate"), large_response())
+
+        assert response["isBase64Encoded"] is True
+        assert response["headers"]["Content-Encoding"] == "gzip"
+        assert response["headers"]["Vary"] == "Accept-Encoding"
+        assert gzip.decompress(base64.b64decode(response["body"])).decode() == large_response()["body"]
+
+    def test_brotli_preferred_when_installed(self, monkeypatch):
+        monkeypatch.setattr(handler, "brotli", FakeBrotli)
+        response = compress_response(accepting("gzip, br"), large_response())
+        assert response["headers"]["Content-Encoding"] == "br"
+
+        monkeypatch.setattr(handler, "brotli", None)
+        response = compress_response(accepting("gzip, br"), large_response())
+        assert response["headers"]["Content-Encoding"] == "gzip"
+
+    def test_uncompressed_cases(self):
+        small = json_response(200, {"ok": True})
+        assert compress_response(accepting("gzip"), small) is small
+
+        large = large_response()
+        assert compress_response({}, large) is large
+        assert compress_response(accepting("identity"), large) is large
+        assert compress_response(accepting("gzip;q=0"), large) is large
+
+    def test_only_for_json_accept(self):
+        """API Gateway decodes base64 bodies only for the binary media type."""
+        large = large_response()
+        assert compress_response(accepting("gzip", accept="*/*"), large) is large
+        assert compress_response({"headers": {"Accept-Encoding": "gzip"}}, large) is large
+
+        response = compress_response(accepting("gzip", accept="application/json; q=1, */*"), large)
+        assert response["headers"]["Content-Encoding"] == "gzip"
+
+    def test_lambda_handler_compresses_routes(self, db, monkeypatch):
+        monkeypatch.setattr(database, "sync_from_s3", lambda: None)  # keep the local test database
+        for i in range(40):
+            add_transaction(f"MERCHANT {i}", -1.0, "2026-01-01")
+        database.commit()
+        headers = {
+            "Authorization": f"Bearer {auth.generate_token()}",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+        }
+
+        response = lambda_handler(
+            {"httpMethod": "GET", "path": "/transactions", "headers": headers}, None
+        )
+
+        assert response["headers"]["Content-Encoding"] == "gzip"
+        body = json.loads(gzip.decompress(base64.b64decode(response["body"])))
+        assert len(body["transactions"]) == 40
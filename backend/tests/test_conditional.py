@@ -0,0 +1,117 @@
+"""Tests for data versioning, ETags and the burn rate result cache."""
+
+import json
+
+from src import burn_rate, database
+from src.handler import handle_get_burn_rate, handle_get_targets, handle_status
+
+from .conftest import add_transaction
+
+
+def with_etag(etag: str) -> dict:
+    return {"headers": {"If-None-Match": etag}}
+
+
+class TestDataVersion:
+    """Tests for the committed-write version token."""
+
+    def test_commit_with_writes_bumps_version(self, db):
+        """Only commits that wrote something advance the version."""
+        start = db.data_version()
+        db.commit()
+        assert db.data_version() == start
+
+        add_transaction("A", -1.0, "2026-01-01")
+        db.commit()
+        assert db.data_version() != start
+
+    def test_batch_bumps_once(self, db):
+        """A batch of writes is one committed version."""
+        start = db.data_version()
+        with database.batch():
+            add_transaction("A", -1.0, "2026-01-01")
+            db.commit()
+            add_transaction("B", -1.0, "2026-01-01")
+            db.commit()
+            assert db.data_version() == start
+        assert db.data_version() != start
+
+    def test_same_base_commits_get_distinct_versions(self, db):
+        """Two containers writing on top of the same download never share a version."""
+        start = db.data_version()
+        add_transaction("A", -1.0, "2026-01-01")
+        db.commit()
+        mine = db.data_version()
+
+        # The other container starts from the version this one started from
+        db.execute("UPDATE app_meta SET value = ? WHERE key = ?", (start, database.DATA_VERSION_KEY))
+        database.commit_bookkeeping()
+        add_transaction("B", -1.0, "2026-01-01")
+        db.commit()
+
+        assert db.data_version() not in (start, mine)
+
+
+class TestConditionalRequests:
+    """Tests for ETag / If-None-Match handling."""
+
+    def test_unchanged_poll_returns_304(self, db):
+        """Repeating a request with its ETag yields 304 and no body."""
+        for handler in (handle_get_burn_rate, handle_status, handle_get_targets):
+            first = handler({})
+            etag = first["headers"]["ETag"]
+
+            second = handler(with_etag(etag))
+
+            assert second["statusCode"] == 304
+            assert second["body"] == ""
+            assert second["headers"]["ETag"] == etag
+
+    def test_write_changes_etag(self, db):
+        """A committed write invalidates the previous ETag."""
+        etag = handle_status({})["headers"]["ETag"]
+        add_transaction("A", -1.0, "2026-01-01")
+        db.commit()
+
+        response = handle_status(with_etag(etag))
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"])["pending_review_count"] == 1
+
+    def test_304_skips_computation(self, db, monkeypatch):
+        """Neither the cache nor the engine runs for an unchanged poll."""
+        etag = handle_get_burn_rate({})["headers"]["ETag"]
+        calls = []
+        monkeypatch.setattr(burn_rate, "compute_burn_rate", lambda today: calls.append(today))
+
+        handle_get_burn_rate(with_etag(etag))
+        assert calls == []
+
+    def test_cache_reused_for_same_version(self, db, monkeypatch):
+        """Payloads are computed once per data version."""
+        calls = []
+        original = burn_rate.compute_burn_rate
+        monkeypatch.setattr(
+            burn_rate,
+            "compute_burn_rate",
+            lambda *args: calls.append(args) or original(*args),
+        )
+
+        handle_get_burn_rate({})
+        handle_get_burn_rate({})
+        assert len(calls) == 1
+
+    def test_selection_params(self, db):
+        """as_of, group and windows narrow the payload and the ETag."""
+        event = {"queryStringParameters": {
+            "as_of": "2026-02-01", "group": "food", "windows": "7,14",
+        }}
+        response = handle_get_burn_rate(event)
+        body = json.loads(response["body"])
+
+        assert list(body) == ["food"]
+        assert [p["window"] for p in body["food"]["curve"]] == [7, 14]
+        assert response["headers"]["ETag"] != handle_get_burn_rate({})["headers"]["ETag"]
+
+        bad = handle_get_burn_rate({"queryStringParameters": {"windows": "7,x"}})
+        assert bad["statusCode"] == 400
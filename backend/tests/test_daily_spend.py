@@ -0,0 +1,78 @@
+"""Tests for the materialized daily_spend table."""
+
+import json
+
+from src import daily_spend
+from src.handler import (
+    handle_categorize,
+    handle_delete_category,
+    handle_toggle_recurring,
+    handle_update_category,
+)
+
+from .conftest import add_transaction
+
+
+def spend(db, group: str, date: str) -> int:
+    row = db.fetchone(
+        """
+        SELECT COALESCE(SUM(total_cents), 0) AS cents FROM daily_spend
+        WHERE burn_rate_group = ? AND date = ? AND is_recurring = 0 AND is_explosion = 0
+        """,
+        (group, date),
+    )
+    return row["cents"]
+
+
+class TestDailySpendMaintenance:
+    """daily_spend stays equal to a fresh aggregate through every write path."""
+
+    def test_insert_and_categorize(self, db):
+        """Categorized inserts and later categorization both land in totals."""
+        add_transaction("A", -12.34, "2026-01-05", category_id=1, needs_review=False)
+        txn = add_transaction("B", -5.00, "2026-01-05")
+        add_transaction("REFUND", 20.00, "2026-01-05", category_id=1, needs_review=False)
+        assert spend(db, "food", "2026-01-05") == 1234
+
+        handle_categorize({"body": json.dumps({"category_id": 1})}, txn)
+
+        assert spend(db, "food", "2026-01-05") == 1734
+        assert daily_spend.verify() == []
+
+    def test_toggle_and_purge(self, db):
+        """Flag toggles move spend between buckets; deletes remove it."""
+        txn = add_transaction("A", -10.00, "2026-01-05", category_id=2, needs_review=False)
+        handle_toggle_recurring({}, txn)
+        assert spend(db, "discretionary", "2026-01-05") == 0
+        assert daily_spend.verify() == []
+
+        db.execute("DELETE FROM transactions WHERE date < ?", ("2026-02-01",))
+        assert db.fetchall("SELECT * FROM daily_spend") == []
+
+    def test_regroup_category(self, db):
+        """Changing a category's group moves its existing spend."""
+        add_transaction("A", -10.00, "2026-01-05", category_id=2, needs_review=False)
+
+        handle_update_category({"body": json.dumps({"burn_rate_group": "food"})}, 2)
+
+        assert spend(db, "food", "2026-01-05") == 1000
+        assert spend(db, "discretionary", "2026-01-05") == 0
+        assert daily_spend.verify() == []
+
+    def test_delete_category(self, db):
+        """Deleting a category removes its spend from totals."""
+        add_transaction("A", -10.00, "2026-01-05", category_id=2, needs_review=False)
+
+        handle_delete_category({}, 2)
+
+        assert spend(db, "discretionary", "2026-01-05") == 0
+        assert daily_spend.verify() == []
+
+    def test_verify_detects_and_rebuild_repairs(self, db):
+        """verify() reports drift and rebuild() fixes it."""
+        add_transaction("A", -10.00, "2026-01-05", category_id=1, needs_review=False)
+        db.execute("UPDATE daily_spend SET total_cents = 1")
+
+        assert len(daily_spend.verify()) == 1
+        daily_spend.rebuild()
+        assert daily_spend.verify() == []
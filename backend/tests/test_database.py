@@ -0,0 +1,80 @@
+"""Tests for database schema setup and migrations."""
+
+import sqlite3
+from datetime import date
+
+from src import categories, changes, daily_spend, database, ewma
+from src.migrations import SCHEMA_VERSION
+
+# Tables as they existed before schema versioning (user_version 0)
+LEGACY_SCHEMA = """
+CREATE TABLE accounts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, type TEXT NOT NULL,
+    csv_format TEXT NOT NULL, include_in_burn_rate BOOLEAN NOT NULL DEFAULT 1,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, burn_rate_group TEXT NOT NULL,
+    parent_id INTEGER REFERENCES categories(id), created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, account_id INTEGER NOT NULL, date DATE NOT NULL,
+    description TEXT NOT NULL, amount DECIMAL(10, 2) NOT NULL, category_id INTEGER,
+    needs_review BOOLEAN NOT NULL DEFAULT 1, is_recurring BOOLEAN NOT NULL DEFAULT 0,
+    is_explosion BOOLEAN NOT NULL DEFAULT 0, reference_number TEXT, dedup_hash TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE rules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, pattern TEXT NOT NULL, category_id INTEGER NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 100, account_filter INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, burn_rate_group TEXT NOT NULL,
+    feedback_date DATE NOT NULL, period_end_date DATE NOT NULL, sentiment TEXT NOT NULL,
+    burn_rate_at_feedback DECIMAL(10, 2) NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE burn_rate_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, computed_at DATETIME NOT NULL,
+    burn_rate_group TEXT NOT NULL, window_days INTEGER NOT NULL,
+    daily_burn_rate DECIMAL(10, 2) NOT NULL, target_rate DECIMAL(10, 2) NOT NULL,
+    deviation DECIMAL(10, 2) NOT NULL
+);
+CREATE TABLE targets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, burn_rate_group TEXT NOT NULL UNIQUE,
+    daily_target DECIMAL(10, 2) NOT NULL, updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+class TestMigrations:
+    """Tests for upgrading databases created before the closure table."""
+
+    def test_legacy_database_is_migrated(self, tmp_path, monkeypatch):
+        """A version-0 database gets the closure table populated."""
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.executescript(LEGACY_SCHEMA)
+        conn.execute(
+            "INSERT INTO categories (id, name, burn_rate_group, parent_id) "
+            "VALUES (1, 'Food', 'food', NULL), (6, 'Coffee', 'discretionary', 1)"
+        )
+        conn.execute(
+            "INSERT INTO transactions (account_id, date, description, amount, category_id, dedup_hash) "
+            "VALUES (1, '2026-01-05', 'CAFE', -4.5, 6, 'x')"
+        )
+        conn.commit()
+        conn.close()
+
+        database.close()
+        monkeypatch.setattr(database, "_db_path", str(path))
+        try:
+            conn = database.get_connection()
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            assert categories.group_map()[6] == "food"
+            assert daily_spend.verify() == []
+            assert database.fetchone("SELECT total_cents FROM daily_spend")["total_cents"] == 450
+            assert ewma.rates(date(2026, 1, 5)) == ewma.recompute(date(2026, 1, 5))
+            assert changes.changes_since(0)["changes"]["transactions"].records()[0]["description"] == "CAFE"
+        finally:
+            database.close()
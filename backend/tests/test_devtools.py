@@ -0,0 +1,176 @@
+"""Tests for the local dev server and load generator."""
+
+import base64
+import gzip
+import json
+import sys
+import threading
+from email.message import Message
+
+import pytest
+
+from devtools import loadtest, server
+from src import auth, database
+
+
+def _headers(**values: str) -> Message:
+    headers = Message()
+    for name, value in values.items():
+        headers[name.replace("_", "-")] = value
+    return headers
+
+
+@pytest.fixture
+def dev_server(db):
+    """A DevServer on a free port, its container running against the test database."""
+    database.close()  # reopened on the container's thread
+    container = server.Container()
+    httpd = server.DevServer(("127.0.0.1", 0), container, None)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    container.executor.submit(database.close).result()
+    container.executor.shutdown()
+
+
+class TestEventAdapter:
+    def test_builds_proxy_event(self):
+        event = server.to_event(
+            "GET",
+            "/api/transactions",
+            "limit=5&fields=id&fields=date&empty=",
+            _headers(Authorization="Bearer t", Accept_Encoding="gzip"),
+            b"",
+        )
+        assert event["httpMethod"] == "GET"
+        assert event["path"] == "/api/transactions"
+        assert event["queryStringParameters"] == {"limit": "5", "fields": "date", "empty": ""}
+        assert event["multiValueQueryStringParameters"]["fields"] == ["id", "date"]
+        assert event["headers"] == {"Authorization": "Bearer t", "Accept-Encoding": "gzip"}
+        assert event["body"] is None
+        assert event["isBase64Encoded"] is False
+        assert event["requestContext"]["requestId"]
+
+    def test_no_query_is_none(self):
+        event = server.to_event("GET", "/api/status", "", _headers(), b"")
+        assert event["queryStringParameters"] is None
+
+    def test_binary_body_is_base64_encoded(self):
+        event = server.to_event("POST", "/api/x", "", _headers(), b"\xff\x00")
+        assert event["isBase64Encoded"] is True
+        assert base64.b64decode(event["body"]) == b"\xff\x00"
+
+    def test_decodes_base64_response(self):
+        body = gzip.compress(b"{}")
+        response = {
+            "statusCode": 200,
+            "headers": {"Content-Encoding": "gzip"},
+            "body": base64.b64encode(body).decode(),
+            "isBase64Encoded": True,
+        }
+        assert server.from_response(response) == (200, {"Content-Encoding": "gzip"}, body)
+
+    def test_server_timing(self):
+        header = server.server_timing({"auth": 0.012, "handler": 3.5})
+        assert header == "auth;dur=0.012, handler;dur=3.5"
+        assert loadtest.parse_server_timing(header) == {"auth": 0.012, "handler": 3.5}
+
+
+class TestContainer:
+    def _event(self, path: str) -> dict:
+        return server.to_event("GET", path, "", _headers(), b"")
+
+    def test_cold_start_reimports_handler(self, tmp_path, monkeypatch):
+        # Restore the original src modules afterwards, since a cold start replaces them
+        for name in [n for n in sys.modules if n == "src" or n.startswith("src.")]:
+            monkeypatch.setitem(sys.modules, name, sys.modules[name])
+        container = server.Container(db_path=str(tmp_path / "cold.db"), cold_every=2)
+
+        _, _, cold = container.invoke(self._event("/api/health"))
+        first = container.handler
+        assert cold is not None
+
+        response, phases, cold = container.invoke(self._event("/api/health"))
+        assert cold is None
+        assert container.handler is first
+
+        response, phases, cold = container.invoke(self._event("/api/health"))
+        assert cold is not None
+        assert container.handler is not first
+        assert response["statusCode"] == 200
+        assert container.handler.database is not first.database
+        assert container.handler.database._db_path == str(tmp_path / "cold.db")
+
+        container.executor.submit(container.handler.database.close).result()
+        container.executor.shutdown()
+
+
+class TestDevServer:
+    def test_load_test_flows(self, dev_server):
+        url = f"http://127.0.0.1:{dev_server.server_port}/api"
+        recorder, elapsed = loadtest.run(
+            url,
+            "testpassword",
+            clients=2,
+            mix={"upload": 1, "triage": 1, "dashboard": 1},
+            iterations=4,
+        )
+        report = loadtest.results(recorder, elapsed)
+
+        assert sum(flow["count"] for flow in report["flows"].values()) == 8
+        assert all(row["errors"] == 0 for row in report["requests"].values())
+        assert report["requests"]["POST /auth/login"]["count"] == 2
+        assert "handler" in report["phases"]
+
+    def test_client_refreshes_expired_token(self, dev_server):
+        import random
+
+        url = f"http://127.0.0.1:{dev_server.server_port}/api"
+        recorder = loadtest.Recorder()
+        client = loadtest.Client(url, recorder, random.Random(1))
+        assert client.login("testpassword")
+
+        client.token = auth._sign({"sub": "user", "typ": "access", "exp": 1})
+        client.dashboard()
+
+        assert recorder.requests.keys() >= {"POST /auth/refresh", "GET /burn-rate"}
+        assert len(recorder.requests["POST /auth/refresh"]) == 1
+        assert recorder.errors == {}
+
+    def test_responses_carry_timings(self, dev_server):
+        import urllib.request
+
+        port = dev_server.server_port
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health") as response:
+            assert response.status == 200
+            assert json.loads(response.read())["status"] == "healthy"
+            assert "serialize;dur=" in response.headers["Server-Timing"]
+
+
+class TestLoadTest:
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        assert loadtest.percentile(values, 50) == 50
+        assert loadtest.percentile(values, 99) == 99
+        assert loadtest.percentile([7.0], 99) == 7
+
+    def test_parse_mix(self):
+        assert loadtest.parse_mix("dashboard=6, triage=3,upload") == {
+            "dashboard": 6,
+            "triage": 3,
+            "upload": 1,
+        }
+        with pytest.raises(ValueError):
+            loadtest.parse_mix("browse=1")
+
+    def test_statement_parses(self):
+        import random
+
+        from src import csv_parser
+
+        client = loadtest.Client("http://unused", loadtest.Recorder(), random.Random(1))
+        parsed = csv_parser.parse_csv(client.statement(), "credit_card_boa")
+        assert len(parsed) == loadtest.UPLOAD_ROWS
+        assert all(txn.amount < 0 for txn in parsed)
@@ -0,0 +1,142 @@
+"""Tests for incrementally maintained EWMA rates."""
+
+import json
+import random
+from datetime import date, timedelta
+
+from src import burn_rate, ewma
+from src.handler import handle_upload
+
+from .conftest import add_transaction
+
+TODAY = date(2026, 3, 15)
+
+HEADER = "Posted Date,Reference Number,Payee,Address,Amount"
+
+
+def day(days_ago: int) -> str:
+    return (TODAY - timedelta(days=days_ago)).isoformat()
+
+
+class TestIncrementalState:
+    """The folded state must equal a full recomputation."""
+
+    def test_random_writes_match_recompute(self, db):
+        rng = random.Random(7)
+        ids = []
+        for _ in range(6):
+            for _ in range(30):
+                ids.append(add_transaction(
+                    "SHOP",
+                    -rng.randint(100, 9000) / 100,
+                    day(rng.randrange(0, 60)),
+                    category_id=rng.randint(1, 4),
+                    is_recurring=int(rng.random() < 0.1),
+                ))
+            for txn in rng.sample(ids, 5):
+                db.execute("UPDATE transactions SET category_id = ? WHERE id = ?", (rng.randint(1, 5), txn))
+            db.execute("DELETE FROM transactions WHERE id = ?", (ids.pop(0),))
+            db.commit()
+
+        assert db.fetchone("SELECT COUNT(*) AS n FROM ewma_journal")["n"] == 0
+        for as_of in [TODAY, TODAY + timedelta(days=10), TODAY - timedelta(days=20)]:
+            assert ewma.rates(as_of) == ewma.recompute(as_of)
+
+    def test_backdated_change_after_fold(self, db):
+        add_transaction("A", -70.0, day(0), category_id=1)
+        db.commit()
+        add_transaction("B", -700.0, day(30), category_id=1)
+        db.commit()
+
+        assert ewma.rates(TODAY) == ewma.recompute(TODAY)
+
+    def test_unfolded_changes_are_visible(self, db):
+        add_transaction("A", -70.0, day(2), category_id=2)
+
+        assert ewma.rates(TODAY)["discretionary"][7] == ewma.recompute(TODAY)["discretionary"][7]
+        assert ewma.rates(TODAY)["discretionary"][7] > 0
+
+    def test_excludes_recurring_except_explosion(self, db):
+        add_transaction("RENT", -2000.0, day(1), category_id=1, is_recurring=1)
+        add_transaction("TV", -900.0, day(1), category_id=4, is_recurring=1)
+        db.commit()
+
+        rates = ewma.rates(TODAY)
+        assert rates["food"][7] == 0.0
+        assert rates["explosion"][7] > 0
+
+
+class TestBurnRateIntegration:
+    """EWMA rates ride along with the resolution curve."""
+
+    def test_curve_payload_carries_ewma(self, db):
+        for days_ago in range(28):
+            add_transaction("GROCERY", -(50.0 if days_ago < 7 else 10.0), day(days_ago), category_id=1)
+        db.commit()
+
+        food = burn_rate.compute_burn_rate(TODAY)["food"]
+
+        assert [p["half_life"] for p in food["ewma"]] == ewma.HALF_LIVES
+        assert food["ewma_arrow"] == "worsening"
+
+
+class TestPurge:
+    """The upload purge must not move the rates."""
+
+    def test_purge_leaves_rates_and_arrow(self, db):
+        today = date.today()
+        for days_ago in range(240):
+            add_transaction(
+                f"MARKET {days_ago}",
+                -30.0,
+                (today - timedelta(days=days_ago)).isoformat(),
+                category_id=1,
+                needs_review=False,
+            )
+        db.commit()
+        before = ewma.rates(today)
+        assert ewma.arrow(before["food"]) == "stable"
+
+        csv = f"{HEADER}\n{today:%m/%d/%Y},1,REFUND,SEATTLE WA,5.00\n"
+        response = handle_upload({"body": json.dumps({"csv_content": csv})})
+        assert json.loads(response["body"])["purged_count"] == 209
+
+        after = ewma.rates(today)
+        assert after == before
+        assert ewma.arrow(after["food"]) == "stable"
+
+    def upload(self, csv: str) -> dict:
+        return json.loads(handle_upload({"body": json.dumps({"csv_content": csv})})["body"])
+
+    def test_purged_rows_not_reingested(self, db):
+        old = date.today() - timedelta(days=45)
+        csv = f"{HEADER}\n{old:%m/%d/%Y},7,GROCER,SEATTLE WA,-40.00\n"
+
+        first = self.upload(csv)
+        rates = ewma.rates(date.today())
+        second = self.upload(csv)
+        third = self.upload(csv)
+
+        assert first["new_count"] == 1
+        assert second["purged_count"] == 1
+        assert (third["new_count"], third["duplicate_count"]) == (0, 1)
+        assert ewma.rates(date.today()) == rates
+
+    def test_unseen_rows_before_cutoff_are_ingested(self, db):
+        """A first upload of an older export after a purge still counts."""
+        today = date.today()
+        self.upload(f"{HEADER}\n{today:%m/%d/%Y},1,REFUND,SEATTLE WA,5.00\n")
+        empty = ewma.rates(today)
+
+        old = today - timedelta(days=45)
+        result = self.upload(f"{HEADER}\n{old:%m/%d/%Y},7,GROCER,SEATTLE WA,-40.00\n")
+        db.execute("UPDATE transactions SET category_id = 1 WHERE description LIKE 'GROCER%'")
+        db.commit()
+
+        assert result["new_count"] == 1
+        assert ewma.rates(today)["food"] != empty["food"]
+
+        # A later purge removes the row but keeps it in the rates
+        rates = ewma.rates(today)
+        assert self.upload(f"{HEADER}\n{today:%m/%d/%Y},2,REFUND,SEATTLE WA,6.00\n")["purged_count"] == 1
+        assert ewma.rates(today) == rates
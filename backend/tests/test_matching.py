@@ -0,0 +1,72 @@
+"""Tests for transfer and payment matching."""
+
+import random
+
+from src import matching
+
+from .conftest import add_transaction
+
+
+def candidate(txn_id: int, account_id: int, day: int, amount: float) -> matching.Candidate:
+    return matching.Candidate(id=txn_id, account_id=account_id, day=day, cents=round(amount * 100))
+
+
+class TestFindMatches:
+    """Tests for the pure matching algorithm."""
+
+    def test_pairs_offsetting_amounts_across_accounts(self):
+        """A debit and credit of equal size on different accounts pair up."""
+        pairs = matching.find_matches([
+            candidate(1, 1, 100, -500.00),
+            candidate(2, 4, 102, 500.00),
+            candidate(3, 4, 101, -12.34),
+        ])
+        assert pairs == [(1, 2)]
+
+    def test_same_account_and_outside_window_do_not_match(self):
+        """Pairs on one account or too far apart are ignored."""
+        pairs = matching.find_matches([
+            candidate(1, 1, 100, -50.00),
+            candidate(2, 1, 100, 50.00),
+            candidate(3, 2, 110, 50.00),
+        ])
+        assert pairs == []
+
+    def test_each_transaction_matches_once(self):
+        """Two payments of the same amount pair with two distinct credits."""
+        pairs = matching.find_matches([
+            candidate(1, 1, 100, -25.00),
+            candidate(2, 1, 130, -25.00),
+            candidate(3, 4, 101, 25.00),
+            candidate(4, 4, 131, 25.00),
+        ])
+        assert sorted(pairs) == [(1, 3), (2, 4)]
+
+    def test_scales_to_large_inputs(self):
+        """Tens of thousands of rows per account match without pairwise work."""
+        rng = random.Random(7)
+        rows = []
+        for i in range(20000):
+            amount = rng.randint(1, 500000) / 100
+            rows.append(candidate(2 * i, 1, i // 50, -amount))
+            rows.append(candidate(2 * i + 1, 4, i // 50 + 1, amount))
+        pairs = matching.find_matches(rows)
+        assert len(pairs) >= 19000
+
+
+class TestMatchTransfers:
+    """Tests for the ingest-time matching stage."""
+
+    def test_matched_pairs_leave_review_queue(self, db):
+        """Both sides are linked and moved to the excluded category."""
+        debit = add_transaction("ONLINE PAYMENT TO CRD 1234", -812.45, "2026-01-10", account_id=1)
+        credit = add_transaction("PAYMENT - THANK YOU", 812.45, "2026-01-11", account_id=4)
+        other = add_transaction("GROCERY", -812.45, "2026-01-10", account_id=4)
+
+        assert matching.match_transfers() == 1
+
+        rows = {r["id"]: r for r in db.fetchall("SELECT * FROM transactions")}
+        assert rows[debit]["category_id"] == 5 and rows[debit]["needs_review"] == 0
+        assert rows[credit]["category_id"] == 5 and rows[credit]["needs_review"] == 0
+        assert rows[other]["needs_review"] == 1
+        assert matching.match_transfers() == 0
@@ -0,0 +1,59 @@
+"""Tests for request phase timing and EMF output."""
+
+import json
+import time
+
+from src import auth, database, metrics
+from src.handler import lambda_handler
+
+
+class TestSpans:
+    def test_nested_spans_are_exclusive(self):
+        metrics.reset()
+        with metrics.span("handler"):
+            time.sleep(0.01)
+            with metrics.span("commit"):
+                time.sleep(0.02)
+
+        phases = metrics.durations()
+        assert list(phases) == ["handler", "commit"]
+        assert 10 <= phases["handler"] < 20
+        assert phases["commit"] >= 20
+
+    def test_repeated_spans_accumulate(self):
+        metrics.reset()
+        for _ in range(2):
+            with metrics.span("upload"):
+                time.sleep(0.005)
+        assert metrics.durations()["upload"] >= 10
+
+    def test_emf_document(self):
+        metrics.reset()
+        metrics.set_route("GET /items")
+        with metrics.span("handler"):
+            pass
+
+        document = metrics.emit(200, 0.05, "req-1")
+        directive = document["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Dimensions"] == [["Route"]]
+        assert [m["Name"] for m in directive["Metrics"]] == ["handler_ms", "total_ms"]
+        assert document["Route"] == "GET /items"
+        assert document["total_ms"] == 50.0
+        assert document["RequestId"] == "req-1"
+
+
+def test_lambda_handler_emits_route_metrics(db, monkeypatch, capsys):
+    monkeypatch.setattr(database, "sync_from_s3", lambda: None)  # keep the local test database
+    event = {
+        "httpMethod": "PATCH",
+        "path": "/api/transactions/999/recurring",
+        "headers": {"Authorization": f"Bearer {auth.generate_token()}"},
+    }
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "test")  # EMF is printed only in Lambda
+
+    assert lambda_handler(event, None)["statusCode"] == 404
+
+    document = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert document["Route"] == "PATCH /transactions/{id}/recurring"
+    assert document["StatusCode"] == 404
+    assert {"auth_ms", "handler_ms", "serialize_ms"} <= set(document)
@@ -0,0 +1,73 @@
+"""Tests for keyset pagination of GET /transactions."""
+
+import json
+
+from src.handler import decode_cursor, encode_cursor, handle_get_transactions
+
+from .conftest import add_transaction
+
+
+def page(**params) -> dict:
+    response = handle_get_transactions({"queryStringParameters": {k: str(v) for k, v in params.items()}})
+    assert response["statusCode"] == 200
+    return json.loads(response["body"])
+
+
+class TestKeysetPagination:
+    """Tests for cursor-based paging."""
+
+    def test_walks_every_row_once_in_order(self, db):
+        for i in range(23):
+            add_transaction(f"T{i}", -1.0, f"2026-01-{i % 5 + 1:02d}")
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+            body = page(**params)
+            seen.extend((t["date"], t["id"]) for t in body["transactions"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == 23
+        assert seen == sorted(seen, reverse=True)
+
+    def test_inserts_do_not_shift_later_pages(self, db):
+        for i in range(6):
+            add_transaction(f"T{i}", -1.0, f"2026-01-{i + 1:02d}")
+
+        first = page(limit=3)
+        add_transaction("NEW", -1.0, "2026-02-01")
+        second = page(limit=3, cursor=first["next_cursor"])
+
+        assert [t["date"] for t in second["transactions"]] == ["2026-01-03", "2026-01-02", "2026-01-01"]
+        assert second["next_cursor"] is None
+
+    def test_cursor_combines_with_filters(self, db):
+        for i in range(4):
+            add_transaction(f"A{i}", -1.0, f"2026-01-{i + 1:02d}", account_id=1)
+            add_transaction(f"B{i}", -1.0, f"2026-01-{i + 1:02d}", account_id=2)
+
+        first = page(limit=2, account_id=2)
+        second = page(limit=2, account_id=2, cursor=first["next_cursor"])
+
+        assert {t["account_id"] for t in first["transactions"] + second["transactions"]} == {2}
+        assert len(second["transactions"]) == 2
+
+    def test_cursor_round_trip_and_rejects_garbage(self, db):
+        assert decode_cursor(encode_cursor("2026-01-02", 42)) == ("2026-01-02", 42)
+
+        response = handle_get_transactions({"queryStringParameters": {"cursor": "not-a-cursor"}})
+        assert response["statusCode"] == 400
+
+    def test_limit_is_clamped_and_validated(self, db):
+        for i in range(3):
+            add_transaction(f"T{i}", -1.0, f"2026-01-{i + 1:02d}")
+
+        for limit in (0, -5):
+            body = page(limit=limit)
+            assert len(body["transactions"]) == 1
+            assert body["next_cursor"] is not None
+
+        response = handle_get_transactions({"queryStringParameters": {"limit": "ten"}})
+        assert response["statusCode"] == 400
@@ -0,0 +1,79 @@
+"""Tests for on-demand request profiling."""
+
+import pstats
+import time
+
+import pytest
+
+from src import auth, database, profiler
+from src.handler import lambda_handler
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(database, "sync_from_s3", lambda: None)  # keep the local test database
+    return tmp_path / "profiles"
+
+
+def event(path: str, headers: dict) -> dict:
+    return {"httpMethod": "GET", "path": path, "headers": headers}
+
+
+def signed_headers(path: str, token: bool = True) -> dict:
+    headers = {profiler.HEADER: profiler.sign("GET", path)}
+    if token:
+        headers["Authorization"] = f"Bearer {auth.generate_token()}"
+    return headers
+
+
+class TestProfiler:
+    def test_signed_request_is_profiled(self, db, profile_dir):
+        response = lambda_handler(event("/api/categories", signed_headers("/api/categories")), None)
+
+        assert response["statusCode"] == 200
+        path = response["headers"]["X-Profile"]
+        assert path.startswith(str(profile_dir)) and path.endswith(".pstats")
+        assert pstats.Stats(path).total_calls > 0
+
+    def test_signature_must_match_request(self, db, profile_dir):
+        response = lambda_handler(event("/api/accounts", signed_headers("/api/categories")), None)
+        assert "X-Profile" not in response["headers"]
+
+    def test_signature_requires_authentication(self, db, profile_dir):
+        headers = signed_headers("/api/categories", token=False)
+        response = lambda_handler(event("/api/categories", headers), None)
+        assert response["statusCode"] == 401
+        assert "X-Profile" not in response["headers"]
+
+    def test_environment_profiles_every_request(self, db, profile_dir, monkeypatch):
+        monkeypatch.setattr(profiler, "ENABLED", True)
+        response = lambda_handler(event("/health", {}), None)
+        assert "X-Profile" in response["headers"]
+
+    def test_upload_to_data_bucket(self, db, profile_dir, monkeypatch, s3):
+        monkeypatch.setattr(profiler, "UPLOAD", True)
+        response = lambda_handler(event("/api/categories", signed_headers("/api/categories")), None)
+        assert response["headers"]["X-Profile"].startswith("s3://test-bucket/debug/profiles/")
+        assert s3.uploads == 1
+
+    def test_expired_or_overlong_signature_rejected(self, db, profile_dir):
+        for expires in (int(time.time()) - 1, int(time.time()) + 2 * profiler.MAX_SIGNATURE_TTL_SECONDS):
+            headers = {
+                profiler.HEADER: f"{expires}.{auth.debug_signature('GET', '/api/categories', expires)}",
+                "Authorization": f"Bearer {auth.generate_token()}",
+            }
+            response = lambda_handler(event("/api/categories", headers), None)
+            assert response["statusCode"] == 200
+            assert "X-Profile" not in response["headers"]
+
+    def test_signature_check_errors_are_contained(self, db, profile_dir, monkeypatch):
+        def unavailable(*args):
+            raise RuntimeError("secrets unavailable")
+
+        headers = signed_headers("/api/categories")
+        monkeypatch.setattr(auth, "debug_signature", unavailable)
+        response = lambda_handler(event("/api/categories", headers), None)
+
+        assert response["statusCode"] == 200
+        assert "X-Profile" not in response["headers"]
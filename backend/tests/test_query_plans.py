@@ -0,0 +1,171 @@
+"""EXPLAIN QUERY PLAN regression tests for the queries handlers run.
+
+Every route is exercised against a seeded database while SQLite's trace
+callback records the statements executed. Each statement's plan is checked
+for full scans and temporary B-tree sorts; any not recorded in
+query_plans.json fails the test. Scans of small lookup tables are ignored.
+
+After an intentional change, regenerate the baseline with
+    UPDATE_QUERY_PLANS=1 python -m pytest tests/test_query_plans.py
+and review the diff.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+from src import database, sqltrace
+from src.handler import dispatch
+
+from .conftest import add_transaction
+
+BASELINE_PATH = Path(__file__).parent / "query_plans.json"
+
+# Tables bounded by configuration rather than data volume, and json_each over bound id lists
+SMALL_TABLES = {
+    "accounts",
+    "app_meta",
+    "categories",
+    "category_closure",
+    "ewma_journal",
+    "ewma_state",
+    "json_each",
+    "recurring_series",
+    "rules",
+    "sqlite_sequence",
+    "targets",
+}
+
+CSV = """Posted Date,Reference Number,Payee,Address,Amount
+01/10/2026,1001,GROCERY OUTLET,OAKLAND CA,-45.10
+01/11/2026,1002,PAYMENT THANK YOU,,300.00
+01/12/2026,1003,NETFLIX.COM,,-15.49
+"""
+
+
+def request(method: str, path: str, query: dict | None = None, body: dict | None = None) -> dict:
+    event = {
+        "httpMethod": method,
+        "path": path,
+        "queryStringParameters": query,
+        "body": json.dumps(body) if body is not None else None,
+    }
+    response = dispatch(event, method, path)
+    assert response is not None and response["statusCode"] < 500, (method, path, response)
+    return response
+
+
+def seed() -> None:
+    for i in range(300):
+        add_transaction(
+            f"MERCHANT {i % 17}",
+            -(i % 90 + 1.25) if i % 10 else 250.0,
+            f"2026-{i % 3 + 1:02d}-{i % 28 + 1:02d}",
+            account_id=i % 4 + 1,
+            category_id=[None, 1, 2, 3, 4][i % 5],
+            needs_review=i % 5 == 0,
+        )
+    database.commit()
+
+
+def exercise() -> None:
+    """Call every route at least once."""
+    request("POST", "/transactions/upload", body={"account_id": 4, "csv_content": CSV})
+    request("GET", "/transactions")
+    request("GET", "/transactions", {"account_id": "2", "limit": "10"})
+    request("GET", "/transactions", {"category_id": "1", "start_date": "2026-01-01"})
+    page = json.loads(request("GET", "/transactions", {"limit": "5"})["body"])
+    request("GET", "/transactions", {"cursor": page["next_cursor"]})
+    for sort in ["description", "date", "amount"]:
+        request("GET", "/transactions/review-queue", {"sort": sort})
+    groups = json.loads(request("GET", "/transactions/review-queue/groups")["body"])
+    request(
+        "POST",
+        "/transactions/review-queue/groups/categorize",
+        body={"key": groups["groups"][0]["key"], "category_id": 2, "create_rule": True},
+    )
+    txn = page["transactions"][0]["id"]
+    request("PUT", f"/transactions/{txn}/categorize", body={"category_id": 1})
+    request("PATCH", f"/transactions/{txn}/recurring")
+    request("PATCH", f"/transactions/{txn}/explosion")
+
+    request("GET", "/categories")
+    category = {"name": "Coffee", "burn_rate_group": "discretionary", "parent_id": 2}
+    category_id = json.loads(request("POST", "/categories", body=category)["body"])["id"]
+    request("PUT", f"/categories/{category_id}", body={"parent_id": 1})
+    request("DELETE", f"/categories/{category_id}")
+
+    rule_id = json.loads(request("POST", "/rules", body={"pattern": "MERCHANT 3", "category_id": 2})["body"])["id"]
+    request("GET", "/rules")
+    request("PUT", f"/rules/{rule_id}", body={"priority": 5})
+    request("DELETE", f"/rules/{rule_id}")
+
+    request("GET", "/accounts")
+    request("GET", "/status")
+    request("GET", "/burn-rate")
+    request("GET", "/burn-rate", {"as_of": "2026-02-01", "group": "food", "windows": "7,14"})
+    request("GET", "/burn-rate/history", {"start": "2026-01-01", "end": "2026-03-31", "resolution": "weekly"})
+    request("POST", "/feedback", body={"burn_rate_group": "food", "sentiment": "good"})
+    request("GET", "/targets")
+    request("GET", "/targets/history")
+    request("GET", "/rollup", {"by": "month,group,account"})
+    request("GET", "/changes", {"since": "0", "limit": "50"})
+
+
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+(?:\(\s*)?(?!SELECT\b)(\w+)(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|LEFT|JOIN|GROUP|ORDER)\b)(\w+))?",
+    re.IGNORECASE,
+)
+
+
+def _flags(sql: str, plan: list[str]) -> list[str]:
+    """Plan steps that are full scans of data tables or temp B-tree sorts."""
+    # Plans name tables by alias; map aliases back to tables
+    tables = {alias or table: table for table, alias in _TABLE_REF.findall(sql)}
+    flagged = []
+    for detail in plan:
+        scan = re.match(r"SCAN (\w+)", detail)
+        if scan and detail != "SCAN CONSTANT ROW" and tables.get(scan.group(1), scan.group(1)) not in SMALL_TABLES:
+            flagged.append(detail)
+        elif "TEMP B-TREE" in detail:
+            flagged.append(detail)
+    return flagged
+
+
+def capture_plans() -> dict[str, list[str]]:
+    """Run the scenario and return flagged plan steps per normalized statement."""
+    conn = database.get_connection()
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        exercise()
+    finally:
+        conn.set_trace_callback(None)
+
+    plans: dict[str, list[str]] = {}
+    for sql in statements:
+        if not re.match(r"\s*(SELECT|WITH|UPDATE|DELETE|INSERT)", sql, re.IGNORECASE):
+            continue  # transaction control, pragmas and trigger bodies
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+        key = sqltrace.fingerprint(sql)
+        plans[key] = sorted(set(plans.get(key, [])) | set(_flags(sql, plan)))
+    return plans
+
+
+def test_no_new_scans_or_temp_sorts(db):
+    seed()
+    plans = capture_plans()
+
+    if os.environ.get("UPDATE_QUERY_PLANS"):
+        baseline = {sql: flags for sql, flags in sorted(plans.items()) if flags}
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+        return
+
+    baseline = json.loads(BASELINE_PATH.read_text())
+    regressions = {
+        sql: sorted(set(flags) - set(baseline.get(sql, [])))
+        for sql, flags in plans.items()
+        if set(flags) - set(baseline.get(sql, []))
+    }
+    assert regressions == {}, json.dumps(regressions, indent=2)
@@ -0,0 +1,85 @@
+"""Tests for recurring-charge detection."""
+
+from datetime import date, timedelta
+
+from src import recurring
+
+from .conftest import add_transaction
+
+
+def ordinals(*iso_dates: str) -> list[int]:
+    return [date.fromisoformat(d).toordinal() for d in iso_dates]
+
+
+class TestIntervalStats:
+    """Tests for per-group interval statistics."""
+
+    def test_weekly_series_detected(self):
+        """Evenly spaced stable charges yield a period."""
+        stats = recurring.interval_stats(
+            ordinals("2026-01-01", "2026-01-08", "2026-01-15", "2026-01-22"),
+            [-9.99, -9.99, -9.99, -9.99],
+        )
+        assert stats is not None
+        assert stats.period_days == 7
+        assert stats.occurrences == 4
+
+    def test_irregular_spacing_rejected(self):
+        """Charges at irregular intervals are not a series."""
+        stats = recurring.interval_stats(
+            ordinals("2026-01-01", "2026-01-03", "2026-01-20"), [-5.0, -5.0, -5.0]
+        )
+        assert stats is None
+
+    def test_unstable_amounts_rejected(self):
+        """Charges with widely varying amounts are not a series."""
+        stats = recurring.interval_stats(
+            ordinals("2026-01-01", "2026-01-08", "2026-01-15"), [-5.0, -50.0, -12.0]
+        )
+        assert stats is None
+
+
+class TestDetectRecurring:
+    """Tests for the post-ingest detector."""
+
+    def test_weekly_charges_marked(self, db):
+        """Three weekly charges confirm a series and are marked recurring."""
+        start = date(2026, 1, 1)
+        ids = [
+            add_transaction(f"SPOTIFY P{i}ABC", -11.99, (start + timedelta(days=7 * i)).isoformat())
+            for i in range(3)
+        ]
+        add_transaction("CORNER CAFE", -4.50, "2026-01-02")
+
+        assert recurring.detect_recurring() == 3
+        rows = db.fetchall("SELECT id, is_recurring FROM transactions")
+        assert {r["id"] for r in rows if r["is_recurring"]} == set(ids)
+
+    def test_opt_out_survives_next_ingest(self, db):
+        """Un-flagging a charge of a confirmed series sticks; only new charges are marked."""
+        start = date(2026, 1, 1)
+        ids = [
+            add_transaction(f"SPOTIFY P{i}ABC", -11.99, (start + timedelta(days=7 * i)).isoformat())
+            for i in range(3)
+        ]
+        assert recurring.detect_recurring() == 3
+        db.execute("UPDATE transactions SET is_recurring = 0 WHERE id = ?", (ids[1],))
+
+        new_id = add_transaction("SPOTIFY P3ABC", -11.99, (start + timedelta(days=21)).isoformat())
+
+        assert recurring.detect_recurring() == 1
+        rows = db.fetchall("SELECT id, is_recurring FROM transactions")
+        assert {r["id"] for r in rows if r["is_recurring"]} == {ids[0], ids[2], new_id}
+
+    def test_flagged_charge_seeds_monthly_series(self, db):
+        """A user-flagged charge makes next month's charge recurring."""
+        add_transaction("NETFLIX.COM", -15.49, "2026-01-05", is_recurring=1)
+        assert recurring.detect_recurring() == 0
+
+        # The January row is purged before February's upload
+        db.execute("DELETE FROM transactions")
+        new_id = add_transaction("NETFLIX.COM", -15.49, "2026-02-04")
+
+        assert recurring.detect_recurring() == 1
+        row = db.fetchone("SELECT is_recurring FROM transactions WHERE id = ?", (new_id,))
+        assert row["is_recurring"] == 1
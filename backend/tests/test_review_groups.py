@@ -0,0 +1,77 @@
+"""Tests for the grouped review queue."""
+
+import json
+
+from src import merchants
+from src.handler import handle_categorize_review_group, handle_review_queue_groups
+
+from .conftest import add_transaction
+
+
+class TestMerchantKey:
+    """Tests for description normalization."""
+
+    def test_store_numbers_collapse(self):
+        """Store numbers and locations should not split a merchant."""
+        assert merchants.merchant_key("STARBUCKS #1234 SEATTLE WA") == merchants.merchant_key(
+            "STARBUCKS #5678 SEATTLE WA"
+        )
+
+    def test_processor_prefix_removed(self):
+        """Card processor prefixes should be dropped."""
+        assert merchants.merchant_key("SQ *BLUE BOTTLE COFFEE") == "BLUE BOTTLE COFFEE"
+
+    def test_common_pattern_matches_all(self):
+        """Rule pattern should be a substring of every description."""
+        descriptions = ["TRADER JOE S #552 SEATTLE", "TRADER JOE S #110 SEATTLE"]
+        pattern = merchants.common_pattern(descriptions)
+        assert pattern
+        assert all(pattern.lower() in d.lower() for d in descriptions)
+
+
+class TestReviewQueueGroups:
+    """Tests for aggregated review queue endpoints."""
+
+    def test_groups_aggregate_counts_and_dates(self, db):
+        """Groups should report count, total and date range."""
+        add_transaction("STARBUCKS #1 SEATTLE WA", -5.0, "2026-01-02")
+        add_transaction("STARBUCKS #2 SEATTLE WA", -7.5, "2026-01-09")
+        add_transaction("SHELL OIL 5551", -40.0, "2026-01-05")
+        db.commit()
+
+        response = handle_review_queue_groups({})
+        groups = json.loads(response["body"])["groups"]
+
+        assert groups[0]["key"] == "STARBUCKS SEATTLE"
+        assert groups[0]["count"] == 2
+        assert groups[0]["total"] == -12.5
+        assert groups[0]["first_date"] == "2026-01-02"
+        assert groups[0]["last_date"] == "2026-01-09"
+
+    def test_categorize_group_with_rule(self, db):
+        """Categorizing a group should clear it and create a matching rule."""
+        ids = [
+            add_transaction("STARBUCKS #1 SEATTLE WA", -5.0, "2026-01-02"),
+            add_transaction("STARBUCKS #2 SEATTLE WA", -7.5, "2026-01-09"),
+        ]
+        db.commit()
+
+        response = handle_categorize_review_group({
+            "body": json.dumps({"key": "STARBUCKS SEATTLE", "category_id": 1, "create_rule": True})
+        })
+        body = json.loads(response["body"])
+
+        assert response["statusCode"] == 200
+        assert body["categorized"] == 2
+        assert body["rule_pattern"] == "STARBUCKS #"
+        rows = db.fetchall(
+            f"SELECT category_id, needs_review FROM transactions WHERE id IN ({ids[0]}, {ids[1]})"
+        )
+        assert all(r["category_id"] == 1 and r["needs_review"] == 0 for r in rows)
+
+    def test_categorize_unknown_group_returns_404(self, db):
+        """Unknown group keys should return 404."""
+        response = handle_categorize_review_group({
+            "body": json.dumps({"key": "NOPE", "category_id": 1})
+        })
+        assert response["statusCode"] == 404
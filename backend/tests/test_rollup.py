@@ -0,0 +1,110 @@
+"""Tests for the monthly rollup aggregate and endpoint."""
+
+import json
+import random
+from datetime import date, timedelta
+
+from src import categories, rollup
+from src.handler import handle_get_rollup, handle_upload
+
+from .conftest import add_transaction
+
+
+class TestMonthlyRollup:
+    """Tests for trigger maintenance and rollup queries."""
+
+    def test_triggers_track_every_write(self, db):
+        rng = random.Random(5)
+        ids = [
+            add_transaction(
+                "SHOP",
+                rng.choice([-1, 1]) * rng.randint(1, 50000) / 100,
+                f"2026-{rng.randint(1, 6):02d}-{rng.randint(1, 28):02d}",
+                account_id=rng.randint(1, 4),
+                category_id=rng.choice([None, 1, 2, 3, 4, 5]),
+            )
+            for _ in range(300)
+        ]
+        for txn in rng.sample(ids, 40):
+            db.execute(
+                "UPDATE transactions SET category_id = ?, account_id = ?, date = ? WHERE id = ?",
+                (rng.randint(1, 5), rng.randint(1, 4), "2026-07-04", txn),
+            )
+        for txn in rng.sample(ids, 40):
+            db.execute("DELETE FROM transactions WHERE id = ?", (txn,))
+
+        assert rollup.verify()
+
+    def test_group_by_month_and_account(self, db):
+        add_transaction("A", -10.0, "2026-01-05", account_id=1, category_id=1)
+        add_transaction("B", -5.5, "2026-01-20", account_id=1, category_id=1)
+        add_transaction("C", -7.0, "2026-02-01", account_id=4, category_id=1)
+        add_transaction("PAY", 100.0, "2026-02-01", account_id=4)
+
+        rows = rollup.rollup(["month", "account"], "2026-01", "2026-02", group="food")
+
+        assert [(r["month"], r["account_id"], r["spent"], r["count"]) for r in rows] == [
+            ("2026-01", 1, 15.5, 2),
+            ("2026-02", 4, 7.0, 1),
+        ]
+        assert rows[0]["account_name"] == "Checking"
+
+    def test_subcategories_roll_up_to_root_group(self, db):
+        cursor = db.execute(
+            "INSERT INTO categories (name, burn_rate_group, parent_id) VALUES ('Coffee', 'discretionary', 1)"
+        )
+        categories.add_category(cursor.lastrowid, 1)
+        add_transaction("CAFE", -4.0, "2026-03-02", category_id=cursor.lastrowid)
+        add_transaction("???", -9.0, "2026-03-02")
+
+        rows = rollup.rollup(["group"], "2026-03", "2026-03")
+
+        assert {r["burn_rate_group"]: r["spent"] for r in rows} == {"food": 4.0, "uncategorized": 9.0}
+
+    def test_history_survives_upload_purge(self, db):
+        old = date.today() - timedelta(days=200)
+        recent = date.today() - timedelta(days=2)
+        add_transaction("A", -10.0, old.isoformat(), category_id=1)
+        txn = add_transaction("B", -4.0, recent.isoformat(), category_id=1)
+        db.commit()
+        month = old.strftime("%Y-%m")
+
+        csv = "Posted Date,Reference Number,Payee,Address,Amount\n"
+        csv += f"{date.today():%m/%d/%Y},1,REFUND,SEATTLE WA,5.00\n"
+        response = handle_upload({"body": json.dumps({"csv_content": csv})})
+        assert json.loads(response["body"])["purged_count"] == 1
+
+        rows = rollup.rollup(["month"], month, month)
+        assert [(r["month"], r["spent"], r["count"]) for r in rows] == [(month, 10.0, 1)]
+
+        # Deleting a retained transaction still comes off its month, even
+        # one dated before the cutoff
+        late = add_transaction("C", -7.0, old.isoformat(), category_id=1)
+        db.execute("DELETE FROM transactions WHERE id = ?", (late,))
+        rows = rollup.rollup(["month"], month, month)
+        assert [(r["month"], r["spent"], r["count"]) for r in rows] == [(month, 10.0, 1)]
+        db.execute("DELETE FROM transactions WHERE id = ?", (txn,))
+        recent_rows = rollup.rollup(["month"], recent.strftime("%Y-%m"), recent.strftime("%Y-%m"))
+        assert all(r["spent"] == 0 for r in recent_rows)
+        assert rollup.verify()
+
+
+class TestRollupEndpoint:
+    """Tests for GET /rollup."""
+
+    def test_returns_rows(self, db):
+        add_transaction("A", -10.0, "2026-01-05", category_id=2)
+        response = handle_get_rollup({"queryStringParameters": {
+            "by": "month,category", "start": "2026-01", "end": "2026-12",
+        }})
+
+        body = json.loads(response["body"])
+        assert response["statusCode"] == 200
+        assert body["rows"] == [{
+            "month": "2026-01", "category_id": 2, "category_name": "Discretionary",
+            "spent": 10.0, "income": 0.0, "count": 1,
+        }]
+
+    def test_rejects_unknown_dimension(self, db):
+        response = handle_get_rollup({"queryStringParameters": {"by": "merchant"}})
+        assert response["statusCode"] == 400
@@ -0,0 +1,58 @@
+"""Tests for the route table."""
+
+import pytest
+
+from src import handler
+from src.router import Router
+
+
+def ping(event):
+    return {"statusCode": 200}
+
+
+def show(event, item_id):
+    return {"statusCode": 200, "id": item_id}
+
+
+class TestRouter:
+    router = Router([
+        ("GET", "/items", ping),
+        ("PUT", "/items/{id}", show),
+        ("PATCH", "/items/{id}/flag", show),
+    ])
+
+    def test_static_and_parameterized(self):
+        assert self.router.match("GET", "/items").name == "GET /items"
+
+        route = self.router.match("PUT", "/items/42")
+        assert route.name == "PUT /items/{id}" and route.args == (42,)
+        assert route({})["id"] == 42
+
+    def test_no_match(self):
+        assert self.router.match("POST", "/items") is None
+        assert self.router.match("PUT", "/items/abc") is None
+        assert self.router.match("PUT", "/items/1/extra") is None
+        assert self.router.match("PATCH", "/items/1/other") is None
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "handler_name", "args"),
+    [
+        ("GET", "/transactions", "handle_get_transactions", ()),
+        ("POST", "/transactions/review-queue/groups/categorize", "handle_categorize_review_group", ()),
+        ("PUT", "/transactions/7/categorize", "handle_categorize", (7,)),
+        ("PATCH", "/transactions/7/explosion", "handle_toggle_explosion", (7,)),
+        ("DELETE", "/categories/3", "handle_delete_category", (3,)),
+        ("PUT", "/rules/9", "handle_update_rule", (9,)),
+        ("GET", "/changes", "handle_get_changes", ()),
+    ],
+)
+def test_api_routes(method, path, handler_name, args):
+    route = handler.ROUTER.match(method, path)
+    assert route.handler is getattr(handler, handler_name)
+    assert route.args == args
+
+
+def test_api_method_mismatch():
+    assert handler.ROUTER.match("DELETE", "/transactions") is None
+    assert handler.ROUTER.match("GET", "/transactions/7/categorize") is None
@@ -0,0 +1,105 @@
+"""Tests for row-set JSON serialization and the columnar response format."""
+
+import json
+
+import pytest
+
+from src import database, serialize
+from src.handler import handle_get_transactions, handle_review_queue
+
+from .conftest import add_transaction
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    """Run each test with orjson (when installed) and with the stdlib encoder."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialize, "orjson", None)
+    elif serialize.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def event(**params) -> dict:
+    return {"queryStringParameters": params or None}
+
+
+class TestRows:
+    def test_records_and_columnar(self, encoder):
+        rows = serialize.Rows(["id", "name"], [(1, "a"), (2, None)])
+        assert json.loads(serialize.dumps({"items": rows})) == {
+            "items": [{"id": 1, "name": "a"}, {"id": 2, "name": None}]
+        }
+
+        rows.columnar = True
+        assert json.loads(serialize.dumps({"items": rows})) == {
+            "items": {"columns": ["id", "name"], "rows": [[1, "a"], [2, None]]}
+        }
+
+    def test_indexing(self):
+        rows = serialize.Rows(["id"], [(1,), (2,), (3,)], columnar=True)
+        head = rows[:2]
+        assert isinstance(head, serialize.Rows) and len(head) == 2 and head.columnar
+        assert rows[-1] == {"id": 3}
+
+    def test_plain_bodies_match_stdlib(self, encoder):
+        body = {"a": [1, 2.5, None], "b": {"c": "d"}, "e": True}
+        assert json.loads(serialize.dumps(body)) == body
+
+    def test_unserializable_raises(self, encoder):
+        with pytest.raises(TypeError):
+            serialize.dumps({"x": object()})
+
+    def test_fetchrows(self, db):
+        add_transaction("COFFEE", -4.5, "2026-01-01")
+        rows = database.fetchrows("SELECT description, amount FROM transactions")
+        assert rows.columns == ["description", "amount"]
+        assert rows.rows == [("COFFEE", -4.5)]
+
+
+class TestColumnarFormat:
+    def test_transactions_columnar_matches_records(self, db, encoder):
+        for day in range(1, 6):
+            add_transaction(f"SHOP {day}", -day, f"2026-01-0{day}")
+        database.commit()
+
+        records = json.loads(handle_get_transactions(event(limit="3"))["body"])
+        columnar = json.loads(handle_get_transactions(event(limit="3", format="columnar"))["body"])
+
+        table = columnar["transactions"]
+        assert [dict(zip(table["columns"], row, strict=True)) for row in table["rows"]] == records["transactions"]
+        assert columnar["next_cursor"] == records["next_cursor"] is not None
+
+    def test_review_queue_columnar(self, db):
+        add_transaction("SHOP", -1, "2026-01-01")
+        database.commit()
+
+        body = json.loads(handle_review_queue(event(format="columnar"))["body"])
+        assert "description" in body["transactions"]["columns"]
+        assert len(body["transactions"]["rows"]) == 1
+
+    def test_unknown_format_rejected(self, db):
+        assert handle_get_transactions(event(format="csv"))["statusCode"] == 400
+        assert handle_review_queue(event(format="csv"))["statusCode"] == 400
+
+
+class TestFields:
+    def test_projection_keeps_cursor_fields(self, db):
+        for day in range(1, 4):
+            add_transaction(f"SHOP {day}", -day, f"2026-01-0{day}")
+        database.commit()
+
+        body = json.loads(handle_get_transactions(event(fields="amount,account_name", limit="2"))["body"])
+        assert [set(t) for t in body["transactions"]] == [{"id", "date", "amount", "account_name"}] * 2
+        assert body["next_cursor"] is not None
+
+    def test_review_queue_projection(self, db):
+        add_transaction("SHOP", -1, "2026-01-01")
+        database.commit()
+
+        body = json.loads(handle_review_queue(event(fields="description"))["body"])
+        assert body["transactions"] == [{"id": body["transactions"][0]["id"], "description": "SHOP"}]
+
+    def test_unknown_field_rejected(self, db):
+        assert handle_get_transactions(event(fields="amount,password"))["statusCode"] == 400
+        assert handle_review_queue(event(fields="category_name"))["statusCode"] == 400
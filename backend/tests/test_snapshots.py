@@ -0,0 +1,161 @@
+"""Tests for burn rate snapshots and the history endpoint."""
+
+import json
+from datetime import date, datetime
+
+from src import database, snapshots
+from src.handler import handle_burn_rate_history
+
+from .conftest import add_transaction
+
+
+def snapshot_days(group: str) -> list[str]:
+    rows = database.fetchall(
+        "SELECT DISTINCT date(computed_at) AS day FROM burn_rate_snapshots "
+        "WHERE burn_rate_group = ? ORDER BY day",
+        (group,),
+    )
+    return [row["day"] for row in rows]
+
+
+class TestRecord:
+    """Tests for snapshot recording."""
+
+    def test_commit_records_todays_curve(self, db):
+        """A committed write leaves one full curve per group for today."""
+        today = datetime.now().date().isoformat()
+        add_transaction("GROCERY", -50.0, today, category_id=1)
+        db.commit()
+
+        for group in snapshots.SNAPSHOT_GROUPS:
+            assert snapshot_days(group) == [today]
+            count = db.fetchone(
+                "SELECT COUNT(*) AS n FROM burn_rate_snapshots WHERE burn_rate_group = ?",
+                (group,),
+            )["n"]
+            assert count == 26
+
+    def test_repeat_record_replaces_day(self, db):
+        """Recording twice on the same day keeps a single, current curve."""
+        day = date(2026, 3, 10)
+        snapshots.record(day)
+        add_transaction("GROCERY", -140.0, "2026-03-10", category_id=1)
+        snapshots.record(day)
+
+        rows = db.fetchall(
+            "SELECT daily_burn_rate FROM burn_rate_snapshots "
+            "WHERE burn_rate_group = 'food' AND window_days = 14"
+        )
+        assert [row["daily_burn_rate"] for row in rows] == [10.0]
+
+
+class TestBackfill:
+    """Tests for the sliding-window backfill."""
+
+    def curves(self, db) -> list[tuple]:
+        return [
+            tuple(row)
+            for row in db.fetchall(
+                "SELECT date(computed_at), burn_rate_group, window_days, daily_burn_rate, "
+                "target_rate, deviation FROM burn_rate_snapshots "
+                "ORDER BY 1, burn_rate_group, window_days"
+            )
+        ]
+
+    def test_matches_per_day_recompute(self, db):
+        """Backfilled curves equal compute_burn_rate() run as of each day."""
+        for day in range(1, 29, 3):
+            add_transaction("GROCERY", -13.37 * day, f"2026-02-{day:02d}", category_id=1)
+            add_transaction("SHOP", -21.5, f"2026-02-{day:02d}", category_id=2)
+
+        for day in range(1, 29):
+            snapshots.record(date(2026, 2, day))
+        expected = self.curves(db)
+
+        db.execute("DELETE FROM burn_rate_snapshots")
+        written = snapshots.backfill(date(2026, 2, 1), date(2026, 2, 28))
+
+        assert written == 28 * 2 * 26
+        assert self.curves(db) == expected
+
+    def test_replaces_range_only(self, db):
+        snapshots.record(date(2026, 1, 31))
+        snapshots.record(date(2026, 2, 5))
+        snapshots.backfill(date(2026, 2, 1), date(2026, 2, 10))
+
+        assert snapshot_days("food")[0] == "2026-01-31"
+        assert len(snapshot_days("food")) == 11
+
+    def test_keeps_snapshots_of_purged_days(self, db):
+        """Days whose transactions were purged keep their recorded curves."""
+        add_transaction("GROCERY", -300.0, "2026-01-05", category_id=1)
+        snapshots.record(date(2026, 1, 10))
+        db.execute("INSERT INTO app_meta (key, value) VALUES (?, 20260201)", (database.PURGED_BEFORE_KEY,))
+        db.execute("DELETE FROM transactions")
+        before = self.curves(db)
+
+        written = snapshots.backfill(date(2026, 1, 1), date(2026, 3, 10))
+
+        assert self.curves(db)[: len(before)] == before
+        assert snapshot_days("food")[1:] == [
+            date.fromordinal(d).isoformat()
+            for d in range(date(2026, 3, 3).toordinal(), date(2026, 3, 11).toordinal())
+        ]
+        assert written == 8 * 2 * 26
+
+
+class TestHistory:
+    """Tests for downsampled history reads."""
+
+    def seed(self):
+        for day in range(1, 29):
+            add_transaction("GROCERY", -14.0 * day, f"2026-02-{day:02d}", category_id=1)
+            snapshots.record(date(2026, 2, day))
+
+    def test_daily_resolution(self, db):
+        self.seed()
+        history = snapshots.history("food", "2026-02-01", "2026-02-28", window=14)
+        assert len(history) == 28
+        assert history[0]["period"] == "2026-02-01"
+        assert [len(p["curve"]) for p in history] == [1] * 28
+
+    def test_weekly_buckets_start_on_monday(self, db):
+        self.seed()
+        history = snapshots.history("food", "2026-02-01", "2026-02-28", "weekly", window=5)
+        # Feb 1 2026 is a Sunday, so it belongs to the week of Jan 26
+        assert [p["period"] for p in history] == [
+            "2026-01-26", "2026-02-02", "2026-02-09", "2026-02-16", "2026-02-23",
+        ]
+
+    def test_monthly_averages_snapshots(self, db):
+        self.seed()
+        daily = snapshots.history("food", "2026-02-01", "2026-02-28", window=5)
+        monthly = snapshots.history("food", "2026-02-01", "2026-02-28", "monthly", window=5)
+
+        assert [p["period"] for p in monthly] == ["2026-02-01"]
+        expected = sum(p["curve"][0]["daily_rate"] for p in daily) / len(daily)
+        assert abs(monthly[0]["curve"][0]["daily_rate"] - expected) < 0.01
+
+
+class TestHistoryEndpoint:
+    """Tests for GET /burn-rate/history."""
+
+    def test_returns_requested_range(self, db):
+        snapshots.record(date(2026, 2, 10))
+        response = handle_burn_rate_history({
+            "queryStringParameters": {
+                "group": "food", "start": "2026-02-01", "end": "2026-02-28",
+            }
+        })
+
+        assert response["statusCode"] == 200
+        body = json.loads(response["body"])
+        assert list(body["history"]) == ["food"]
+        assert body["history"]["food"][0]["period"] == "2026-02-10"
+        assert "ETag" in response["headers"]
+
+    def test_rejects_bad_resolution(self, db):
+        response = handle_burn_rate_history(
+            {"queryStringParameters": {"resolution": "hourly"}}
+        )
+        assert response["statusCode"] == 400
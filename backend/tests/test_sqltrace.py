@@ -0,0 +1,58 @@
+"""Tests for SQL statement tracing."""
+
+import logging
+
+import pytest
+
+from src import database, sqltrace
+
+from .conftest import add_transaction
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    monkeypatch.setattr(sqltrace, "ENABLED", True)
+    sqltrace.reset()
+    yield
+    sqltrace.reset()
+
+
+def test_fingerprint_groups_literals():
+    assert sqltrace.fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'it''s'") == (
+        "SELECT * FROM t WHERE id IN (?) AND name = ?"
+    )
+    assert sqltrace.fingerprint("SELECT  a\n  FROM t WHERE b = ?") == "SELECT a FROM t WHERE b = ?"
+
+
+class TestTracing:
+    def test_records_count_rows_and_time(self, db, tracing):
+        for i in range(3):
+            add_transaction(f"T{i}", -1.0, "2026-01-01")
+        for i in range(12):
+            database.fetchone("SELECT * FROM transactions WHERE id = ?", (i,))
+        database.fetchall("SELECT * FROM transactions")
+
+        result = sqltrace.summary()
+        by_sql = {q["sql"]: q for q in result["top"]}
+        lookup = by_sql["SELECT * FROM transactions WHERE id = ?"]
+        assert lookup["count"] == 12 and lookup["rows"] == 3
+        assert by_sql["SELECT * FROM transactions"]["rows"] == 3
+        assert result["repeated"] == [{"sql": "SELECT * FROM transactions WHERE id = ?", "count": 12}]
+        assert result["statements"] == 3 + 12 + 1
+
+    def test_slow_queries_logged(self, db, tracing, monkeypatch, caplog):
+        monkeypatch.setattr(sqltrace, "SLOW_QUERY_MS", 0)
+        with caplog.at_level(logging.WARNING, logger="src.sqltrace"):
+            database.fetchall("SELECT * FROM categories WHERE id > 2")
+        assert "Slow query" in caplog.text and "WHERE id > ?" in caplog.text
+
+    def test_summary_logged_per_request(self, db, tracing, caplog):
+        database.fetchall("SELECT * FROM categories")
+        with caplog.at_level(logging.INFO, logger="src.sqltrace"):
+            sqltrace.log_summary("GET /categories")
+        assert "SQL summary GET /categories" in caplog.text
+
+    def test_disabled_records_nothing(self, db):
+        sqltrace.reset()
+        database.fetchall("SELECT * FROM categories")
+        assert sqltrace.summary()["statements"] == 0
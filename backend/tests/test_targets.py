@@ -0,0 +1,75 @@
+"""Tests for target learning history and feedback statistics."""
+
+import json
+from datetime import datetime
+
+from src import targets
+from src.handler import handle_get_target_history, handle_submit_feedback
+
+TODAY = datetime.now().date().isoformat()
+
+
+def feedback(group: str, sentiment: str) -> dict:
+    return handle_submit_feedback(
+        {"body": json.dumps({"burn_rate_group": group, "sentiment": sentiment})}
+    )
+
+
+class TestTargetHistory:
+    """Tests for history recording and the trajectory query."""
+
+    def test_good_feedback_appends_history(self, db):
+        targets.submit_feedback("food", "good", 20.0)
+        targets.submit_feedback("food", "bad", 50.0)
+        targets.submit_feedback("food", "good", 20.0)
+
+        points = targets.trajectory("food", "2000-01-01", TODAY)
+
+        assert [p["target"] for p in points] == [30.0, 28.0, 26.4]
+        assert [p["change"] for p in points] == [None, -2.0, -1.6]
+        assert points[0]["feedback_id"] is None
+
+    def test_range_starts_with_target_in_effect(self, db):
+        db.execute(
+            "INSERT INTO target_history (burn_rate_group, effective_date, daily_target) VALUES "
+            "('food', '2026-01-10', 25), ('food', '2026-02-10', 22), ('food', '2026-03-10', 24)"
+        )
+
+        points = targets.trajectory("food", "2026-02-01", "2026-02-28")
+
+        assert [(p["date"], p["target"]) for p in points] == [
+            ("2026-01-10", 25.0),
+            ("2026-02-10", 22.0),
+        ]
+
+    def test_feedback_hit_rates(self, db):
+        targets.submit_feedback("discretionary", "good", 15.0)  # target 20 -> hit
+        targets.submit_feedback("discretionary", "bad", 40.0)   # target 19 -> miss
+        targets.submit_feedback("discretionary", "good", 19.0)  # target 19 -> hit
+        targets.submit_feedback("discretionary", "bad", 25.0)   # miss
+
+        stats = targets.feedback_stats("discretionary", TODAY, TODAY)
+
+        assert (stats["count"], stats["good"], stats["bad"]) == (4, 2, 2)
+        assert stats["good_rate"] == 0.5
+        assert stats["on_target_rate"] == 0.5
+        assert [r["on_target_rate"] for r in stats["rolling"]] == [1.0, 0.5, 0.667, 0.5]
+
+
+class TestTargetHistoryEndpoint:
+    """Tests for GET /targets/history."""
+
+    def test_returns_both_groups(self, db):
+        feedback("food", "good")
+
+        response = handle_get_target_history({})
+        body = json.loads(response["body"])
+
+        assert response["statusCode"] == 200
+        assert set(body["groups"]) == {"food", "discretionary"}
+        assert len(body["groups"]["food"]["trajectory"]) == 2
+        assert body["groups"]["food"]["feedback"]["count"] == 1
+
+    def test_rejects_bad_group(self, db):
+        response = handle_get_target_history({"queryStringParameters": {"group": "explosion"}})
+        assert response["statusCode"] == 400
@@ -0,0 +1,92 @@
+"""Tests for the published widget document."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from src import database, widget
+from src.handler import handle_categorize
+
+from .conftest import add_transaction
+
+
+class TestWidgetDocument:
+    """Tests for rendering and encoding."""
+
+    def test_payload_contents(self, db):
+        today = datetime.now().date().isoformat()
+        add_transaction("GROCERY", -140.0, today, category_id=1)
+        db.execute("UPDATE targets SET daily_target = 25 WHERE burn_rate_group = 'food'")
+        db.commit()
+
+        payload = widget.build_payload()
+
+        assert payload["version"] == db.data_version()
+        assert payload["pending_review_count"] == 1
+        assert payload["groups"]["food"]["current_14day"] == 10.0
+        assert payload["groups"]["food"]["target"] == 25.0
+        assert set(payload["groups"]["explosion"]) == {"arrow", "current_14day", "total_30day"}
+
+    def test_binary_round_trip(self, db):
+        add_transaction("TV", -900.0, datetime.now().date().isoformat(), category_id=4)
+        db.commit()
+        payload = widget.build_payload()
+
+        data = widget.encode_binary(payload)
+        decoded = widget.decode_binary(data)
+
+        assert len(data) == 41
+        assert decoded["version"] == payload["version"] & 0xFFFFFFFF
+        assert decoded["groups"] == payload["groups"]
+
+
+class TestPublish:
+    """Tests for publishing after uploads."""
+
+    @pytest.fixture(autouse=True)
+    def _fresh_container(self, monkeypatch):
+        monkeypatch.setattr(widget, "_published_version", None)
+
+    def test_write_publishes_both_variants(self, db, s3):
+        txn = add_transaction("GROCERY", -12.0, datetime.now().date().isoformat())
+        db.commit()
+
+        handle_categorize({"body": json.dumps({"category_id": 1})}, txn)
+
+        published = json.loads(s3.objects[widget.WIDGET_JSON_KEY])
+        assert published["version"] == database.data_version()
+        assert published["pending_review_count"] == 0
+        assert widget.decode_binary(s3.objects[widget.WIDGET_BINARY_KEY])["version"] == published["version"] & 0xFFFFFFFF
+
+    def test_no_publish_inside_batch(self, db, s3):
+        with database.batch():
+            add_transaction("A", -1.0, "2026-01-01")
+            database.commit()
+            database.upload_database()
+            assert s3.objects == {}
+        assert widget.WIDGET_JSON_KEY in s3.objects
+
+    def test_unchanged_version_not_republished(self, db, s3):
+        add_transaction("A", -1.0, "2026-01-01")
+        database.commit()
+        database.upload_database()
+        s3.objects.clear()
+
+        database.commit_bookkeeping()
+        database.upload_database()
+
+        assert s3.objects == {}
+
+    def test_render_errors_are_logged(self, db, s3, monkeypatch, caplog):
+        def broken() -> dict:
+            raise KeyError("food")
+
+        monkeypatch.setattr(widget, "build_payload", broken)
+        add_transaction("A", -1.0, "2026-01-01")
+        database.commit()
+
+        database.upload_database()
+
+        assert s3.objects == {}
+        assert "Failed to publish widget documents" in caplog.text
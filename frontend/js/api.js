@@ -7,12 +7,16 @@ const API_BASE = '/api';
 class ApiClient {
     constructor() {
         this.token = localStorage.getItem('token');
+        this.refreshToken = localStorage.getItem('refreshToken');
+        this.refreshing = null;
     }
 
-    async request(path, options = {}) {
+    async request(path, options = {}, retry = true) {
         const url = `${API_BASE}${path}`;
         const headers = {
             'Content-Type': 'application/json',
+            // Required for compressed responses (API Gateway binary media type)
+            'Accept': 'application/json',
             ...options.headers,
         };
 
@@ -25,6 +29,13 @@ class ApiClient {
             headers,
         });
 
+        // Access tokens are short-lived: renew once with the refresh token and retry
+        if (response.status === 401 && retry && this.refreshToken && path !== '/auth/refresh') {
+            if (await this.refresh()) {
+                return this.request(path, options, false);
+            }
+        }
+
         const data = await response.json();
 
         if (!response.ok) {
@@ -42,15 +53,74 @@ class ApiClient {
         const data = await this.request('/auth/login', {
             method: 'POST',
             body: JSON.stringify({ password }),
-        });
+        }, false);
+        this.setSession(data);
+        return data;
+    }
+
+    async refresh() {
+        // Other tabs share the session: use their rotation if they already refreshed
+        if (this.adoptStoredSession()) {
+            return true;
+        }
+        // Concurrent 401s share one refresh: each refresh token is single-use
+        if (!this.refreshing) {
+            this.refreshing = this.request('/auth/refresh', {
+                method: 'POST',
+                body: JSON.stringify({ refresh_token: this.refreshToken }),
+            }, false)
+                .then((data) => {
+                    this.setSession(data);
+                    return true;
+                })
+                .catch(() => {
+                    // Another tab may have rotated the token while this request was in flight
+                    if (this.adoptStoredSession()) {
+                        return true;
+                    }
+                    this.clearSession();
+                    return false;
+                })
+                .finally(() => {
+                    this.refreshing = null;
+                });
+        }
+        return this.refreshing;
+    }
+
+    adoptStoredSession() {
+        const refreshToken = localStorage.getItem('refreshToken');
+        if (!refreshToken || refreshToken === this.refreshToken) {
+            return false;
+        }
+        this.token = localStorage.getItem('token');
+        this.refreshToken = refreshToken;
+        return true;
+    }
+
+    setSession(data) {
         this.token = data.token;
+        this.refreshToken = data.refresh_token;
         localStorage.setItem('token', data.token);
-        return data;
+        localStorage.setItem('refreshToken', data.refresh_token);
     }
 
     logout() {
+        // Revoke the session server-side too; signing out locally does not wait for it
+        if (this.refreshToken) {
+            this.request('/auth/logout', {
+                method: 'POST',
+                body: JSON.stringify({ refresh_token: this.refreshToken }),
+            }, false).catch(() => {});
+        }
+        this.clearSession();
+    }
+
+    clearSession() {
         this.token = null;
+        this.refreshToken = null;
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
     }
 
     isAuthenticated() {
@@ -105,6 +175,22 @@ class ApiClient {
         return this.request(`/transactions/review-queue?sort=${sort}`);
     }
 
+    async getReviewGroups(groupBy = 'merchant', sort = 'count') {
+        return this.request(`/transactions/review-queue/groups?group_by=${groupBy}&sort=${sort}`);
+    }
+
+    async categorizeReviewGroup(key, categoryId, createRule = false, groupBy = 'merchant') {
+        return this.request('/transactions/review-queue/groups/categorize', {
+            method: 'POST',
+            body: JSON.stringify({
+                key,
+                group_by: groupBy,
+                category_id: categoryId,
+                create_rule: createRule,
+            }),
+        });
+    }
+
     async categorize(transactionId, categoryId, createRule = false) {
         return this.request(`/transactions/${transactionId}/categorize`, {
             method: 'PUT',
@@ -168,15 +254,46 @@ class ApiClient {
         });
     }
 
+    // Batch: [{ method, path, body }] applied atomically with one upload
+    async batch(operations) {
+        return this.request('/batch', {
+            method: 'POST',
+            body: JSON.stringify({ operations }),
+        });
+    }
+
     // Burn Rate
-    async getBurnRate() {
-        return this.request('/burn-rate');
+    async getBurnRate(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return this.request(`/burn-rate${query ? '?' + query : ''}`);
+    }
+
+    async getBurnRateHistory(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return this.request(`/burn-rate/history${query ? '?' + query : ''}`);
+    }
+
+    async getRollup(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return this.request(`/rollup${query ? '?' + query : ''}`);
     }
 
     async getTargets() {
         return this.request('/targets');
     }
 
+    async getTargetHistory(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return this.request(`/targets/history${query ? '?' + query : ''}`);
+    }
+
+    // Delta sync: rows changed since a version; pass back the returned version
+    async getChanges(since = 0, limit = null) {
+        const params = new URLSearchParams({ since });
+        if (limit) params.append('limit', limit);
+        return this.request(`/changes?${params}`);
+    }
+
     async submitFeedback(burnRateGroup, sentiment) {
         return this.request('/feedback', {
             method: 'POST',